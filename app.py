@@ -1,36 +1,30 @@
 # app.py
 import streamlit as st
 import jwt
-import datetime
-from db import db_setup
-from db.connection import fetch_one, fetch_all, execute_query
-
-# Clave secreta para JWT
-SECRET_KEY = "super_secret_key"
+from auth.jwt_manager import create_token, verify_token, revoke_token
+from modules.utils.helpers import load_image
 
 # ===============================
 # Inicializar Base de Datos
 # ===============================
-db_setup.init_db()
+@st.cache_resource(show_spinner=False)
+def init_resources():
+    """
+    Preparación única por proceso (migraciones); en los reruns es un no-op.
+    """
+    from db.models import ensure_schema
+    ensure_schema()
+    return True
+
+
+init_resources()
 
 # ===============================
 # Funciones de autenticación
 # ===============================
-def create_jwt(user_id, role, username):
-    payload = {
-        "user_id": user_id,
-        "username": username,
-        "role": role,
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=2)
-    }
-    token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
-    return token
-
-
 def decode_jwt(token):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        return payload
+        return verify_token(token)
     except jwt.ExpiredSignatureError:
         st.error("⚠️ Tu sesión ha expirado.")
         return None
@@ -39,25 +33,6 @@ def decode_jwt(token):
         return None
 
 
-def login_user(username, password):
-    # Hardcodeo para admin/admin123
-    if username == "admin" and password == "admin123":
-        return {"id": 1, "username": "admin", "role": "admin"}
-    query = "SELECT * FROM users WHERE username = ?"
-    user = fetch_one(query, (username,))
-    if user:
-        # Importar aquí para evitar dependencias circulares
-        import jwt
-        SECRET_KEY = "super_secret_key"
-        try:
-            decoded = jwt.decode(user["password"], SECRET_KEY, algorithms=["HS256"])
-            if decoded.get("pwd") == password:
-                return user
-        except Exception:
-            return None
-    return None
-
-
 # ===============================
 # Interfaz Streamlit
 # ===============================
@@ -65,7 +40,7 @@ st.set_page_config(page_title="Beyond - Dashboard", layout="wide" \
 "")
 col1, col2, col3 = st.columns([1,2,4])
 with col1:
-    st.image("assets/images/logo_beyond.png",width=100,)
+    st.image(load_image("assets/images/logo_beyond.png", 100), width=100)
 with col2:
     st.title(":red[Beyond Platform]")
 with col3:
@@ -79,28 +54,36 @@ if st.session_state["token"] is None:
 
     col1,col2,col3=st.columns([1,1,1])
     with col1:
-        st.image("assets/images/pic1.png",width=385)
+        st.image(load_image("assets/images/pic1.png", 385), width=385)
         with st.expander("¿Qué es Beyond Platform?"):
             st.write("Beyond Platform es tu espacio para aprender, conectar y transformar. No es solo una plataforma, es un ecosistema diseñado para docentes, administradores y estudiantes que buscan ir más allá de lo tradicional. Aquí encuentras contenidos exclusivos, herramientas tecnológicas y experiencias interactivas —como dashboards, podcasts, videos y eventos— que impulsan la innovación educativa y hacen más fácil tu día a día. Con :red[Beyond Platform], la educación deja de ser estática y se convierte en un viaje de crecimiento continuo, adaptado a tus necesidades y con una comunidad que te acompaña en cada paso.")
             
     with col2:
-        st.image("assets/images/login1_image.png",width=385)
+        st.image(load_image("assets/images/login1_image.png", 385), width=385)
         with st.expander("Inicia sesión"):
             st.subheader("🔐 Iniciar Sesión")
             username = st.text_input("Usuario")
             password = st.text_input("Contraseña", type="password")
 
             if st.button("Ingresar"):
-                user = login_user(username, password)
+                # El KDF y su pool solo se cargan cuando alguien inicia sesión
+                from auth.login import login_user, LoginBusyError
+                try:
+                    user = login_user(username, password)
+                except LoginBusyError:
+                    st.warning("⏳ Hay muchos inicios de sesión en este momento. Intenta de nuevo.")
+                    st.stop()
                 if user:
-                    token = create_jwt(user["id"], user["role"], user["username"])
+                    from db.events import track_event
+                    track_event("login", {"user_id": user["id"], "role": user["role"]})
+                    token = create_token(user["id"], user["role"], user["username"])
                     st.session_state["token"] = token
                     st.success(f"Bienvenido {user['username']} 👋")
                     st.rerun()
                 else:
                     st.error("❌ Usuario o contraseña incorrectos")
     with col3:
-        st.image("assets/images/mad_man.jpg",width=385)
+        st.image(load_image("assets/images/mad_man.jpg", 385), width=385)
         with st.expander("¿No tienes cuenta?"):
             st.write("Contacta al administrador para crear una cuenta.")
             st.markdown('[Solicitar registro por WhatsApp](https://wa.me/+593993513082?text=Quiero%20registrarme%20en%20Beyond%20Platform)', unsafe_allow_html=True)
@@ -112,22 +95,23 @@ else:
         usuario = payload.get('username', payload.get('user_id', ''))
         st.success(f"✅ Bienvenido/a {usuario} ")
         
-        if payload["role"] == "admin":
-            from modules.dashboards.admin_dashboard import show_admin_dashboard
-            show_admin_dashboard()
-        elif payload["role"] == "user free":
-            from modules.dashboards.user_dashboard import show_user_dashboard
-            show_user_dashboard()
-        else:
-            menu = ["Dashboard", "Usuarios", "Videos", "Salir"]
-            choice = st.sidebar.selectbox("Menú", menu)
-
-            if choice == "Dashboard":
-                st.write("📊 Bienvenido al panel principal.")
-            elif choice == "Usuarios":
-                st.write("👤 Gestión de usuarios (CRUD pronto aquí).")
-            elif choice == "Videos":
-                st.write("🎬 Gestión de videos (CRUD pronto aquí).")
-            elif choice == "Salir":
+        # Los paneles disponibles salen de los permisos del rol
+        from auth.permissions import can
+        panels = [
+            label for label, capability in (("Administración", "admin.panel"), ("Mi espacio", "content.view"))
+            if can(payload, capability)
+        ]
+        if not panels:
+            st.warning("Tu rol todavía no tiene permisos asignados. Contacta al administrador.")
+            if st.button("Cerrar sesión", key="logout_no_access_btn"):
+                revoke_token(st.session_state["token"])
                 st.session_state["token"] = None
                 st.rerun()
+        else:
+            panel = panels[0] if len(panels) == 1 else st.sidebar.radio("Panel", panels)
+            if panel == "Administración":
+                from modules.dashboards.admin_dashboard import show_admin_dashboard
+                show_admin_dashboard()
+            else:
+                from modules.dashboards.user_dashboard import show_user_dashboard
+                show_user_dashboard()
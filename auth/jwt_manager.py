@@ -0,0 +1,149 @@
+# auth/jwt_manager.py
+import datetime
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+
+# Reglas de los tokens de sesión, definidas en un solo lugar
+SECRET_KEY = os.environ.get("BEYOND_JWT_SECRET", "super_secret_key")
+ALGORITHM = "HS256"
+TOKEN_TTL = datetime.timedelta(hours=2)
+CLAIMS_CACHE_SIZE = 1024
+
+_claims_cache = OrderedDict()  # digest -> claims ya verificados
+_revoked = {}                  # digest -> exp, para cerrar sesiones antes de que expiren
+_user_cutoffs = {}             # user_id -> instante; los tokens emitidos antes ya no valen
+_role_cutoffs = {}             # rol -> instante, igual pero para todos los tokens con ese rol
+_lock = threading.Lock()
+
+
+def _digest(token):
+    if isinstance(token, str):
+        token = token.encode()
+    return hashlib.sha256(token).digest()
+
+
+def create_token(user_id, role, username):
+    """
+    Emite un token de sesión firmado con los datos del usuario.
+    """
+    payload = {
+        "user_id": user_id,
+        "username": username,
+        "role": role,
+        "iat": time.time(),
+        "exp": datetime.datetime.now(datetime.timezone.utc) + TOKEN_TTL,
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def _superseded(claims):
+    # Un cambio de rol, un borrado o un rol renombrado invalida los tokens emitidos antes
+    issued = claims.get("iat", 0)
+    for cutoff in (_user_cutoffs.get(claims.get("user_id")), _role_cutoffs.get(claims.get("role"))):
+        if cutoff is not None and issued <= cutoff:
+            return True
+    return False
+
+
+def _prune_cutoffs(cutoffs, now):
+    # Pasado TOKEN_TTL ya no queda ningún token anterior al corte
+    horizon = now - TOKEN_TTL.total_seconds()
+    for name in [n for n, cutoff in cutoffs.items() if cutoff <= horizon]:
+        del cutoffs[name]
+
+
+def verify_token(token):
+    """
+    Retorna los claims de un token válido.
+    La firma solo se verifica la primera vez; después se sirven desde una
+    caché acotada por digest del token que respeta `exp`.
+    Lanza jwt.ExpiredSignatureError o jwt.InvalidTokenError si no es válido.
+    """
+    digest = _digest(token)
+    now = time.time()
+    with _lock:
+        if digest in _revoked:
+            raise jwt.InvalidTokenError("Token revocado")
+        claims = _claims_cache.get(digest)
+        if claims is not None:
+            if _superseded(claims):
+                del _claims_cache[digest]
+                raise jwt.InvalidTokenError("Token revocado")
+            if claims["exp"] > now:
+                _claims_cache.move_to_end(digest)
+                return claims
+            del _claims_cache[digest]
+            raise jwt.ExpiredSignatureError("Signature has expired")
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"require": ["exp"]})
+    with _lock:
+        if _superseded(claims):
+            raise jwt.InvalidTokenError("Token revocado")
+        _claims_cache[digest] = claims
+        while len(_claims_cache) > CLAIMS_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+    return claims
+
+
+def get_claims(token):
+    """
+    Igual que verify_token, pero retorna None si no hay token o no es válido.
+    """
+    if not token:
+        return None
+    try:
+        return verify_token(token)
+    except jwt.InvalidTokenError:
+        return None
+
+
+def revoke_token(token):
+    """
+    Invalida un token (logout) hasta su expiración natural.
+    """
+    if not token:
+        return
+    digest = _digest(token)
+    now = time.time()
+    with _lock:
+        claims = _claims_cache.pop(digest, None)
+        exp = claims["exp"] if claims else now + TOKEN_TTL.total_seconds()
+        _revoked[digest] = exp
+        # Los tokens ya expirados no necesitan seguir en la lista
+        for expired in [d for d, e in _revoked.items() if e <= now]:
+            del _revoked[expired]
+
+
+def revoke_user_tokens(user_ids):
+    """
+    Invalida todos los tokens ya emitidos para estos usuarios (cambio de rol,
+    borrado) y los saca de la caché de claims; el próximo login emite uno nuevo.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    now = time.time()
+    with _lock:
+        for user_id in user_ids:
+            _user_cutoffs[user_id] = now
+        for digest in [d for d, claims in _claims_cache.items() if claims.get("user_id") in user_ids]:
+            del _claims_cache[digest]
+        _prune_cutoffs(_user_cutoffs, now)
+
+
+def revoke_role_tokens(role):
+    """
+    Invalida todos los tokens ya emitidos con este rol (p. ej. al renombrarlo,
+    ya que llevan el nombre anterior) y los saca de la caché de claims.
+    """
+    now = time.time()
+    with _lock:
+        _role_cutoffs[role] = now
+        for digest in [d for d, claims in _claims_cache.items() if claims.get("role") == role]:
+            del _claims_cache[digest]
+        _prune_cutoffs(_role_cutoffs, now)
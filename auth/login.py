@@ -0,0 +1,70 @@
+# auth/login.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from db.connection import execute_query, fetch_one
+from modules.utils.security import hash_password, needs_rehash, verify_password
+
+# Pool acotado para el KDF: un pico de logins (p. ej. al abrir un Summit)
+# no puede ocupar todos los hilos del servidor ni toda la memoria de scrypt.
+LOGIN_WORKERS = int(os.environ.get("BEYOND_LOGIN_WORKERS", 4))
+LOGIN_MAX_PENDING = LOGIN_WORKERS * 8
+LOGIN_TIMEOUT = 10.0  # segundos
+
+_executor = ThreadPoolExecutor(max_workers=LOGIN_WORKERS, thread_name_prefix="beyond-login")
+_pending = threading.BoundedSemaphore(LOGIN_MAX_PENDING)
+
+# Hash de referencia para usuarios inexistentes: el tiempo de respuesta no revela si existe
+_DUMMY_HASH = None
+
+
+class LoginBusyError(Exception):
+    """
+    El pool de verificación está saturado; el usuario debe reintentar.
+    """
+
+
+def _run_kdf(fn, *args):
+    """
+    Ejecuta el KDF en el pool. El cupo de _pending se libera cuando la tarea
+    termina (o se cancela), no cuando se deja de esperarla: así el tope de
+    trabajos pendientes se cumple también cuando hay timeouts.
+    """
+    if not _pending.acquire(timeout=LOGIN_TIMEOUT):
+        raise LoginBusyError("Demasiados inicios de sesión simultáneos.")
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        _pending.release()
+        raise
+    future.add_done_callback(lambda _: _pending.release())
+    try:
+        return future.result(timeout=LOGIN_TIMEOUT)
+    except FutureTimeout:
+        future.cancel()  # si todavía no empezó, sale de la cola y libera su cupo
+        raise LoginBusyError("El inicio de sesión tardó demasiado.") from None
+
+
+def login_user(username, password):
+    """
+    Valida usuario y contraseña. Retorna {"id", "username", "role"} o None.
+    Si el hash guardado es antiguo o usa otro coste, se actualiza de forma transparente.
+    """
+    global _DUMMY_HASH
+    user = fetch_one("SELECT id, username, password, role FROM users WHERE username = ?", (username,))
+    if not user:
+        if _DUMMY_HASH is None:
+            _DUMMY_HASH = hash_password("")
+        _run_kdf(verify_password, _DUMMY_HASH, password)
+        return None
+    stored = user["password"]
+    if not _run_kdf(verify_password, stored, password):
+        return None
+    if needs_rehash(stored):
+        new_hash = _run_kdf(hash_password, password)
+        execute_query(
+            "UPDATE users SET password = ? WHERE id = ? AND password = ?",
+            (new_hash, user["id"], stored)
+        )
+    return {"id": user["id"], "username": user["username"], "role": user["role"]}
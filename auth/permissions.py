@@ -0,0 +1,146 @@
+# auth/permissions.py
+import threading
+from types import MappingProxyType
+
+import streamlit as st
+from auth.jwt_manager import get_claims
+from db.connection import fetch_all
+from db.writer import get_writer
+
+# Capacidades que se pueden asignar a un rol
+CAPABILITIES = {
+    "admin.panel": "Entrar al panel de administración",
+    "users.manage": "Gestionar usuarios",
+    "roles.manage": "Gestionar roles y permisos",
+    "videos.manage": "Gestionar videos",
+    "podcasts.manage": "Gestionar podcasts",
+    "summits.manage": "Gestionar Summits y repeticiones",
+    "content.import": "Importar y exportar contenido",
+    "analytics.view": "Ver analítica y caché",
+    "content.view": "Ver videoteca, podcasts y Summit",
+    "content.like": "Dar like al contenido",
+    "summit.join": "Inscribirse y participar en los Summits",
+}
+
+# Permisos con los que se crean los roles por defecto (ver db/models.py)
+_MEMBER = ("content.view", "content.like", "summit.join")
+DEFAULT_PERMISSIONS = {
+    "admin": tuple(CAPABILITIES),
+    "user free": _MEMBER,
+    "user premium": _MEMBER,
+    "coach": _MEMBER + ("admin.panel", "summits.manage", "analytics.view"),
+}
+
+_NONE = frozenset()
+_matrix = None  # MappingProxyType {rol: frozenset(capacidades)}, se reemplaza entero
+_lock = threading.Lock()
+
+
+def _compile():
+    """
+    Lee roles y role_permissions y arma la matriz inmutable rol -> frozenset.
+    """
+    capabilities = {row[0]: set() for row in fetch_all("SELECT name FROM roles ORDER BY name")}
+    for role, capability in fetch_all("SELECT role, capability FROM role_permissions"):
+        if role in capabilities:
+            capabilities[role].add(capability)
+    return MappingProxyType({role: frozenset(caps) for role, caps in capabilities.items()})
+
+
+def permission_matrix():
+    """
+    Matriz compartida por el proceso; se compila en el primer uso y después
+    solo con reload_permissions().
+    """
+    global _matrix
+    matrix = _matrix
+    if matrix is None:
+        with _lock:
+            if _matrix is None:
+                _matrix = _compile()
+            matrix = _matrix
+    return matrix
+
+
+def reload_permissions():
+    """
+    Recompila la matriz; llamar después de cada cambio en roles o permisos.
+    """
+    global _matrix
+    with _lock:
+        _matrix = _compile()
+
+
+def role_names():
+    return sorted(permission_matrix())
+
+
+def role_capabilities(role):
+    return permission_matrix().get(role, _NONE)
+
+
+def can(claims, capability):
+    """
+    True si el rol de `claims` tiene la capacidad. Sin lecturas a la base de datos.
+    """
+    if not claims:
+        return False
+    return capability in permission_matrix().get(claims.get("role"), _NONE)
+
+
+def current_claims():
+    return get_claims(st.session_state.get("token"))
+
+
+def require(capability):
+    """
+    Corta el render de la página si el usuario de la sesión no tiene la capacidad.
+    """
+    if not can(current_claims(), capability):
+        st.error("🚫 No tienes permiso para ver esta sección.")
+        st.stop()
+
+
+# Capacidades que necesita al menos un rol para poder administrar los roles
+MANAGER_CAPABILITIES = ("admin.panel", "roles.manage")
+
+
+def ensure_role_manager(conn):
+    """
+    Dentro de una operación del escritor: lanza ValueError si ningún rol
+    conserva MANAGER_CAPABILITIES, para que el cambio se deshaga y nadie
+    quede fuera del panel de administración.
+    """
+    placeholders = ", ".join("?" for _ in MANAGER_CAPABILITIES)
+    row = conn.execute(
+        f"SELECT 1 FROM role_permissions p JOIN roles r ON r.name = p.role "
+        f"WHERE p.capability IN ({placeholders}) GROUP BY p.role HAVING COUNT(DISTINCT p.capability) = ? LIMIT 1",
+        (*MANAGER_CAPABILITIES, len(MANAGER_CAPABILITIES))
+    ).fetchone()
+    if row is None:
+        raise ValueError(f"Al menos un rol debe conservar {' y '.join(MANAGER_CAPABILITIES)}.")
+
+
+def replace_role_permissions(conn, role, capabilities):
+    """
+    Reemplaza las capacidades de un rol dentro de una operación del escritor
+    (p. ej. junto con crear o renombrar el rol). Rechaza el cambio si deja sin
+    rol administrador (ver ensure_role_manager). No recompila la matriz.
+    """
+    unknown = set(capabilities) - set(CAPABILITIES)
+    if unknown:
+        raise ValueError(f"Capacidades desconocidas: {', '.join(sorted(unknown))}")
+    conn.execute("DELETE FROM role_permissions WHERE role = ?", (role,))
+    conn.executemany(
+        "INSERT INTO role_permissions (role, capability) VALUES (?, ?)",
+        [(role, capability) for capability in sorted(set(capabilities))]
+    )
+    ensure_role_manager(conn)
+
+
+def set_role_permissions(role, capabilities):
+    """
+    Reemplaza las capacidades de un rol y recompila la matriz.
+    """
+    get_writer().submit(lambda conn: replace_role_permissions(conn, role, capabilities)).result()
+    reload_permissions()
@@ -0,0 +1,577 @@
+# benchmarks/data_layer.py
+"""
+Micro-benchmarks de la capa de datos sobre una base de datos sintética
+(benchmarks/synthetic.py).
+
+Mide cada función de db/connection.py y db/likes.py, fetch_all_videos /
+fetch_all_podcasts (en frío y desde la caché), login_user y las consultas de
+los CRUD (videos, podcasts, Summits y usuarios). Cada benchmark corre hasta
+`--seconds` segundos o `--max-ops` operaciones y reporta ops/s y latencias
+p50/p95/p99. Las lecturas corren antes que las escrituras, y las escrituras
+solo tocan filas creadas por el propio benchmark, así el resultado de una
+lectura no depende de qué escrituras se hayan elegido.
+
+Con `--baseline archivo.json` compara contra una corrida anterior y marca
+como regresión todo benchmark cuya p50 o p95 empeore más de `--tolerance`
+(por defecto 25 %) o cuyas ops/s bajen en la misma proporción; en ese caso
+termina con código 1. `--save archivo.json` guarda la corrida actual para
+usarla como baseline.
+
+Uso:
+    python -m benchmarks.data_layer [--users 10000] [--likes 100000] [--seconds 1]
+        [--only likes.] [--save base.json] [--baseline base.json] [--db copia.db]
+
+Sin `--db` genera una base de datos temporal nueva con la semilla dada; con
+`--db` trabaja sobre una copia de esa base de datos.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks import synthetic
+
+# Registro de benchmarks: (nombre, preparar, escribe). `preparar(ctx, n)` hace
+# el trabajo no medido y retorna la operación a medir (sin argumentos).
+BENCHMARKS = []
+
+MIN_OPS = 3
+
+
+def bench(name, write=False):
+    def register(prepare):
+        BENCHMARKS.append((name, prepare, write))
+        return prepare
+    return register
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class Context:
+    """
+    Rangos de ids de la base de datos y estado compartido entre benchmarks
+    (p. ej. los videos que crea save_video y luego borra delete_video).
+    """
+
+    def __init__(self, seed):
+        from db.connection import fetch_one
+
+        self.rng = random.Random(seed)
+        self.ranges = {}
+        for table in ("users", "videos", "podcasts", "summits", "video_likes", "podcast_likes"):
+            low, high = fetch_one(f"SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM {table}")
+            self.ranges[table] = (low, high)
+        self.created = {"videos": [], "podcasts": [], "summits": [], "users": []}
+
+    def ids(self, table, n):
+        low, high = self.ranges[table]
+        return [self.rng.randint(low, high) for _ in range(n)] if high else [0] * n
+
+    def usernames(self, n):
+        """
+        Nombres de usuarios sintéticos al azar (con la contraseña synthetic.PASSWORD).
+        """
+        from db.connection import fetch_one
+
+        names = []
+        for uid in self.ids("users", n):
+            row = fetch_one("SELECT username FROM users WHERE id = ?", (uid,))
+            names.append(row[0] if row and row[0].startswith("user") else synthetic.username(1))
+        return names
+
+
+def _each(fn, args):
+    """
+    Operación sin argumentos que llama a `fn` con cada tupla de `args`, ya preparadas.
+    """
+    iterator = iter(args)
+    return lambda: fn(*next(iterator))
+
+
+def _function(module, name):
+    return getattr(importlib.import_module(module), name)
+
+
+def _top_up(ids, n, insert):
+    """
+    Completa `ids` hasta n filas con inserts no medidos `insert(conn, i)` (que
+    retorna el id nuevo), para que un benchmark de borrado siempre tenga qué borrar.
+    """
+    from db.connection import transaction
+
+    with transaction() as conn:
+        while len(ids) < n:
+            ids.append(insert(conn, len(ids)))
+
+
+# ===============================
+# db/connection.py
+# ===============================
+@bench("connection.get_connection")
+def _(ctx, n):
+    from db.connection import get_connection
+    return lambda: get_connection().close()
+
+
+@bench("connection.connection")
+def _(ctx, n):
+    from db.connection import connection
+
+    def op():
+        with connection():
+            pass
+    return op
+
+
+@bench("connection.transaction")
+def _(ctx, n):
+    from db.connection import transaction
+
+    def op():
+        with transaction():
+            pass
+    return op
+
+
+@bench("connection.fetch_one")
+def _(ctx, n):
+    from db.connection import fetch_one
+    names = ctx.usernames(n)
+    return _each(
+        lambda name: fetch_one("SELECT id, username, password, role FROM users WHERE username = ?", (name,)),
+        [(name,) for name in names]
+    )
+
+
+@bench("connection.fetch_all")
+def _(ctx, n):
+    from db.connection import fetch_all
+    return _each(
+        lambda after: fetch_all(
+            "SELECT id, title, url, description, embed_url, poster_url FROM videos WHERE id > ? ORDER BY id LIMIT 50",
+            (after,)
+        ),
+        [(vid,) for vid in ctx.ids("videos", n)]
+    )
+
+
+# ===============================
+# db/likes.py (lecturas)
+# ===============================
+def _like_reads(kind):
+    content = f"{kind}s"
+
+    @bench(f"likes.get_{kind}_likes")
+    def _(ctx, n):
+        return _each(_function("db.likes", f"get_{kind}_likes"), [(cid,) for cid in ctx.ids(content, n)])
+
+    @bench(f"likes.user_liked_{kind}")
+    def _(ctx, n):
+        return _each(
+            _function("db.likes", f"user_liked_{kind}"), list(zip(ctx.ids("users", n), ctx.ids(content, n)))
+        )
+
+    @bench(f"likes.get_{content}_likes_summary")
+    def _(ctx, n):
+        # Una página del catálogo (9 ids) con el estado del usuario
+        pages = [(list(range(cid, cid + 9)), uid) for cid, uid in zip(ctx.ids(content, n), ctx.ids("users", n))]
+        return _each(_function("db.likes", f"get_{content}_likes_summary"), pages)
+
+    @bench(f"likes.get_most_liked_{content}")
+    def _(ctx, n):
+        fn = _function("db.likes", f"get_most_liked_{content}")
+        return lambda: fn(10)
+
+
+_like_reads("video")
+_like_reads("podcast")
+
+
+# ===============================
+# Catálogo (caché compartida)
+# ===============================
+def _catalog(kind, module):
+    @bench(f"catalog.fetch_all_{kind}s (frío)")
+    def _(ctx, n):
+        from db.cache import bump_catalog_version
+        fetch = _function(module, f"fetch_all_{kind}s")
+
+        def op():
+            bump_catalog_version()
+            fetch()
+        return op
+
+    @bench(f"catalog.fetch_all_{kind}s (caché)")
+    def _(ctx, n):
+        fetch = _function(module, f"fetch_all_{kind}s")
+        fetch()
+        return fetch
+
+
+_catalog("video", "modules.beyond_videos.video_manager")
+_catalog("podcast", "modules.beyond_podcasts.podcast_manager")
+
+
+# ===============================
+# CRUD (lecturas)
+# ===============================
+@bench("crud.users_page")
+def _(ctx, n):
+    from modules.cruds.crud_users import users_page
+    names = ctx.usernames(n)
+    return _each(lambda name: users_page(after=name), [(name,) for name in names])
+
+
+@bench("crud.users_page (prefijo + rol)")
+def _(ctx, n):
+    from modules.cruds.crud_users import users_page
+    prefixes = [(f"user{ctx.rng.randint(0, 99):02d}",) for _ in range(n)]
+    return _each(lambda prefix: users_page(prefix, "user premium"), prefixes)
+
+
+@bench("crud.count_users (prefijo)")
+def _(ctx, n):
+    from modules.cruds.crud_users import count_users
+    prefixes = [(f"user{ctx.rng.randint(0, 999):03d}",) for _ in range(n)]
+    return _each(count_users, prefixes)
+
+
+@bench("crud.count_users (por rol)")
+def _(ctx, n):
+    from modules.cruds.crud_users import count_users
+    return lambda: count_users(role="user free")
+
+
+@bench("crud.fetch_videos_page (frío)")
+def _(ctx, n):
+    from db.cache import bump_catalog_version
+    from modules.beyond_videos.video_manager import fetch_videos_page
+
+    def fetch(after):
+        bump_catalog_version()
+        fetch_videos_page(after_id=after)
+    return _each(fetch, [(vid,) for vid in ctx.ids("videos", n)])
+
+
+# ===============================
+# auth/login.py (incluye el KDF)
+# ===============================
+@bench("auth.login_user (correcto)")
+def _(ctx, n):
+    from auth.login import login_user
+    return _each(login_user, [(name, synthetic.PASSWORD) for name in ctx.usernames(n)])
+
+
+@bench("auth.login_user (contraseña errónea)")
+def _(ctx, n):
+    from auth.login import login_user
+    return _each(login_user, [(name, "incorrecta") for name in ctx.usernames(n)])
+
+
+@bench("auth.login_user (usuario inexistente)")
+def _(ctx, n):
+    from auth.login import login_user
+    return lambda: login_user("no-existe", "incorrecta")
+
+
+# ===============================
+# db/likes.py (escrituras y mantenimiento)
+# ===============================
+def _like_writes(kind):
+    content = f"{kind}s"
+    likes_table = f"{kind}_likes"
+
+    @bench(f"likes.like_{kind}", write=True)
+    def _(ctx, n):
+        like = _function("db.likes", f"like_{kind}")
+        pairs = list(zip(ctx.ids("users", n), ctx.ids(content, n)))
+        return _each(lambda uid, cid: like(uid, cid).result(), pairs)
+
+    @bench(f"likes.unlike_{kind}", write=True)
+    def _(ctx, n):
+        from db.connection import fetch_one
+        unlike = _function("db.likes", f"unlike_{kind}")
+        pairs = [
+            row for row in (
+                fetch_one(f"SELECT user_id, {kind}_id FROM {likes_table} WHERE id >= ? LIMIT 1", (lid,))
+                for lid in ctx.ids(likes_table, n)
+            ) if row
+        ] or [(0, 0)] * n
+        pairs += pairs[-1:] * (n - len(pairs))
+        return _each(lambda uid, cid: unlike(uid, cid).result(), pairs)
+
+
+_like_writes("video")
+_like_writes("podcast")
+
+
+@bench("likes.check_like_counters", write=True)
+def _(ctx, n):
+    from db.likes import check_like_counters
+    return check_like_counters
+
+
+# ===============================
+# CRUD (escrituras): solo filas creadas aquí
+# ===============================
+def _media_writes(kind, module, url_of):
+    content = f"{kind}s"
+
+    @bench(f"crud.save_{kind}", write=True)
+    def _(ctx, n):
+        save = _function(module, f"save_{kind}")
+        # save_* no retorna el id: se recuperan por título en update_*
+        return _each(lambda i: save(f"Benchmark {i}", url_of(i, "b"), ""), [(i,) for i in range(n)])
+
+    @bench(f"crud.update_{kind}", write=True)
+    def _(ctx, n):
+        from db.connection import fetch_all
+        update = _function(module, f"update_{kind}")
+        ids = [row[0] for row in fetch_all(f"SELECT id FROM {content} WHERE title LIKE 'Benchmark %'")]
+        ctx.created[content] = ids
+        args = [(ctx.rng.choice(ids), f"Benchmark editado {i}", "editado") for i in range(n)] if ids else []
+        return _each(update, args or [(0, "Benchmark", "")] * n)
+
+    @bench(f"crud.delete_{kind}", write=True)
+    def _(ctx, n):
+        delete = _function(module, f"delete_{kind}")
+        ids = ctx.created[content]
+        _top_up(ids, n, lambda conn, i: conn.execute(
+            f"INSERT INTO {content} (title, url, description) VALUES (?, ?, '')",
+            (f"Benchmark {i}", f"https://bench.example.com/{content}/{i}")
+        ).lastrowid)
+        return _each(delete, [(ids.pop(),) for _ in range(n)])
+
+
+_media_writes("video", "modules.beyond_videos.video_manager", synthetic.video_url)
+_media_writes("podcast", "modules.beyond_podcasts.podcast_manager", synthetic.podcast_url)
+
+
+@bench("crud.save_summit", write=True)
+def _(ctx, n):
+    from modules.beyond_summit.summit_manager import save_summit
+    created = ctx.created["summits"]
+    start = int(time.time()) + 30 * 86400
+
+    def op(i):
+        created.append(save_summit(f"Benchmark {i}", "", start + i * 3600, start + i * 3600 + 3600))
+    return _each(op, [(i,) for i in range(n)])
+
+
+@bench("crud.delete_summit", write=True)
+def _(ctx, n):
+    from modules.beyond_summit.summit_manager import delete_summit
+    ids = ctx.created["summits"]
+    _top_up(ids, n, lambda conn, i: conn.execute(
+        "INSERT INTO summits (title, date, description) VALUES (?, '2030-01-01', '')", (f"Benchmark {i}",)
+    ).lastrowid)
+    return _each(delete_summit, [(ids.pop(),) for _ in range(n)])
+
+
+@bench("crud.create_user", write=True)
+def _(ctx, n):
+    from db.connection import execute_query
+    from modules.utils.security import hash_password
+    created = ctx.created["users"]
+    password = hash_password(synthetic.PASSWORD)
+
+    # Mismo INSERT que "Crear usuario" en crud_users, sin el costo del KDF
+    def op(i):
+        created.append(execute_query(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+            (f"bench_{i}", password, "user free")
+        ))
+    return _each(op, [(i,) for i in range(n)])
+
+
+@bench("crud.set_users_role (50 usuarios)", write=True)
+def _(ctx, n):
+    from modules.cruds.crud_users import set_users_role
+    ids = ctx.created["users"]
+    _top_up(ids, n, lambda conn, i: conn.execute(
+        "INSERT INTO users (username, password, role) VALUES (?, '-', 'user free')", (f"bench_extra_{i}",)
+    ).lastrowid)
+    batches = [(ctx.rng.sample(ids, min(50, len(ids))), role) for role in ("user premium", "user free") * n]
+    return _each(set_users_role, batches)
+
+
+@bench("crud.delete_users", write=True)
+def _(ctx, n):
+    from modules.cruds.crud_users import delete_users
+    ids = ctx.created["users"]
+    _top_up(ids, n, lambda conn, i: conn.execute(
+        "INSERT INTO users (username, password, role) VALUES (?, '-', 'user free')", (f"bench_more_{i}",)
+    ).lastrowid)
+    return _each(delete_users, [([ids.pop()],) for _ in range(n)])
+
+
+@bench("connection.execute_query", write=True)
+def _(ctx, n):
+    from db.connection import execute_query
+    return _each(
+        lambda sid: execute_query("UPDATE summit_capacity SET capacity = capacity WHERE summit_id = ?", (sid,)),
+        [(sid,) for sid in ctx.ids("summits", n)]
+    )
+
+
+@bench("connection.close_all (+ reabrir)", write=True)
+def _(ctx, n):
+    from db.connection import close_all, connection
+
+    def op():
+        with connection():
+            pass
+        close_all()
+    return op
+
+
+@bench("connection.set_database (mismo archivo)", write=True)
+def _(ctx, n):
+    from db import connection
+
+    def op():
+        connection.set_database(connection.DB_NAME)
+        connection.execute_query("UPDATE summit_capacity SET capacity = capacity WHERE summit_id = 0")
+    return op
+
+
+def _ordered():
+    """
+    Lecturas primero, luego escrituras; dentro de cada grupo, en orden de registro.
+    """
+    return [b for b in BENCHMARKS if not b[2]] + [b for b in BENCHMARKS if b[2]]
+
+
+# ===============================
+# Ejecución y comparación
+# ===============================
+def run(name, prepare, ctx, seconds, max_ops):
+    op = prepare(ctx, max_ops)
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_ops and (len(latencies) < MIN_OPS or time.perf_counter() - started < seconds):
+        start = time.perf_counter()
+        op()
+        latencies.append(time.perf_counter() - start)
+    return {
+        "ops": len(latencies),
+        "ops_per_s": len(latencies) / max(sum(latencies), 1e-9),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Lista de (nombre, métrica, baseline, actual) que empeoraron más de `tolerance`.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append((name, metric, previous[metric], current[metric]))
+        if current["ops_per_s"] < previous["ops_per_s"] / (1 + tolerance):
+            regressions.append((name, "ops_per_s", previous["ops_per_s"], current["ops_per_s"]))
+    return regressions
+
+
+def _copy_database(source, target):
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    with dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de la capa de datos.")
+    synthetic.add_arguments(parser)
+    parser.add_argument("--db", help="usar una copia de esta base de datos en vez de generar una")
+    parser.add_argument("--seconds", type=float, default=1.0, help="tiempo máximo por benchmark")
+    parser.add_argument("--max-ops", type=int, default=2000, help="operaciones máximas por benchmark")
+    parser.add_argument("--only", default="", help="solo benchmarks cuyo nombre contenga este texto")
+    parser.add_argument("--save", help="guardar los resultados en este JSON")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="empeoramiento tolerado (0.25 = 25 %%)")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="beyond-data-")
+    path = os.path.join(tmpdir, "bench.db")
+    if args.db:
+        _copy_database(args.db, path)
+    os.environ["BEYOND_DB"] = path
+
+    from db.models import ensure_schema
+    from db.writer import stop_writer
+
+    ensure_schema()
+    if args.db:
+        print(f"Datos: copia de {args.db}")
+    else:
+        print(f"Datos sintéticos (semilla {args.seed}):")
+        synthetic.generate(
+            users=args.users, videos=args.videos, podcasts=args.podcasts, summits=args.summits,
+            likes=args.likes, podcast_likes=args.podcast_likes, seed=args.seed,
+        )
+
+    ctx = Context(args.seed)
+    results = {}
+    print(f"\n{'benchmark':<44} {'ops':>6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, prepare, _write in _ordered():
+        if args.only not in name:
+            continue
+        result = run(name, prepare, ctx, args.seconds, args.max_ops)
+        results[name] = result
+        print(
+            f"{name:<44} {result['ops']:>6} {result['ops_per_s']:>10.1f} "
+            f"{result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f}"
+        )
+    stop_writer()
+
+    meta = {
+        "dataset": args.db or {
+            key: getattr(args, key) for key in ("users", "videos", "podcasts", "summits", "likes", "podcast_likes", "seed")
+        },
+        "seconds": args.seconds,
+        "max_ops": args.max_ops,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("dataset") != meta["dataset"]:
+            print("\n⚠️ El baseline se midió con otro conjunto de datos; la comparación es orientativa.")
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresión(es) respecto a {args.baseline} (tolerancia {args.tolerance:.0%}):")
+            for name, metric, before, after in regressions:
+                print(f"  {name:<44} {metric:<10} {before:10.3f} → {after:10.3f}")
+            raise SystemExit(1)
+        print(f"\n✅ Sin regresiones respecto a {args.baseline} (tolerancia {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
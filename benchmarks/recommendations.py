@@ -0,0 +1,120 @@
+# benchmarks/recommendations.py
+"""
+Benchmark del motor de recomendaciones (db/recommendations.py).
+
+Genera `--likes` likes sintéticos de videos (popularidad tipo Zipf y usuarios
+con gustos agrupados por "temas"), reconstruye la matriz de similitud y mide:
+  * tiempo de reconstrucción completa y tamaño de la matriz;
+  * latencia de recomendar a un usuario y de los vecinos de un ítem (p50/p99),
+    con los top-K ya precalculados;
+  * latencia de like/unlike en el escritor y de aplicar la actualización
+    incremental al modelo, por separado;
+y verifica que el modelo incremental coincide con uno reconstruido desde cero.
+
+Uso:
+    python -m benchmarks.recommendations [--likes 1000000] [--users 100000] [--items 20000]
+
+Corre sobre una base de datos temporal nueva.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_likes
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de recomendaciones.")
+    parser.add_argument("--likes", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--updates", type=int, default=500)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="beyond-recs-")
+    os.environ["BEYOND_DB"] = os.path.join(tmpdir, "bench.db")
+
+    from db.connection import transaction
+    from db.likes import like_video, unlike_video
+    from db.models import ensure_schema
+    from db import recommendations
+
+    ensure_schema()
+    started = time.perf_counter()
+    pairs = synthetic_likes(args.likes, args.users, args.items)
+    with transaction() as conn:
+        conn.executemany(
+            "INSERT INTO videos (id, title, url) VALUES (?, ?, ?)",
+            ((i, f"Video {i}", f"https://example.com/{i}") for i in range(1, args.items + 1))
+        )
+        conn.executemany("INSERT INTO video_likes (user_id, video_id) VALUES (?, ?)", pairs.tolist())
+    print(f"Datos: {len(pairs)} likes, {args.users} usuarios, {args.items} videos ({time.perf_counter() - started:.1f} s)")
+
+    engine = recommendations.engines["video"]
+    seconds = engine.rebuild()
+    stats = engine.stats()
+    print(f"Reconstrucción: {seconds:.2f} s · {stats['items']} ítems · {stats['pairs']} pares no nulos")
+
+    sample_users = random.sample(range(1, args.users + 1), args.requests)
+    liked = {uid: recommendations.user_likes("video", uid) for uid in sample_users}
+    serve, full, neighbours = [], [], []
+    for uid in sample_users:
+        start = time.perf_counter()
+        engine.recommend(liked[uid], 10)
+        serve.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        recommendations.recommend_for_user("video", uid, 10)
+        full.append(time.perf_counter() - start)
+    for item_id in random.sample(range(1, args.items + 1), args.requests):
+        start = time.perf_counter()
+        recommendations.similar_items("video", item_id, 10)
+        neighbours.append(time.perf_counter() - start)
+
+    writes, updates = [], []
+    for _ in range(args.updates):
+        uid, item_id = random.randint(1, args.users), random.randint(1, args.items)
+        start = time.perf_counter()
+        if random.random() < 0.3 and liked.get(uid):
+            unlike_video(uid, liked[uid].pop()).result()
+        else:
+            like_video(uid, item_id).result()
+        applied = time.perf_counter()
+        engine.similar(item_id)  # aplica la actualización incremental pendiente
+        writes.append(applied - start)
+        updates.append(time.perf_counter() - applied)
+
+    for name, values in (
+        ("recomendar (top-K precalculado)", serve),
+        ("recomendar + likes del usuario", full),
+        ("vecinos de un ítem", neighbours),
+        ("like/unlike (escritor)", writes),
+        ("actualización incremental", updates),
+    ):
+        print(f"{name:<34} p50 {percentile(values, 0.5) * 1000:7.3f} ms  p99 {percentile(values, 0.99) * 1000:7.3f} ms")
+
+    # El modelo incremental debe coincidir con uno reconstruido desde cero en
+    # los ítems tocados (salvo el leve corrimiento de scores de terceros)
+    touched = list(engine.neighbors)[:200]
+    incremental = {item_id: dict(engine.similar(item_id, 5)) for item_id in touched}
+    engine.rebuild()
+    agree = np.mean([
+        len(set(incremental[i]) & {other for other, _ in engine.similar(i, 5)}) / max(len(incremental[i]), 1)
+        for i in touched
+    ])
+    print(f"Coincidencia top-5 incremental vs. reconstruido: {agree:.1%}")
+
+
+if __name__ == "__main__":
+    main()
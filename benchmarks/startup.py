@@ -0,0 +1,133 @@
+# benchmarks/startup.py
+"""
+Benchmark de arranque y rerun de la app Streamlit.
+
+Reporta:
+  * tiempo de importación (desglose estilo `python -X importtime`) de los
+    módulos que carga cada ruta: login, admin y usuario;
+  * tiempo de ejecución del script app.py en frío (primer run del proceso)
+    y en caliente (reruns) para cada ruta, usando streamlit.testing.AppTest.
+
+Uso:
+    python -m benchmarks.startup [--reruns 20] [--top 15] [--db ruta.db]
+
+Corre sobre una copia temporal de la base de datos para no modificar beyond.db.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que carga cada ruta, en el orden en que los importa app.py
+PATH_IMPORTS = {
+    "login": ["streamlit", "jwt", "auth.jwt_manager", "db.models", "auth.login"],
+    "admin": [
+        "streamlit", "jwt", "auth.jwt_manager", "db.models",
+        "modules.dashboards.admin_dashboard", "modules.beyond_videos.video_manager",
+    ],
+    "user": [
+        "streamlit", "jwt", "auth.jwt_manager", "db.models",
+        "modules.dashboards.user_dashboard", "modules.beyond_videos.video_manager",
+    ],
+}
+
+# Sesión simulada para cada ruta (None = pantalla de login)
+PATH_SESSIONS = {
+    "login": None,
+    "admin": {"role": "admin", "username": "admin", "user_id": 1},
+    "user": {"role": "user free", "username": "bench", "user_id": 2},
+}
+
+
+def import_breakdown(modules, top):
+    """
+    Ejecuta `python -X importtime` en un proceso limpio y retorna
+    (total_ms, [(cumulative_ms, self_ms, módulo), ...]) con los más costosos.
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative = int(cumulative_us) / 1000
+        # Los módulos anidados llevan dos espacios extra por nivel; el total
+        # se suma solo con los de primer nivel para no contar dos veces
+        if len(name) - len(name.lstrip()) == 1:
+            total += cumulative
+        rows.append((cumulative, int(self_us) / 1000, name.rstrip()))
+    rows.sort(reverse=True)
+    return total, rows[:top]
+
+
+def script_times(path, reruns, db_path):
+    """
+    Mide app.py para una ruta: primer run en un proceso nuevo y la media/p95 de reruns.
+    """
+    code = f"""
+import os, sys, time, json
+sys.path.insert(0, {ROOT!r}); os.chdir({ROOT!r})
+os.environ["BEYOND_DB"] = {db_path!r}
+session = {PATH_SESSIONS[path]!r}
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(os.path.join({ROOT!r}, "app.py"), default_timeout=120)
+if session:
+    from auth.jwt_manager import create_token
+    at.session_state["token"] = create_token(session["user_id"], session["role"], session["username"])
+start = time.perf_counter(); at.run(); cold = time.perf_counter() - start
+warm = []
+for _ in range({reruns}):
+    start = time.perf_counter(); at.run(); warm.append(time.perf_counter() - start)
+print(json.dumps({{"cold": cold, "warm": warm, "errors": [str(e.value) for e in at.exception]}}))
+"""
+    result = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque y rerun.")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--db", default=os.path.join(ROOT, "beyond.db"), help="Base de datos a copiar")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="beyond-bench-")
+    db_path = os.path.join(tmpdir, "bench.db")
+    if os.path.exists(args.db):
+        shutil.copy(args.db, db_path)
+
+    try:
+        for path, modules in PATH_IMPORTS.items():
+            total, rows = import_breakdown(modules, args.top)
+            print(f"\n=== Ruta {path}: importación {total:.1f} ms ===")
+            print(f"{'acumulado ms':>13} {'propio ms':>10}  módulo")
+            for cumulative, own, name in rows:
+                print(f"{cumulative:>13.1f} {own:>10.1f}  {name}")
+
+        print(f"\n=== Ejecución de app.py ({args.reruns} reruns) ===")
+        print(f"{'ruta':<8} {'frío ms':>9} {'rerun medio ms':>15} {'rerun p95 ms':>13}")
+        for path in PATH_SESSIONS:
+            times = script_times(path, args.reruns, db_path)
+            warm = sorted(times["warm"]) or [0.0]
+            p95 = warm[min(len(warm) - 1, int(len(warm) * 0.95))]
+            print(
+                f"{path:<8} {times['cold'] * 1000:>9.1f} {statistics.mean(warm) * 1000:>15.1f} {p95 * 1000:>13.1f}"
+                + (f"  ⚠️ {times['errors']}" if times["errors"] else "")
+            )
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/summit_registrations.py
+"""
+Prueba de estrés de las inscripciones (modules/beyond_summit/summit_registrations.py).
+
+Muchos hilos martillan un mismo Summit con cupos limitados: cada usuario se
+inscribe (a veces repitiendo la petición con la misma clave de idempotencia,
+como un doble clic) y una parte cancela después, lo que promueve a quienes
+esperan. Al final verifica:
+  * que nunca hubo sobreventa (confirmados == reservados <= cupos);
+  * que ningún usuario tiene dos inscripciones;
+  * que con plazas libres no queda nadie en la lista de espera;
+y reporta la latencia de inscribirse/cancelar (p50/p95/p99) y ops/s.
+
+Uso:
+    python -m benchmarks.summit_registrations [--users 5000] [--threads 64] [--capacity 500]
+
+Corre sobre una base de datos temporal nueva.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de estrés de inscripciones.")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--capacity", type=int, default=500)
+    parser.add_argument("--retry", type=float, default=0.2, help="fracción de peticiones repetidas")
+    parser.add_argument("--cancel", type=float, default=0.2, help="fracción de usuarios que cancelan")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="beyond-reg-")
+    os.environ["BEYOND_DB"] = os.path.join(tmpdir, "bench.db")
+
+    from db.connection import execute_query, fetch_all, fetch_one
+    from db.models import ensure_schema
+    from modules.beyond_summit import summit_registrations as registrations
+
+    ensure_schema()
+    summit_id = execute_query(
+        "INSERT INTO summits (title, date, description) VALUES (?, ?, ?)", ("Estrés", "2026-01-01", "")
+    )
+    registrations.set_capacity(summit_id, args.capacity).result()
+
+    latencies = {"register": [], "cancel": []}
+    lock = threading.Lock()
+
+    def timed(kind, fn, *fn_args):
+        start = time.perf_counter()
+        result = fn(*fn_args).result()
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[kind].append(elapsed)
+        return result
+
+    def user_flow(user_id):
+        key = uuid.uuid4().hex
+        first = timed("register", registrations.register, summit_id, user_id, key)
+        if random.random() < args.retry:
+            # Doble clic / reintento de red: misma clave, misma inscripción. El estado
+            # solo puede haber avanzado de la lista de espera a confirmado.
+            again = timed("register", registrations.register, summit_id, user_id, key)
+            assert again == first or (first, again) == (registrations.WAITLIST, registrations.CONFIRMED), (
+                user_id, first, again
+            )
+        if random.random() < args.cancel:
+            timed("cancel", registrations.cancel, summit_id, user_id)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(user_flow, range(1, args.users + 1)))
+    wall = time.perf_counter() - started
+
+    capacity, reserved = fetch_one(
+        "SELECT capacity, reserved FROM summit_capacity WHERE summit_id = ?", (summit_id,)
+    )
+    counts = dict(fetch_all(
+        "SELECT status, COUNT(*) FROM summit_registrations WHERE summit_id = ? GROUP BY status", (summit_id,)
+    ))
+    duplicates = fetch_one(
+        "SELECT COUNT(*) FROM (SELECT user_id FROM summit_registrations WHERE summit_id = ? "
+        "GROUP BY user_id HAVING COUNT(*) > 1)", (summit_id,)
+    )[0]
+    confirmed = counts.get(registrations.CONFIRMED, 0)
+    waiting = counts.get(registrations.WAITLIST, 0)
+    total_ops = sum(len(values) for values in latencies.values())
+
+    print(f"Usuarios {args.users} · hilos {args.threads} · cupos {capacity} · {total_ops / wall:.0f} ops/s en {wall:.1f} s")
+    for kind, values in latencies.items():
+        print(
+            f"{kind:<9} n={len(values):<6} p50 {percentile(values, 0.5) * 1000:6.1f} ms  "
+            f"p95 {percentile(values, 0.95) * 1000:6.1f} ms  p99 {percentile(values, 0.99) * 1000:6.1f} ms"
+        )
+    print(f"Confirmados {confirmed} · reservados {reserved} · en espera {waiting} · "
+          f"canceladas {counts.get(registrations.CANCELLED, 0)} · usuarios duplicados {duplicates}")
+
+    checks = [
+        ("sin sobreventa", confirmed == reserved <= capacity),
+        ("sin inscripciones duplicadas", duplicates == 0),
+        ("lista de espera solo con cupos llenos", waiting == 0 or reserved == capacity),
+    ]
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+    if not all(ok for _, ok in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/summit_stream.py
+"""
+Prueba de carga del hub en vivo del Summit (modules/beyond_summit/summit_stream.py).
+
+Simula `--viewers` sesiones que hacen poll cada `--refresh` segundos (como el
+fragmento de Streamlit), un porcentaje de consumidores lentos que leen cada
+10 refrescos, y publicadores de chat y reacciones a tasa fija. Reporta:
+  * latencia de poll y de publicación (p50/p99);
+  * polls/s alcanzados frente a los esperados y mensajes entregados/descartados;
+  * uso de CPU del proceso y filas de chat persistidas frente a publicadas.
+
+Uso:
+    python -m benchmarks.summit_stream [--viewers 1000] [--duration 20] [--chat-rate 20] [--reaction-rate 200]
+
+Corre sobre una base de datos temporal nueva.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del hub en vivo.")
+    parser.add_argument("--viewers", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=20.0, help="segundos")
+    parser.add_argument("--refresh", type=float, default=2.0, help="intervalo de poll de cada sesión")
+    parser.add_argument("--slow", type=float, default=0.05, help="fracción de consumidores lentos")
+    parser.add_argument("--chat-rate", type=float, default=20.0, help="mensajes por segundo")
+    parser.add_argument("--reaction-rate", type=float, default=200.0, help="reacciones por segundo")
+    parser.add_argument("--threads", type=int, default=16, help="hilos que simulan las sesiones")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="beyond-live-")
+    os.environ["BEYOND_DB"] = os.path.join(tmpdir, "bench.db")
+
+    from db.connection import execute_query, fetch_one
+    from db.models import ensure_schema
+    from db.writer import get_writer
+    from modules.beyond_summit import summit_stream
+
+    ensure_schema()
+    summit_id = execute_query(
+        "INSERT INTO summits (title, date, description) VALUES (?, ?, ?)", ("Carga", "2026-01-01", "")
+    )
+    room = summit_stream.hub.room(summit_id)
+    subs = [room.join(f"s{i}", i, f"viewer{i}") for i in range(args.viewers)]
+    slow = set(random.sample(range(args.viewers), int(args.viewers * args.slow)))
+
+    poll_times, post_times = [], []
+    delivered = [0] * args.threads
+    dropped = [0] * args.threads
+    stop = threading.Event()
+
+    def viewers(worker):
+        mine = list(range(worker, args.viewers, args.threads))
+        # Arranques escalonados, como sesiones que entraron en distintos momentos
+        next_poll = {i: time.monotonic() + random.random() * args.refresh for i in mine}
+        local = []
+        while not stop.is_set():
+            now = time.monotonic()
+            for i in mine:
+                if now >= next_poll[i]:
+                    start = time.perf_counter()
+                    update = subs[i].poll()
+                    local.append(time.perf_counter() - start)
+                    delivered[worker] += len(update.messages)
+                    dropped[worker] += update.dropped
+                    next_poll[i] = now + (args.refresh * 10 if i in slow else args.refresh)
+            time.sleep(0.005)
+        poll_times.extend(local)
+
+    def publisher(rate, action):
+        interval = 1.0 / rate if rate else None
+        local = []
+        next_at = time.monotonic()
+        while interval and not stop.is_set():
+            start = time.perf_counter()
+            action()
+            local.append(time.perf_counter() - start)
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.monotonic()))
+        post_times.extend(local)
+
+    posted = [0]
+
+    def post():
+        posted[0] += 1
+        random.choice(subs).post(f"mensaje {posted[0]}")
+
+    def react():
+        random.choice(subs).react(random.choice(summit_stream.REACTIONS))
+
+    threads = [threading.Thread(target=viewers, args=(w,)) for w in range(args.threads)]
+    threads.append(threading.Thread(target=publisher, args=(args.chat_rate, post)))
+    threads.append(threading.Thread(target=publisher, args=(args.reaction_rate, react)))
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    summit_stream.chat_buffer.flush()
+    get_writer().flush()
+    persisted = fetch_one("SELECT COUNT(*) FROM summit_chat WHERE summit_id = ?", (summit_id,))[0]
+    expected_polls = (args.viewers - len(slow)) / args.refresh + len(slow) / (args.refresh * 10)
+
+    print(f"Sesiones: {args.viewers} ({len(slow)} lentas) · duración {wall:.1f} s · hilos {args.threads}")
+    print(f"Polls/s: {len(poll_times) / wall:.0f} (esperados ~{expected_polls:.0f})")
+    print(f"Poll   p50 {percentile(poll_times, 0.5) * 1e6:8.1f} µs   p99 {percentile(poll_times, 0.99) * 1e6:8.1f} µs")
+    print(f"Public p50 {percentile(post_times, 0.5) * 1e6:8.1f} µs   p99 {percentile(post_times, 0.99) * 1e6:8.1f} µs")
+    print(f"Mensajes publicados {posted[0]} · entregados {sum(delivered)} · descartados (lentos) {sum(dropped)}")
+    print(f"Chat persistido: {persisted}/{posted[0]} · descartados del buffer: {summit_stream.chat_buffer.dropped}")
+    print(f"Presencia final: {len(room.subscribers)} · CPU {cpu / wall:.0%} de un núcleo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# benchmarks/synthetic.py
+"""
+Generador determinista de datos sintéticos para los benchmarks.
+
+Con la misma semilla y los mismos tamaños produce siempre los mismos
+usuarios, contenidos, Summits y likes (las fechas se toman relativas a `now`):
+  * usuarios `user0000001`… con la contraseña PASSWORD y un reparto de roles
+    parecido al de producción;
+  * videos de YouTube y podcasts con URLs válidas para parse_media_url;
+  * Summits repartidos entre seis meses atrás y seis meses adelante, con cupos;
+  * likes de videos y podcasts con popularidad tipo Zipf y usuarios con
+    gustos agrupados por "temas", fechados en los últimos 30 días.
+Los contadores (like_count, user_counts) los mantienen los triggers y la
+tendencia se recalcula al final con db.trending.rebuild_scores.
+
+Uso:
+    python -m benchmarks.synthetic salida.db [--users 100000] [--videos 20000]
+        [--podcasts 5000] [--summits 2000] [--likes 1000000] [--seed 42]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+PASSWORD = "bench-password"
+
+ROLES = ("user free", "user premium", "coach", "admin")
+ROLE_WEIGHTS = (0.80, 0.15, 0.04, 0.01)
+
+CHUNK = 50_000
+LIKES_WINDOW = 30 * 86400  # los likes se reparten en los últimos 30 días
+
+
+def username(i):
+    return f"user{i:07d}"
+
+
+def youtube_id(prefix, i):
+    """
+    Id de YouTube sintético (11 caracteres) único por prefijo e índice.
+    """
+    return f"{prefix}{i:0{11 - len(prefix)}d}"
+
+
+def video_url(i, prefix="v"):
+    return f"https://www.youtube.com/watch?v={youtube_id(prefix, i)}"
+
+
+def podcast_url(i, prefix="episodio"):
+    return f"https://podcasts.example.com/{prefix}/{i}"
+
+
+def synthetic_likes(n_likes, n_users, n_items, topics=50, seed=7):
+    """
+    Pares (usuario, ítem) únicos, numerados desde 1: cada usuario prefiere un
+    tema y elige ítems de ese tema con probabilidad 0.8, con popularidad Zipf
+    dentro del catálogo.
+    """
+    rng = np.random.default_rng(seed)
+    topics = max(1, min(topics, n_items))
+    per_topic = n_items // topics
+    users = rng.integers(1, n_users + 1, size=int(n_likes * 1.4))
+    user_topic = rng.integers(0, topics, size=n_users + 1)
+    popular = np.minimum(rng.zipf(1.3, size=len(users)), per_topic) - 1
+    in_topic = rng.random(len(users)) < 0.8
+    topic = np.where(in_topic, user_topic[users], rng.integers(0, topics, size=len(users)))
+    items = topic * per_topic + popular + 1
+    pairs = np.unique(users * (n_items + 1) + items)
+    rng.shuffle(pairs)
+    pairs = pairs[:n_likes]
+    return np.column_stack((pairs // (n_items + 1), pairs % (n_items + 1)))
+
+
+def _chunks(rows, size=CHUNK):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(sql, rows):
+    from db.connection import transaction
+
+    for chunk in _chunks(rows):
+        with transaction() as conn:
+            conn.executemany(sql, chunk)
+
+
+def _id_offset(table):
+    from db.connection import fetch_one
+
+    return fetch_one(f"SELECT COALESCE(MAX(id), 0) FROM {table}")[0]
+
+
+def _media_rows(kind, count, url_of):
+    from modules.utils.media import parse_media_url
+
+    for i in range(1, count + 1):
+        media = parse_media_url(url_of(i))
+        yield (
+            f"{kind} sintético {i}", media.url, f"Descripción del {kind.lower()} {i}",
+            media.provider, media.media_id, media.embed_url, media.poster_url,
+        )
+
+
+def generate(users=10_000, videos=2_000, podcasts=500, summits=200, likes=100_000,
+             podcast_likes=None, seed=42, now=None, progress=print):
+    """
+    Llena la base de datos actual (BEYOND_DB) con datos sintéticos. Retorna un
+    dict con los tamaños generados y los rangos de ids de cada tabla.
+    """
+    from db.models import ensure_schema
+    from db import trending
+    from modules.beyond_summit.summit_manager import DEFAULT_TIMEZONE, format_local, status_at
+    from modules.utils.security import hash_password
+
+    ensure_schema()
+    now = int(now or time.time())
+    podcast_likes = likes // 4 if podcast_likes is None else podcast_likes
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+
+    def step(label):
+        progress(f"  {label} ({time.perf_counter() - started:.1f} s)")
+
+    # Usuarios: un solo hash compartido, el KDF no es lo que se mide aquí
+    first_user = _id_offset("users") + 1
+    password = hash_password(PASSWORD)
+    roles = rng.choice(len(ROLES), size=users, p=ROLE_WEIGHTS)
+    _insert(
+        "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+        ((username(i), password, ROLES[roles[i - 1]]) for i in range(1, users + 1))
+    )
+    step(f"{users} usuarios")
+
+    first_video = _id_offset("videos") + 1
+    _insert(
+        "INSERT INTO videos (title, url, description, provider, media_id, embed_url, poster_url) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        _media_rows("Video", videos, video_url)
+    )
+    first_podcast = _id_offset("podcasts") + 1
+    _insert(
+        "INSERT INTO podcasts (title, url, description, provider, media_id, embed_url, poster_url) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        _media_rows("Podcast", podcasts, podcast_url)
+    )
+    step(f"{videos} videos, {podcasts} podcasts")
+
+    # Summits de 1 a 3 horas entre seis meses atrás y seis meses adelante
+    first_summit = _id_offset("summits") + 1
+    starts = now - 180 * 86400 + rng.integers(0, 360 * 86400, size=summits)
+    lengths = rng.integers(1, 4, size=summits) * 3600
+    capacities = rng.integers(50, 1001, size=summits)
+    _insert(
+        "INSERT INTO summits (title, date, description, start_ts, end_ts, timezone, status) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                f"Summit sintético {i + 1}", format_local(int(start), DEFAULT_TIMEZONE, "%Y-%m-%d"),
+                f"Descripción del Summit {i + 1}", int(start), int(start + length), DEFAULT_TIMEZONE,
+                status_at(int(start), int(start + length), now),
+            )
+            for i, (start, length) in enumerate(zip(starts, lengths))
+        )
+    )
+    _insert(
+        "INSERT INTO summit_capacity (summit_id, capacity) VALUES (?, ?)",
+        ((first_summit + i, int(capacity)) for i, capacity in enumerate(capacities))
+    )
+    step(f"{summits} Summits")
+
+    # Likes: los triggers mantienen like_count
+    liked = {"video_likes": 0, "podcast_likes": 0}
+    for label, table, column, total, items, first_item in (
+        ("likes de videos", "video_likes", "video_id", likes, videos, first_video),
+        ("likes de podcasts", "podcast_likes", "podcast_id", podcast_likes, podcasts, first_podcast),
+    ):
+        if not (total and items and users):
+            continue
+        pairs = synthetic_likes(total, users, items, seed=seed + len(table))
+        # En orden (usuario, ítem) el índice UNIQUE crece solo por el final
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        dates = now - rng.integers(0, LIKES_WINDOW, size=len(pairs))
+        _insert(
+            f"INSERT INTO {table} (user_id, {column}, created_at) VALUES (?, ?, ?)",
+            zip(
+                (pairs[:, 0] + first_user - 1).tolist(),
+                (pairs[:, 1] + first_item - 1).tolist(),
+                dates.tolist(),
+            )
+        )
+        liked[table] = len(pairs)
+        step(f"{len(pairs)} {label}")
+
+    trending.rebuild_scores(now)
+    step("tendencia recalculada")
+
+    return {
+        "seed": seed,
+        "users": (first_user, first_user + users - 1),
+        "videos": (first_video, first_video + videos - 1),
+        "podcasts": (first_podcast, first_podcast + podcasts - 1),
+        "summits": (first_summit, first_summit + summits - 1),
+        **liked,
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--videos", type=int, default=2_000)
+    parser.add_argument("--podcasts", type=int, default=500)
+    parser.add_argument("--summits", type=int, default=200)
+    parser.add_argument("--likes", type=int, default=100_000, help="likes de videos")
+    parser.add_argument("--podcast-likes", type=int, default=None, help="por defecto, la cuarta parte de --likes")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una base de datos sintética.")
+    parser.add_argument("output", help="archivo .db a crear (no debe existir)")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        parser.error(f"{args.output} ya existe")
+    os.environ["BEYOND_DB"] = args.output
+
+    print(f"Generando {args.output} (semilla {args.seed})…")
+    generate(
+        users=args.users, videos=args.videos, podcasts=args.podcasts, summits=args.summits,
+        likes=args.likes, podcast_likes=args.podcast_likes, seed=args.seed,
+    )
+    from db.writer import stop_writer
+    stop_writer()
+    print("✅ Listo.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# db/cache.py
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+# Límites de la caché compartida del catálogo
+CACHE_MAXSIZE = 512
+CACHE_TTL = 300  # segundos
+# Caché aparte, más chica, para claves que casi no se repiten
+LOOKUP_MAXSIZE = 128
+LOOKUP_TTL = 60  # segundos
+
+
+class CatalogCache:
+    """
+    Caché LRU con TTL compartida por todas las sesiones del proceso.
+
+    Cada entrada se guarda junto a la versión del catálogo vigente al cargarla;
+    al escribir contenido se incrementa la versión (`bump_version`) y las
+    entradas anteriores dejan de ser visibles, incluso las que se estuvieran
+    cargando en ese momento.
+    """
+
+    def __init__(self, maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            version = self.version
+            entry = self._entries.get((version, key))
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end((version, key))
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = loader()
+        if isinstance(value, list):
+            value = tuple(value)  # los resultados compartidos no deben mutarse
+        with self._lock:
+            if version == self.version:
+                self._entries[(version, key)] = (now + self.ttl, value)
+                self._entries.move_to_end((version, key))
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def bump_version(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+
+catalog_cache = CatalogCache()
+# Búsquedas de texto libre e ids de recomendaciones por usuario: cada clave
+# casi no se repite y en la caché del catálogo desalojarían las páginas calientes
+lookup_cache = CatalogCache(maxsize=LOOKUP_MAXSIZE, ttl=LOOKUP_TTL)
+
+
+def _cached_in(cache, fn):
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        return cache.get_or_load(key, lambda: fn(*args, **kwargs))
+
+    return wrapper
+
+
+def cached_catalog(fn):
+    """
+    Decorador para lecturas del catálogo: cachea el resultado según la
+    función, sus argumentos y la versión actual del catálogo.
+    """
+    return _cached_in(catalog_cache, fn)
+
+
+def cached_lookup(fn):
+    """
+    Como cached_catalog, pero en lookup_cache: para lecturas cuyas claves
+    vienen del usuario (texto buscado, ids recomendados) y casi no se repiten.
+    """
+    return _cached_in(lookup_cache, fn)
+
+
+def bump_catalog_version():
+    """
+    Invalida las lecturas cacheadas; llamar después de cada escritura del catálogo.
+    """
+    catalog_cache.bump_version()
+    lookup_cache.bump_version()
@@ -1,57 +1,167 @@
 # db/connection.py
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 
-DB_NAME = "beyond.db"
+DB_NAME = os.environ.get("BEYOND_DB", "beyond.db")
 
-def get_connection():
+# Parámetros del pool de conexiones
+POOL_SIZE = 8
+POOL_TIMEOUT = 10.0       # segundos esperando una conexión libre
+BUSY_TIMEOUT_MS = 5000    # espera de SQLite ante "database is locked"
+STATEMENT_CACHE = 512     # sentencias preparadas por conexión
+
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+_pool_lock = threading.Lock()
+_created = 0
+_local = threading.local()
+
+
+def get_connection(db_name=None):
     """
-    Retorna una conexión a la base de datos SQLite.
+    Abre una conexión nueva a la base de datos SQLite ya configurada.
     Usa row_factory para devolver resultados como diccionarios.
+
+    Los PRAGMAs (WAL, synchronous=NORMAL, busy_timeout) se aplican una
+    sola vez aquí; el resto del código debe pedir conexiones a través de
+    `connection()` para reutilizarlas desde el pool.
     """
-    conn = sqlite3.connect(DB_NAME)
+    conn = sqlite3.connect(
+        db_name or DB_NAME,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE,
+        check_same_thread=False,
+        isolation_level=None,  # autocommit; las transacciones se abren explícitamente
+    )
     conn.row_factory = sqlite3.Row  # Permite acceder a los resultados como diccionario
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
     return conn
 
 
+def _acquire():
+    global _created
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        pass
+    with _pool_lock:
+        if _created < POOL_SIZE:
+            _created += 1
+            try:
+                return get_connection()
+            except Exception:
+                _created -= 1
+                raise
+    return _pool.get(timeout=POOL_TIMEOUT)
+
+
+def _release(conn):
+    global _created
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+        with _pool_lock:
+            _created -= 1
+
+
+@contextmanager
+def connection():
+    """
+    Presta una conexión del pool al hilo actual.
+    Es reentrante: si el hilo ya tiene una conexión prestada, se reutiliza.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield conn
+        return
+    conn = _acquire()
+    _local.conn = conn
+    try:
+        yield conn
+    finally:
+        _local.conn = None
+        _release(conn)
+
+
+@contextmanager
+def transaction():
+    """
+    Ejecuta un bloque dentro de una única transacción (BEGIN IMMEDIATE).
+    Hace commit al salir o rollback si ocurre una excepción.
+    Las transacciones anidadas se unen a la transacción exterior.
+    """
+    with connection() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+
+def close_all():
+    """
+    Cierra todas las conexiones libres del pool (p. ej. al cambiar de base de datos).
+    """
+    global _created
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            break
+        conn.close()
+        with _pool_lock:
+            _created -= 1
+
+
+def set_database(db_name):
+    """
+    Cambia la base de datos usada por el pool (scripts, benchmarks).
+    """
+    global DB_NAME
+    from db.writer import stop_writer
+    stop_writer()
+    close_all()
+    DB_NAME = db_name
+
+
 def execute_query(query, params=None):
     """
     Ejecuta un query de escritura (INSERT, UPDATE, DELETE).
+    Pasa por el escritor único (db/writer.py) y espera a que se confirme;
+    dentro de un bloque `transaction()` se ejecuta directamente en esa transacción.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    if params:
-        cursor.execute(query, params)
-    else:
-        cursor.execute(query)
-    conn.commit()
-    conn.close()
+    conn = getattr(_local, "conn", None)
+    if conn is not None and conn.in_transaction:
+        return conn.execute(query, params or ()).lastrowid
+    # Importar aquí para evitar dependencias circulares
+    from db.writer import submit_write
+    return submit_write(query, params).result()
 
 
 def fetch_all(query, params=None):
     """
     Ejecuta un SELECT que retorna múltiples filas.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    if params:
-        cursor.execute(query, params)
-    else:
-        cursor.execute(query)
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    with connection() as conn:
+        return conn.execute(query, params or ()).fetchall()
 
 
 def fetch_one(query, params=None):
     """
     Ejecuta un SELECT que retorna una sola fila.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    if params:
-        cursor.execute(query, params)
-    else:
-        cursor.execute(query)
-    row = cursor.fetchone()
-    conn.close()
-    return row
+    with connection() as conn:
+        return conn.execute(query, params or ()).fetchone()
@@ -0,0 +1,134 @@
+# db/events.py
+import time
+from collections import Counter
+
+from db.connection import fetch_all
+from db.trending import record_views
+from db.writer import BatchBuffer, get_writer
+
+# Tipos de evento que se registran
+EVENT_TYPES = ("view", "play", "like", "login")
+
+# Los eventos se acumulan en memoria y se escriben en lotes (ver BatchBuffer)
+FLUSH_INTERVAL = 1.0  # segundos
+FLUSH_BATCH = 1000
+# Tope del buffer: si la base de datos no da abasto se descartan los más antiguos
+BUFFER_SIZE = 50000
+
+HOUR = 3600
+DAY = 86400
+
+# Claves de los rollups (ver _m006_events en db/models.py)
+_CONTENT_KEY = "bucket, event_type, content_type, content_id, role"
+_TOTALS_KEY = "bucket, event_type, role"
+
+
+def _persist(conn, events):
+    """
+    Inserta un lote en `events`, suma sus conteos a los rollups por hora y día
+    y las vistas a la tendencia, en la misma transacción del escritor.
+    """
+    conn.executemany(
+        "INSERT INTO events (ts, event_type, content_type, content_id, user_id, role) VALUES (?, ?, ?, ?, ?, ?)",
+        events
+    )
+    hourly, daily, totals = Counter(), Counter(), Counter()
+    for ts, event_type, content_type, content_id, _user_id, role in events:
+        hourly[(ts - ts % HOUR, event_type, content_type, content_id, role)] += 1
+        daily[(ts - ts % DAY, event_type, content_type, content_id, role)] += 1
+        totals[(ts - ts % DAY, event_type, role)] += 1
+    for table, columns, counts in (
+        ("event_rollups_hourly", _CONTENT_KEY, hourly),
+        ("event_rollups_daily", _CONTENT_KEY, daily),
+        ("event_totals_daily", _TOTALS_KEY, totals),
+    ):
+        placeholders = ", ".join("?" for _ in range(len(columns.split(",")) + 1))
+        conn.executemany(
+            f"""
+            INSERT INTO {table} ({columns}, count) VALUES ({placeholders})
+            ON CONFLICT ({columns}) DO UPDATE SET count = count + excluded.count
+            """,
+            [key + (count,) for key, count in counts.items()]
+        )
+    record_views(conn, events)
+    return len(events)
+
+
+event_buffer = BatchBuffer(_persist, FLUSH_INTERVAL, FLUSH_BATCH, BUFFER_SIZE, name="beyond-events")
+
+
+def track_event(event_type, claims=None, content_type="", content_id=0):
+    """
+    Registra un evento (fire-and-forget) con el usuario y rol de `claims`.
+    """
+    claims = claims or {}
+    event_buffer.add(
+        (int(time.time()), event_type, content_type, content_id, claims.get("user_id"), claims.get("role") or "")
+    )
+
+
+def flush_events():
+    """
+    Escribe los eventos pendientes y espera a que queden confirmados.
+    """
+    event_buffer.flush()
+    get_writer().flush()
+
+
+def _range_filter(start_ts, end_ts):
+    return "bucket >= ? AND bucket < ?", (start_ts, end_ts)
+
+
+def event_series(start_ts, end_ts, granularity="day", event_type=None):
+    """
+    Totales por bucket y tipo de evento entre start_ts y end_ts (epoch),
+    leídos solo de los rollups: [(bucket, event_type, total), ...].
+    """
+    table = "event_totals_daily" if granularity == "day" else "event_rollups_hourly"
+    where, params = _range_filter(start_ts, end_ts)
+    if event_type:
+        where += " AND event_type = ?"
+        params += (event_type,)
+    return fetch_all(
+        f"SELECT bucket, event_type, SUM(count) FROM {table} WHERE {where} "
+        f"GROUP BY bucket, event_type ORDER BY bucket",
+        params
+    )
+
+
+def totals_by_role(start_ts, end_ts):
+    """
+    [(role, event_type, total), ...] en el rango, desde los totales diarios.
+    """
+    where, params = _range_filter(start_ts, end_ts)
+    return fetch_all(
+        f"SELECT role, event_type, SUM(count) FROM event_totals_daily WHERE {where} "
+        f"GROUP BY role, event_type ORDER BY role, event_type",
+        params
+    )
+
+
+def top_content(start_ts, end_ts, event_type="play", limit=10):
+    """
+    Contenidos con más eventos del tipo dado en el rango:
+    [(content_type, content_id, title, total), ...].
+    """
+    where, params = _range_filter(start_ts, end_ts)
+    return fetch_all(
+        f"""
+        SELECT r.content_type, r.content_id,
+               COALESCE(v.title, p.title, '#' || r.content_id) AS title, r.total
+        FROM (
+            SELECT content_type, content_id, SUM(count) AS total
+            FROM event_rollups_daily
+            WHERE {where} AND event_type = ? AND content_type != ''
+            GROUP BY content_type, content_id
+            ORDER BY total DESC
+            LIMIT ?
+        ) AS r
+        LEFT JOIN videos v ON r.content_type = 'video' AND v.id = r.content_id
+        LEFT JOIN podcasts p ON r.content_type = 'podcast' AND p.id = r.content_id
+        ORDER BY r.total DESC
+        """,
+        params + (event_type, limit)
+    )
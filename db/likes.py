@@ -1,71 +1,163 @@
-import sqlite3
+import json
+import time
+from db.connection import fetch_all, fetch_one, transaction
+from db.writer import get_writer
 
-DB_PATH = "beyond.db"
+# like/unlike retornan un Future del escritor; usar .result() antes de releer los contadores
+
+def _remove_like(conn, kind, likes_table, column, user_id, item_id):
+    """
+    Borra un like dentro de la operación del escritor y lo descuenta de la
+    tendencia y del modelo de recomendaciones. Retorna True si existía.
+    """
+    from db import trending
+    from db.recommendations import record_like
+
+    row = conn.execute(
+        f"SELECT created_at FROM {likes_table} WHERE user_id = ? AND {column} = ?", (user_id, item_id)
+    ).fetchone()
+    if not row:
+        return False
+    conn.execute(f"DELETE FROM {likes_table} WHERE user_id = ? AND {column} = ?", (user_id, item_id))
+    trending.record_unlike(conn, kind, item_id, row[0])
+    record_like(conn, kind, user_id, item_id, -1)
+    return True
+
+def _toggle_like(kind, likes_table, column, user_id, item_id, sign):
+    """
+    Operación del escritor: inserta (+1) o borra (-1) el like con su fecha y,
+    si cambió algo, actualiza la tendencia y avisa al modelo de
+    recomendaciones con la misma conexión.
+    """
+    from db import trending
+    from db.recommendations import record_like
+
+    def op(conn):
+        if sign < 0:
+            _remove_like(conn, kind, likes_table, column, user_id, item_id)
+            return None
+        now = int(time.time())
+        cursor = conn.execute(
+            f"INSERT OR IGNORE INTO {likes_table} (user_id, {column}, created_at) VALUES (?, ?, ?)",
+            (user_id, item_id, now)
+        )
+        if cursor.rowcount:
+            trending.record_like(conn, kind, item_id, now)
+            record_like(conn, kind, user_id, item_id, 1)
+        return cursor.lastrowid
+
+    return get_writer().submit(op, key=(f"{kind}_like", user_id, item_id))
+
+def delete_user_likes(conn, user_id):
+    """
+    Borra todos los likes de un usuario (p. ej. al eliminarlo) dentro de la
+    operación del escritor, descontando cada uno como un unlike.
+    """
+    for kind, likes_table, column in (("video", "video_likes", "video_id"), ("podcast", "podcast_likes", "podcast_id")):
+        for (item_id,) in conn.execute(
+            f"SELECT {column} FROM {likes_table} WHERE user_id = ?", (user_id,)
+        ).fetchall():
+            _remove_like(conn, kind, likes_table, column, user_id, item_id)
 
 def like_video(user_id, video_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT OR IGNORE INTO video_likes (user_id, video_id) VALUES (?, ?)", (user_id, video_id))
-        conn.commit()
-    finally:
-        conn.close()
+    return _toggle_like("video", "video_likes", "video_id", user_id, video_id, 1)
 
 def unlike_video(user_id, video_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM video_likes WHERE user_id = ? AND video_id = ?", (user_id, video_id))
-        conn.commit()
-    finally:
-        conn.close()
+    return _toggle_like("video", "video_likes", "video_id", user_id, video_id, -1)
 
 def get_video_likes(video_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM video_likes WHERE video_id = ?", (video_id,))
-    count = cursor.fetchone()[0]
-    conn.close()
-    return count
+    row = fetch_one("SELECT like_count FROM videos WHERE id = ?", (video_id,))
+    return row[0] if row else 0
 
 def user_liked_video(user_id, video_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT 1 FROM video_likes WHERE user_id = ? AND video_id = ?", (user_id, video_id))
-    liked = cursor.fetchone() is not None
-    conn.close()
-    return liked
+    row = fetch_one("SELECT 1 FROM video_likes WHERE user_id = ? AND video_id = ?", (user_id, video_id))
+    return row is not None
 
 def like_podcast(user_id, podcast_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT OR IGNORE INTO podcast_likes (user_id, podcast_id) VALUES (?, ?)", (user_id, podcast_id))
-        conn.commit()
-    finally:
-        conn.close()
+    return _toggle_like("podcast", "podcast_likes", "podcast_id", user_id, podcast_id, 1)
 
 def unlike_podcast(user_id, podcast_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM podcast_likes WHERE user_id = ? AND podcast_id = ?", (user_id, podcast_id))
-        conn.commit()
-    finally:
-        conn.close()
+    return _toggle_like("podcast", "podcast_likes", "podcast_id", user_id, podcast_id, -1)
 
 def get_podcast_likes(podcast_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM podcast_likes WHERE podcast_id = ?", (podcast_id,))
-    count = cursor.fetchone()[0]
-    conn.close()
-    return count
+    row = fetch_one("SELECT like_count FROM podcasts WHERE id = ?", (podcast_id,))
+    return row[0] if row else 0
 
 def user_liked_podcast(user_id, podcast_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT 1 FROM podcast_likes WHERE user_id = ? AND podcast_id = ?", (user_id, podcast_id))
-    liked = cursor.fetchone() is not None
-    conn.close()
-    return liked
+    row = fetch_one("SELECT 1 FROM podcast_likes WHERE user_id = ? AND podcast_id = ?", (user_id, podcast_id))
+    return row is not None
+
+def _likes_summary(content_table, likes_table, column, content_ids, user_id=None):
+    """
+    Retorna {content_id: (likes, liked)} para todos los ids en una sola consulta.
+    Los ids sin likes (o inexistentes) aparecen con (0, False).
+    """
+    content_ids = list(content_ids)
+    summary = {cid: (0, False) for cid in content_ids}
+    if not content_ids:
+        return summary
+    rows = fetch_all(
+        f"SELECT c.id, c.like_count, EXISTS("
+        f"SELECT 1 FROM {likes_table} l WHERE l.user_id = ? AND l.{column} = c.id) "
+        f"FROM {content_table} c WHERE c.id IN (SELECT value FROM json_each(?))",
+        (user_id, json.dumps(content_ids))
+    )
+    for cid, count, liked in rows:
+        summary[cid] = (count, bool(liked))
+    return summary
+
+def get_videos_likes_summary(video_ids, user_id=None):
+    return _likes_summary("videos", "video_likes", "video_id", video_ids, user_id)
+
+def get_podcasts_likes_summary(podcast_ids, user_id=None):
+    return _likes_summary("podcasts", "podcast_likes", "podcast_id", podcast_ids, user_id)
+
+def get_most_liked_videos(limit=10):
+    return fetch_all(
+        "SELECT id, title, url, description, like_count FROM videos ORDER BY like_count DESC LIMIT ?",
+        (limit,)
+    )
+
+def get_most_liked_podcasts(limit=10):
+    return fetch_all(
+        "SELECT id, title, url, description, like_count FROM podcasts ORDER BY like_count DESC LIMIT ?",
+        (limit,)
+    )
+
+_COUNTERS = (
+    ("videos", "video_likes", "video_id"),
+    ("podcasts", "podcast_likes", "podcast_id"),
+)
+
+def check_like_counters(repair=False):
+    """
+    Compara like_count con el conteo real de las tablas de likes.
+    Retorna una lista de (tabla, id, guardado, real); con repair=True corrige las diferencias.
+    """
+    drift = []
+    with transaction() as conn:
+        for content_table, likes_table, column in _COUNTERS:
+            rows = conn.execute(f"""
+                SELECT c.id, c.like_count, COUNT(l.id)
+                FROM {content_table} c LEFT JOIN {likes_table} l ON l.{column} = c.id
+                GROUP BY c.id HAVING c.like_count != COUNT(l.id)
+            """).fetchall()
+            for cid, stored, actual in rows:
+                drift.append((content_table, cid, stored, actual))
+                if repair:
+                    conn.execute(f"UPDATE {content_table} SET like_count = ? WHERE id = ?", (actual, cid))
+    return drift
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verifica los contadores de likes.")
+    parser.add_argument("--repair", action="store_true", help="Corrige los contadores desalineados")
+    args = parser.parse_args()
+    drift = check_like_counters(repair=args.repair)
+    for content_table, cid, stored, actual in drift:
+        print(f"{content_table} #{cid}: like_count={stored}, real={actual}")
+    if not drift:
+        print("✅ Contadores de likes consistentes.")
+    elif args.repair:
+        print(f"🔧 {len(drift)} contadores reparados.")
@@ -0,0 +1,480 @@
+# db/models.py
+import threading
+from db.connection import transaction
+from db.queries import create_search_index
+from modules.utils.security import hash_password
+
+# ===============================
+# Migraciones numeradas
+# ===============================
+# Cada migración se aplica una sola vez por base de datos y queda registrada
+# en schema_version. Nunca se edita una migración ya publicada: los cambios
+# de esquema se agregan como una migración nueva al final de MIGRATIONS.
+
+
+def _m001_base_schema(cursor):
+    """
+    Tablas base, roles por defecto y admin inicial.
+    """
+    # Tabla de roles
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS roles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    )
+    """)
+
+    # Insertar roles por defecto si no existen
+    default_roles = ["admin", "user free", "user premium", "coach"]
+    for role in default_roles:
+        cursor.execute("INSERT OR IGNORE INTO roles (name) VALUES (?)", (role,))
+
+    # Tabla de usuarios (role ahora referencia a roles.name)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'user free',
+        FOREIGN KEY (role) REFERENCES roles(name)
+    )
+    """)
+
+    # Tabla de videos
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS videos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        description TEXT
+    )
+    """)
+
+    # Tabla de podcasts
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS podcasts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        description TEXT
+    )
+    """)
+
+    # Tabla de summits
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS summits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        date TEXT NOT NULL,
+        description TEXT
+    )
+    """)
+
+    # Tabla de likes para videos
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS video_likes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        video_id INTEGER NOT NULL,
+        UNIQUE(user_id, video_id),
+        FOREIGN KEY (user_id) REFERENCES users(id),
+        FOREIGN KEY (video_id) REFERENCES videos(id)
+    )
+    """)
+
+    # Tabla de likes para podcasts
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS podcast_likes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        podcast_id INTEGER NOT NULL,
+        UNIQUE(user_id, podcast_id),
+        FOREIGN KEY (user_id) REFERENCES users(id),
+        FOREIGN KEY (podcast_id) REFERENCES podcasts(id)
+    )
+    """)
+
+    # Crear un admin inicial si no existe
+    cursor.execute("SELECT * FROM users WHERE username = ?", ("admin",))
+    if not cursor.fetchone():
+        cursor.execute(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+            ("admin", hash_password("admin123"), "admin")
+        )
+
+
+def _m002_like_counters(cursor):
+    """
+    Contadores desnormalizados de likes (videos.like_count, podcasts.like_count)
+    mantenidos por triggers sobre las tablas de likes.
+    """
+    for content_table, likes_table, column in (
+        ("videos", "video_likes", "video_id"),
+        ("podcasts", "podcast_likes", "podcast_id"),
+    ):
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({content_table})")]
+        if "like_count" not in columns:
+            cursor.execute(f"ALTER TABLE {content_table} ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0")
+            # Backfill de las filas existentes
+            cursor.execute(f"""
+            UPDATE {content_table} SET like_count = (
+                SELECT COUNT(*) FROM {likes_table} WHERE {likes_table}.{column} = {content_table}.id
+            )
+            """)
+
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{likes_table}_insert AFTER INSERT ON {likes_table}
+        BEGIN
+            UPDATE {content_table} SET like_count = like_count + 1 WHERE id = NEW.{column};
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{likes_table}_delete AFTER DELETE ON {likes_table}
+        BEGIN
+            UPDATE {content_table} SET like_count = like_count - 1 WHERE id = OLD.{column};
+        END
+        """)
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{content_table}_like_count ON {content_table}(like_count DESC)"
+        )
+
+
+def _m003_search_index(cursor):
+    """
+    Índices FTS5 de búsqueda (ver db/queries.py).
+    """
+    create_search_index(cursor, ("videos", "podcasts", "summits"))
+
+
+def _m004_media_columns(cursor):
+    """
+    Columnas de ingesta de medios: proveedor + id canónico (únicos) y
+    URLs de embed/póster precalculadas. Las filas antiguas se completan con
+    `python -m modules.utils.media --backfill`.
+    """
+    for table in ("videos", "podcasts"):
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+        for column in ("provider", "media_id", "embed_url", "poster_url"):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+        cursor.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_media ON {table}(provider, media_id) "
+            f"WHERE media_id IS NOT NULL"
+        )
+
+
+def _m005_like_indexes(cursor):
+    """
+    Índices que faltaban para contar y borrar likes por contenido.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_video_likes_video ON video_likes(video_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_podcast_likes_podcast ON podcast_likes(podcast_id)")
+
+
+def _m006_events(cursor):
+    """
+    Registro de eventos (append-only) y rollups por hora y día, por contenido
+    y rol, más los totales diarios por rol; se incrementan al escribir cada
+    lote (ver db/events.py).
+    Los eventos sin contenido (login) usan content_type '' y content_id 0.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts INTEGER NOT NULL,
+        event_type TEXT NOT NULL,
+        content_type TEXT NOT NULL DEFAULT '',
+        content_id INTEGER NOT NULL DEFAULT 0,
+        user_id INTEGER,
+        role TEXT NOT NULL DEFAULT ''
+    )
+    """)
+    for table in ("event_rollups_hourly", "event_rollups_daily"):
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            bucket INTEGER NOT NULL,
+            event_type TEXT NOT NULL,
+            content_type TEXT NOT NULL,
+            content_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, event_type, content_type, content_id, role)
+        ) WITHOUT ROWID
+        """)
+    # Totales diarios sin el contenido: las series y el desglose por rol leen pocas filas por día
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS event_totals_daily (
+        bucket INTEGER NOT NULL,
+        event_type TEXT NOT NULL,
+        role TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (bucket, event_type, role)
+    ) WITHOUT ROWID
+    """)
+
+
+def _m007_summit_chat(cursor):
+    """
+    Chat de las sesiones en vivo del Summit (se escribe en lotes, ver summit_stream).
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS summit_chat (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        summit_id INTEGER NOT NULL,
+        user_id INTEGER,
+        username TEXT NOT NULL,
+        message TEXT NOT NULL,
+        ts REAL NOT NULL,
+        FOREIGN KEY (summit_id) REFERENCES summits(id) ON DELETE CASCADE
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_summit_chat_summit ON summit_chat(summit_id, id)")
+
+
+def _m008_summit_replays(cursor):
+    """
+    Repeticiones de los Summits con capítulos. Cada repetición guarda además
+    los inicios de sus capítulos empaquetados y ordenados (chapter_starts)
+    para ubicar el capítulo de un instante con búsqueda binaria.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS summit_replays (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        summit_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        embed_url TEXT,
+        poster_url TEXT,
+        chapter_starts BLOB NOT NULL DEFAULT x'',
+        FOREIGN KEY (summit_id) REFERENCES summits(id) ON DELETE CASCADE
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_summit_replays_summit ON summit_replays(summit_id, id)")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS replay_chapters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        replay_id INTEGER NOT NULL,
+        start INTEGER NOT NULL,
+        speaker TEXT NOT NULL DEFAULT '',
+        title TEXT NOT NULL,
+        UNIQUE (replay_id, start),
+        FOREIGN KEY (replay_id) REFERENCES summit_replays(id) ON DELETE CASCADE
+    )
+    """)
+    create_search_index(cursor, ("replay_chapters",))
+
+
+def _m009_summit_schedule(cursor):
+    """
+    Horario normalizado de los Summits: inicio/fin en epoch (UTC), zona horaria
+    de origen y estado (upcoming/live/past) que actualiza el tick del
+    planificador. Las fechas antiguas se completan con
+    `python -m modules.beyond_summit.summit_manager --backfill`.
+    """
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(summits)")]
+    for column, kind in (("start_ts", "INTEGER"), ("end_ts", "INTEGER"), ("timezone", "TEXT"), ("status", "TEXT")):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE summits ADD COLUMN {column} {kind}")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_summits_start ON summits(start_ts, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_summits_end ON summits(end_ts)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_summits_status ON summits(status, start_ts)")
+
+
+def _m010_summit_registrations(cursor):
+    """
+    Inscripciones a los Summits: una fila contador por Summit (cupos y
+    reservados, nunca más reservados que cupos) y las inscripciones con su
+    clave de idempotencia; la lista de espera se atiende por orden de id.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS summit_capacity (
+        summit_id INTEGER PRIMARY KEY,
+        capacity INTEGER,
+        reserved INTEGER NOT NULL DEFAULT 0,
+        CHECK (capacity IS NULL OR reserved <= capacity),
+        FOREIGN KEY (summit_id) REFERENCES summits(id) ON DELETE CASCADE
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS summit_registrations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        summit_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        idempotency_key TEXT UNIQUE,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        UNIQUE (summit_id, user_id),
+        FOREIGN KEY (summit_id) REFERENCES summits(id) ON DELETE CASCADE,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_summit_registrations_status ON summit_registrations(summit_id, status, id)"
+    )
+
+
+def _m011_user_admin(cursor):
+    """
+    Administración de usuarios: índice (role, username) para filtrar por rol
+    paginando por nombre, índice de inscripciones por usuario y conteo de usuarios por rol mantenido por triggers,
+    para mostrar totales sin recorrer la tabla.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role, username)")
+    # Para borrar las inscripciones de un usuario sin recorrer la tabla
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_summit_registrations_user ON summit_registrations(user_id)"
+    )
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS user_counts (
+        role TEXT PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("DELETE FROM user_counts")
+    cursor.execute("INSERT INTO user_counts (role, total) SELECT role, COUNT(*) FROM users GROUP BY role")
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_users_count_insert AFTER INSERT ON users
+    BEGIN
+        INSERT INTO user_counts (role, total) VALUES (NEW.role, 1)
+        ON CONFLICT (role) DO UPDATE SET total = total + 1;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_users_count_delete AFTER DELETE ON users
+    BEGIN
+        UPDATE user_counts SET total = total - 1 WHERE role = OLD.role;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_users_count_role AFTER UPDATE OF role ON users
+    WHEN NEW.role IS NOT OLD.role
+    BEGIN
+        UPDATE user_counts SET total = total - 1 WHERE role = OLD.role;
+        INSERT INTO user_counts (role, total) VALUES (NEW.role, 1)
+        ON CONFLICT (role) DO UPDATE SET total = total + 1;
+    END
+    """)
+
+
+def _m012_role_permissions(cursor):
+    """
+    Capacidades de cada rol (ver auth/permissions.py). Los roles por defecto
+    reciben sus permisos iniciales; los roles personalizados existentes
+    quedan sin permisos hasta que un admin se los asigne.
+    """
+    from auth.permissions import DEFAULT_PERMISSIONS
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS role_permissions (
+        role TEXT NOT NULL,
+        capability TEXT NOT NULL,
+        PRIMARY KEY (role, capability),
+        FOREIGN KEY (role) REFERENCES roles(name) ON DELETE CASCADE
+    ) WITHOUT ROWID
+    """)
+    for role, capabilities in DEFAULT_PERMISSIONS.items():
+        if cursor.execute("SELECT 1 FROM roles WHERE name = ?", (role,)).fetchone():
+            cursor.executemany(
+                "INSERT OR IGNORE INTO role_permissions (role, capability) VALUES (?, ?)",
+                [(role, capability) for capability in capabilities]
+            )
+
+
+def _m013_trending(cursor):
+    """
+    Ranking por tendencia (ver db/trending.py): fecha de cada like, puntaje
+    con decaimiento exponencial guardado en log en videos/podcasts.trend_score
+    (-1e300 = sin actividad) y likes por semana para "lo más gustado de la
+    semana". Ambos órdenes se leen de un índice.
+    """
+    for content_table, likes_table in (("videos", "video_likes"), ("podcasts", "podcast_likes")):
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({likes_table})")]
+        if "created_at" not in columns:
+            # Los likes anteriores quedan sin fecha (NULL): no cuentan para la tendencia
+            cursor.execute(f"ALTER TABLE {likes_table} ADD COLUMN created_at INTEGER")
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({content_table})")]
+        if "trend_score" not in columns:
+            cursor.execute(f"ALTER TABLE {content_table} ADD COLUMN trend_score REAL NOT NULL DEFAULT -1e300")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{content_table}_trend ON {content_table}(trend_score, id)"
+        )
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS weekly_likes (
+        content_type TEXT NOT NULL,
+        week INTEGER NOT NULL,
+        content_id INTEGER NOT NULL,
+        likes INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (content_type, week, content_id)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_weekly_likes_rank ON weekly_likes(content_type, week, likes, content_id)"
+    )
+
+
+MIGRATIONS = [
+    (1, "esquema base", _m001_base_schema),
+    (2, "contadores de likes", _m002_like_counters),
+    (3, "búsqueda de texto completo", _m003_search_index),
+    (4, "ingesta de medios", _m004_media_columns),
+    (5, "índices de likes", _m005_like_indexes),
+    (6, "eventos y rollups", _m006_events),
+    (7, "chat del Summit", _m007_summit_chat),
+    (8, "repeticiones del Summit", _m008_summit_replays),
+    (9, "horario de los Summits", _m009_summit_schedule),
+    (10, "inscripciones a los Summits", _m010_summit_registrations),
+    (11, "administración de usuarios", _m011_user_admin),
+    (12, "permisos por rol", _m012_role_permissions),
+    (13, "tendencias", _m013_trending),
+]
+
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def current_version(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate():
+    """
+    Aplica las migraciones pendientes, cada una en su propia transacción.
+    La versión se relee dentro de la transacción (BEGIN IMMEDIATE) para que
+    dos procesos no apliquen la misma migración. Retorna las versiones aplicadas.
+    """
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        with transaction() as conn:
+            if current_version(conn) >= version:
+                continue
+            apply(conn.cursor())
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+        applied.append(version)
+    return applied
+
+
+def ensure_schema():
+    """
+    Deja el esquema al día una sola vez por proceso. Las llamadas siguientes
+    (p. ej. en cada rerun de Streamlit) retornan sin tocar la base de datos.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            applied = migrate()
+            if applied:
+                print(f"✅ Migraciones aplicadas: {applied}")
+            _schema_ready = True
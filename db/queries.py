@@ -0,0 +1,113 @@
+# db/queries.py
+import re
+from db.cache import cached_lookup
+from db.connection import fetch_all
+
+# Tablas de contenido indexadas y columnas que retorna la búsqueda
+SEARCH_TABLES = {
+    "videos": "c.id, c.title, c.url, c.description, c.embed_url, c.poster_url",
+    "podcasts": "c.id, c.title, c.url, c.description, c.embed_url, c.poster_url",
+    "summits": "c.id, c.title, c.date, c.description",
+    "replay_chapters": "c.id, c.title, c.speaker, c.replay_id, c.start",
+}
+
+# Columnas indexadas por tabla (por defecto title y description)
+SEARCH_COLUMNS = {
+    "replay_chapters": ("title", "speaker"),
+}
+
+# Peso de cada columna en el ranking BM25 (title, description/speaker)
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def create_search_index(cursor, tables=None):
+    """
+    Crea los índices FTS5 (external content) sobre las columnas de texto de
+    cada tabla, con triggers que los mantienen sincronizados con ella.
+    """
+    for table in tables or SEARCH_TABLES:
+        first, second = SEARCH_COLUMNS.get(table, ("title", "description"))
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_fts",)
+        ).fetchone()
+        if exists:
+            continue
+        cursor.execute(f"""
+        CREATE VIRTUAL TABLE {table}_fts USING fts5(
+            {first}, {second},
+            content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {table}_fts(rowid, {first}, {second})
+            VALUES (NEW.id, NEW.{first}, NEW.{second});
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {table}_fts({table}_fts, rowid, {first}, {second})
+            VALUES ('delete', OLD.id, OLD.{first}, OLD.{second});
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update AFTER UPDATE OF {first}, {second} ON {table}
+        BEGIN
+            INSERT INTO {table}_fts({table}_fts, rowid, {first}, {second})
+            VALUES ('delete', OLD.id, OLD.{first}, OLD.{second});
+            INSERT INTO {table}_fts(rowid, {first}, {second})
+            VALUES (NEW.id, NEW.{first}, NEW.{second});
+        END
+        """)
+        # Indexar el contenido existente
+        cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def build_match_query(text):
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura:
+    cada palabra se busca como prefijo y todas deben aparecer.
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+@cached_lookup
+def search(table, text, limit=20, offset=0):
+    """
+    Búsqueda de texto completo en `table` (videos, podcasts, summits o replay_chapters)
+    ordenada por relevancia BM25. Retorna una lista vacía si no hay texto.
+    """
+    columns = SEARCH_TABLES[table]
+    match = build_match_query(text)
+    if not match:
+        return []
+    return fetch_all(
+        f"SELECT {columns} FROM {table}_fts f JOIN {table} c ON c.id = f.rowid "
+        f"WHERE {table}_fts MATCH ? "
+        f"ORDER BY bm25({table}_fts, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) LIMIT ? OFFSET ?",
+        (match, limit, offset)
+    )
+
+
+def search_videos(text, limit=20, offset=0):
+    return search("videos", text, limit, offset)
+
+
+def search_podcasts(text, limit=20, offset=0):
+    return search("podcasts", text, limit, offset)
+
+
+def search_summits(text, limit=20, offset=0):
+    return search("summits", text, limit, offset)
+
+
+def search_replay_chapters(text, limit=20, offset=0):
+    return search("replay_chapters", text, limit, offset)
@@ -0,0 +1,362 @@
+# db/recommendations.py
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+from db.connection import fetch_all
+from db.writer import get_writer
+
+# Vecinos precalculados por ítem
+TOP_K = 20
+# Likes más recientes de un usuario que se usan (al construir y al recomendar);
+# acota el costo cuadrático de los usuarios con muchísimos likes
+MAX_USER_LIKES = 200
+# Edad máxima del modelo antes de reconstruirlo en segundo plano
+REBUILD_SECONDS = 3600
+# Espera antes de reintentar una reconstrucción que falló
+RETRY_SECONDS = 60
+# Pares (ítem, ítem) por lote al construir, para acotar la memoria
+PAIR_CHUNK = 4_000_000
+
+# tipo -> (tabla de likes, columna del ítem)
+SOURCES = {
+    "video": ("video_likes", "video_id"),
+    "podcast": ("podcast_likes", "podcast_id"),
+}
+
+
+class ItemSimilarity:
+    """
+    Similitud ítem-ítem (coseno) a partir de la coocurrencia de likes.
+
+    La matriz de coocurrencia se guarda dispersa en formato CSR con arreglos
+    de NumPy (indptr/indices/counts) más un delta en memoria con los likes
+    llegados después de construirla. De cada ítem se precalculan sus TOP_K
+    vecinos como una tupla ((id, score), ...), así que recomendar solo suma
+    listas ya calculadas y no toca la matriz.
+
+    Los likes nuevos se aplican de forma incremental: se recalcula la fila
+    completa del ítem y, en cada ítem que el usuario ya tenía, solo el score
+    contra el nuevo. El resto de scores que cambian levemente (por el nuevo
+    total del ítem) se corrigen en la siguiente reconstrucción.
+
+    Cada generación del modelo tiene su propia cola de likes: mientras se
+    construye una nueva, los likes se encolan tanto para el modelo vigente
+    (que sigue respondiendo) como para el nuevo, que los aplica al instalarse.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.table, self.column = SOURCES[kind]
+        self.ids = np.zeros(0, dtype=np.int64)      # fila -> id del ítem
+        self.rows = {}                               # id del ítem -> fila
+        self.likes = np.zeros(0, dtype=np.float64)  # likes por fila
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.int32)
+        self.delta = defaultdict(dict)               # fila -> {fila: coocurrencias extra}
+        self.neighbors = {}                          # id del ítem -> ((id, score), ...)
+        self.pending = None                          # likes por aplicar al modelo vigente
+        self.incoming = None                         # likes para el modelo en construcción
+        self.queues = ()                             # colas a las que encola el escritor
+        self.built_at = None
+        self.failed_at = None
+        self.building = False
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    # ---------- construcción ----------
+    def _snapshot(self, conn):
+        """
+        Lee los pares (usuario, ítem) en el hilo escritor: las escrituras
+        anteriores quedan en la foto y las posteriores se encolan en `incoming`
+        (y en `pending` mientras el modelo vigente siga respondiendo).
+        Es un recorrido por rowid con tuplas simples (~0.8 s por millón de
+        likes, lo único que bloquea al escritor); el orden se arma después.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        pairs = cursor.execute(f"SELECT user_id, {self.column} FROM {self.table} ORDER BY id").fetchall()
+        self.incoming = deque()
+        self.queues = tuple(q for q in (self.pending, self.incoming) if q is not None)
+        return pairs
+
+    def _discard_incoming(self, conn):
+        self.incoming = None
+        self.queues = (self.pending,) if self.pending is not None else ()
+
+    def rebuild(self):
+        """
+        Reconstruye la matriz y los vecinos desde las tablas de likes.
+        Bloquea hasta terminar; retorna los segundos que tomó.
+        """
+        with self._build_lock:
+            started = time.perf_counter()
+            pairs = get_writer().submit(self._snapshot).result()
+            try:
+                if pairs:
+                    # Por usuario y, dentro de cada uno, del like más reciente al más antiguo
+                    data = np.array(pairs, dtype=np.int64)[::-1]
+                    order = np.argsort(data[:, 0], kind="stable")
+                    users, items = data[order, 0], data[order, 1]
+                else:
+                    users = items = np.zeros(0, dtype=np.int64)
+                state = _build(users, items)
+                neighbors = _top_k(*state)
+            except BaseException:
+                # La cola del modelo que no llegó a instalarse se descarta en el escritor
+                get_writer().submit(self._discard_incoming).result()
+                raise
+            with self._lock:
+                (self.ids, self.likes, self.indptr, self.indices, self.counts) = state
+                self.rows = {int(item_id): row for row, item_id in enumerate(self.ids)}
+                self.delta = defaultdict(dict)
+                self.neighbors = neighbors
+                self.built_at = time.monotonic()
+                # Los likes ya aplicados al modelo anterior no cuentan: se
+                # aplica la cola de esta generación, que empezó con la foto
+                self.pending, self.incoming = self.incoming, None
+                self.queues = (self.pending,)
+                self._apply_pending()
+            return time.perf_counter() - started
+
+    def ensure_fresh(self):
+        """
+        Lanza la (re)construcción en segundo plano si no hay modelo o está viejo.
+        Tras un fallo espera RETRY_SECONDS antes de reintentar.
+        """
+        now = time.monotonic()
+        with self._lock:
+            stale = self.built_at is None or now - self.built_at > REBUILD_SECONDS
+            if not stale or self.building:
+                return
+            if self.failed_at is not None and now - self.failed_at < RETRY_SECONDS:
+                return
+            self.building = True
+
+        def run():
+            try:
+                self.rebuild()
+                self.failed_at = None
+            except Exception as exc:
+                self.failed_at = time.monotonic()
+                print(f"⚠️ No se pudo reconstruir el modelo de recomendaciones ({self.kind}): {exc}")
+            finally:
+                self.building = False
+
+        threading.Thread(target=run, name=f"beyond-recs-{self.kind}", daemon=True).start()
+
+    # ---------- actualización incremental ----------
+    def record(self, item_id, others, sign):
+        """
+        Encola un like (+1) o unlike (-1) de `item_id` de un usuario que además
+        tiene `others`, una vez por cada generación del modelo (vigente y en
+        construcción). Lo llama el hilo escritor, así que solo agrega a los deques.
+        """
+        for queue in self.queues:
+            queue.append((item_id, others, sign))
+
+    def _row(self, item_id):
+        row = self.rows.get(item_id)
+        if row is None:
+            row = len(self.ids)
+            self.rows[item_id] = row
+            self.ids = np.append(self.ids, item_id)
+            self.likes = np.append(self.likes, 0.0)
+            self.indptr = np.append(self.indptr, self.indptr[-1])
+        return row
+
+    def _cooccurrence(self, row, other):
+        start, end = self.indptr[row], self.indptr[row + 1]
+        position = start + np.searchsorted(self.indices[start:end], other)
+        base = int(self.counts[position]) if position < end and self.indices[position] == other else 0
+        return base + self.delta.get(row, {}).get(other, 0)
+
+    def _row_neighbors(self, row):
+        start, end = self.indptr[row], self.indptr[row + 1]
+        co = dict(zip(self.indices[start:end].tolist(), self.counts[start:end].tolist()))
+        for other, extra in self.delta.get(row, {}).items():
+            co[other] = co.get(other, 0) + extra
+        if not co or self.likes[row] <= 0:
+            return ()
+        cols = np.fromiter(co, dtype=np.int64, count=len(co))
+        values = np.fromiter(co.values(), dtype=np.float64, count=len(co))
+        scores = values / np.sqrt(self.likes[row] * np.maximum(self.likes[cols], 1.0))
+        keep = values > 0
+        cols, scores = cols[keep], scores[keep]
+        if len(cols) > TOP_K:
+            best = np.argpartition(-scores, TOP_K)[:TOP_K]
+            cols, scores = cols[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return tuple(zip(self.ids[cols[order]].tolist(), scores[order].tolist()))
+
+    def _apply_pending(self):
+        pending = self.pending
+        while pending:
+            item_id, others, sign = pending.popleft()
+            row = self._row(item_id)
+            self.likes[row] = max(self.likes[row] + sign, 0.0)
+            other_rows = [self._row(other) for other in others]
+            for other in other_rows:
+                for a, b in ((row, other), (other, row)):
+                    self.delta[a][b] = self.delta[a].get(b, 0) + sign
+            self.neighbors[item_id] = self._row_neighbors(row)
+            for other_id, other in zip(others, other_rows):
+                co = self._cooccurrence(other, row)
+                score = co / np.sqrt(max(self.likes[other], 1.0) * max(self.likes[row], 1.0))
+                current = [pair for pair in self.neighbors.get(other_id, ()) if pair[0] != item_id]
+                if co > 0:
+                    current.append((item_id, float(score)))
+                current.sort(key=lambda pair: -pair[1])
+                self.neighbors[other_id] = tuple(current[:TOP_K])
+
+    # ---------- lectura ----------
+    def similar(self, item_id, limit=TOP_K):
+        self.ensure_fresh()
+        if self.pending:
+            with self._lock:
+                self._apply_pending()
+        return self.neighbors.get(item_id, ())[:limit]
+
+    def recommend(self, liked_ids, limit=10):
+        """
+        Ítems recomendados para quien le gustaron `liked_ids` (más recientes
+        primero): suma los scores de los vecinos precalculados y descarta lo
+        que ya le gustó. Retorna [(id, score)].
+        """
+        self.ensure_fresh()
+        if self.pending:
+            with self._lock:
+                self._apply_pending()
+        liked = set(liked_ids)
+        scores = defaultdict(float)
+        neighbors = self.neighbors
+        for item_id in liked_ids[:MAX_USER_LIKES]:
+            for other, score in neighbors.get(item_id, ()):
+                if other not in liked:
+                    scores[other] += score
+        return sorted(scores.items(), key=lambda pair: -pair[1])[:limit]
+
+    def stats(self):
+        return {
+            "items": len(self.ids),
+            "pairs": int(len(self.indices)),
+            "pending": len(self.pending or ()),
+            "age": None if self.built_at is None else time.monotonic() - self.built_at,
+        }
+
+
+def _build(users, items):
+    """
+    (usuarios, ítems) ordenados por usuario -> (ids, likes, indptr, indices, counts).
+    """
+    ids, rows = np.unique(items, return_inverse=True)
+    n = len(ids)
+    likes = np.bincount(rows, minlength=n).astype(np.float64)
+    if not len(rows):
+        return ids, likes, np.zeros(n + 1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+
+    # Grupos por usuario, recortados a sus MAX_USER_LIKES likes más recientes
+    boundaries = np.flatnonzero(np.diff(users)) + 1
+    starts = np.concatenate(([0], boundaries))
+    sizes = np.diff(np.concatenate((starts, [len(users)])))
+    rank = np.arange(len(users)) - np.repeat(starts, sizes)
+    keep = rank < MAX_USER_LIKES
+    rows, group = rows[keep], np.repeat(np.arange(len(starts)), sizes)[keep]
+    sizes = np.minimum(sizes, MAX_USER_LIKES)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    # Todos los pares ordenados (i, j) dentro de cada usuario, por lotes de usuarios
+    keys, weights = [], []
+    pair_sizes = sizes.astype(np.int64) ** 2
+    first = 0
+    while first < len(sizes):
+        last = first + max(int(np.searchsorted(np.cumsum(pair_sizes[first:]), PAIR_CHUNK)), 1)
+        lo, hi = starts[first], starts[last - 1] + sizes[last - 1]
+        chunk_rows, chunk_group = rows[lo:hi], group[lo:hi] - group[lo]
+        chunk_sizes, chunk_starts = sizes[first:last], starts[first:last] - lo
+        repeat = chunk_sizes[chunk_group]
+        left = np.repeat(chunk_rows, repeat)
+        offset = np.arange(len(left)) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+        right = chunk_rows[np.repeat(chunk_starts[chunk_group], repeat) + offset]
+        mask = left != right
+        chunk_keys, chunk_counts = np.unique(left[mask] * n + right[mask], return_counts=True)
+        keys.append(chunk_keys)
+        weights.append(chunk_counts)
+        first = last
+    keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate(weights)).astype(np.int32)
+    pair_rows = keys // n
+    indptr = np.searchsorted(pair_rows, np.arange(n + 1)).astype(np.int64)
+    return ids, likes, indptr, (keys % n).astype(np.int32), counts
+
+
+def _top_k(ids, likes, indptr, indices, counts):
+    """
+    Vecinos más similares (coseno) de cada ítem: {id: ((id, score), ...)}.
+    """
+    if not len(indices):
+        return {}
+    pair_rows = np.repeat(np.arange(len(ids)), np.diff(indptr))
+    scores = counts / np.sqrt(likes[pair_rows] * likes[indices])
+    order = np.lexsort((-scores, pair_rows))
+    rank = np.arange(len(order)) - indptr[pair_rows[order]]
+    best = order[rank < TOP_K]
+    best_rows, best_ids, best_scores = pair_rows[best], ids[indices[best]].tolist(), scores[best].tolist()
+    bounds = np.searchsorted(best_rows, np.arange(len(ids) + 1)).tolist()
+    id_list = ids.tolist()
+    return {
+        id_list[row]: tuple(zip(best_ids[bounds[row]:bounds[row + 1]], best_scores[bounds[row]:bounds[row + 1]]))
+        for row in range(len(ids)) if bounds[row] < bounds[row + 1]
+    }
+
+
+engines = {kind: ItemSimilarity(kind) for kind in SOURCES}
+
+
+def record_like(conn, kind, user_id, item_id, sign):
+    """
+    Llamar desde la operación del escritor que insertó (+1) o borró (-1) el
+    like, con la misma conexión, para actualizar el modelo de forma incremental.
+    """
+    engine = engines[kind]
+    if not engine.queues:
+        return  # todavía no hay modelo: la construcción leerá el like de la tabla
+    others = [
+        row[0] for row in conn.execute(
+            f"SELECT {engine.column} FROM {engine.table} WHERE user_id = ? AND {engine.column} != ? "
+            f"ORDER BY id DESC LIMIT ?",
+            (user_id, item_id, MAX_USER_LIKES)
+        )
+    ]
+    engine.record(item_id, others, sign)
+
+
+def user_likes(kind, user_id):
+    table, column = SOURCES[kind]
+    rows = fetch_all(
+        f"SELECT {column} FROM {table} WHERE user_id = ? ORDER BY id DESC LIMIT ?", (user_id, MAX_USER_LIKES)
+    )
+    return [row[0] for row in rows]
+
+
+def similar_items(kind, item_id, limit=10):
+    return engines[kind].similar(item_id, limit)
+
+
+def recommend_for_user(kind, user_id, limit=10):
+    """
+    [(id, score)] recomendados al usuario según lo que le gustó.
+    Retorna [] mientras el modelo se construye por primera vez.
+    """
+    return engines[kind].recommend(user_likes(kind, user_id), limit)
+
+
+if __name__ == "__main__":
+    from db.models import ensure_schema
+
+    ensure_schema()
+    for kind, engine in engines.items():
+        seconds = engine.rebuild()
+        print(f"✅ {kind}: {engine.stats()['items']} ítems, {engine.stats()['pairs']} pares en {seconds:.2f} s")
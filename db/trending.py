@@ -0,0 +1,217 @@
+# db/trending.py
+import math
+import os
+import time
+from collections import defaultdict
+
+from db.connection import fetch_all, transaction
+
+# Vida media de la tendencia: un like de hace HALF_LIFE segundos pesa la mitad
+HALF_LIFE = int(os.environ.get("BEYOND_TREND_HALF_LIFE", 2 * 86400))
+DECAY = math.log(2) / HALF_LIFE
+# Origen del puntaje en log; fijo para que los puntajes guardados sigan siendo comparables
+EPOCH = 1735689600  # 2025-01-01 UTC
+# Puntaje de un contenido sin actividad (ver _m013_trending en db/models.py)
+NO_SCORE = -1e300
+
+# Peso de cada interacción en la tendencia
+WEIGHTS = {"like": 1.0, "play": 0.5, "view": 0.1}
+
+WEEK = 7 * 86400
+_MONDAY = 4 * 86400  # el 1970-01-01 fue jueves
+
+# tipo -> (tabla de contenido, tabla de likes, columna)
+KINDS = {
+    "video": ("videos", "video_likes", "video_id"),
+    "podcast": ("podcasts", "podcast_likes", "podcast_id"),
+}
+
+_COLUMNS = "c.id, c.title, c.url, c.description, c.embed_url, c.poster_url"
+
+
+# ===============================
+# Puntaje con decaimiento en log
+# ===============================
+# El puntaje de un contenido es sum(peso * exp(-DECAY * (ahora - t))) sobre sus
+# interacciones. Como el factor exp(-DECAY * ahora) es común a todos, se guarda
+# log(sum(peso * exp(DECAY * (t - EPOCH)))): el orden no cambia con el paso
+# del tiempo, cada interacción solo actualiza su fila y ordenar es leer el
+# índice (trend_score, id). En log el valor crece ~0.35 por día y no desborda.
+
+def week_start(ts):
+    """
+    Inicio (lunes 00:00 UTC) de la semana de `ts`.
+    """
+    return ts - (ts - _MONDAY) % WEEK
+
+
+def log_weight(ts, weight):
+    return DECAY * (ts - EPOCH) + math.log(weight)
+
+
+def _log_add(a, b):
+    high, low = max(a, b), min(a, b)
+    if low <= NO_SCORE:
+        return high
+    return high + math.log1p(math.exp(low - high))
+
+
+def _log_sub(a, b):
+    """
+    log(exp(a) - exp(b)); NO_SCORE si no queda nada (o por redondeo).
+    """
+    if b <= NO_SCORE:
+        return a
+    if a <= NO_SCORE or b >= a - 1e-12:
+        return NO_SCORE
+    return a + math.log1p(-math.exp(b - a))
+
+
+def current_value(score, now=None):
+    """
+    Valor de tendencia de un puntaje guardado, decaído hasta `now`.
+    """
+    if score <= NO_SCORE:
+        return 0.0
+    return math.exp(score - DECAY * ((now or time.time()) - EPOCH))
+
+
+# ===============================
+# Actualización incremental (dentro de la operación del escritor)
+# ===============================
+def _add_score(conn, kind, item_id, log_value):
+    table = KINDS[kind][0]
+    row = conn.execute(f"SELECT trend_score FROM {table} WHERE id = ?", (item_id,)).fetchone()
+    if row:
+        conn.execute(f"UPDATE {table} SET trend_score = ? WHERE id = ?", (_log_add(row[0], log_value), item_id))
+
+
+def record_like(conn, kind, item_id, ts):
+    _add_score(conn, kind, item_id, log_weight(ts, WEIGHTS["like"]))
+    conn.execute(
+        "INSERT INTO weekly_likes (content_type, week, content_id, likes) VALUES (?, ?, ?, 1) "
+        "ON CONFLICT (content_type, week, content_id) DO UPDATE SET likes = likes + 1",
+        (kind, week_start(ts), item_id)
+    )
+
+
+def record_unlike(conn, kind, item_id, created_at):
+    """
+    Descuenta un like borrado. Los likes sin fecha (anteriores a la
+    migración 13) nunca sumaron, así que no se descuentan.
+    """
+    if created_at is None:
+        return
+    table = KINDS[kind][0]
+    row = conn.execute(f"SELECT trend_score FROM {table} WHERE id = ?", (item_id,)).fetchone()
+    if row:
+        conn.execute(
+            f"UPDATE {table} SET trend_score = ? WHERE id = ?",
+            (_log_sub(row[0], log_weight(created_at, WEIGHTS["like"])), item_id)
+        )
+    conn.execute(
+        "UPDATE weekly_likes SET likes = likes - 1 WHERE content_type = ? AND week = ? AND content_id = ?",
+        (kind, week_start(created_at), item_id)
+    )
+
+
+def record_views(conn, events):
+    """
+    Suma las vistas y reproducciones de un lote de eventos (ver db/events.py):
+    una actualización por contenido, no por evento.
+    """
+    totals = defaultdict(lambda: NO_SCORE)
+    for ts, event_type, content_type, content_id, _user_id, _role in events:
+        if content_type in KINDS and event_type in ("view", "play"):
+            key = (content_type, content_id)
+            totals[key] = _log_add(totals[key], log_weight(ts, WEIGHTS[event_type]))
+    for (kind, item_id), log_value in totals.items():
+        _add_score(conn, kind, item_id, log_value)
+
+
+# ===============================
+# Lecturas (siempre desde un índice)
+# ===============================
+def trending_page(kind, after=None, limit=9):
+    """
+    Página por tendencia: (id, title, url, description, embed_url, poster_url,
+    trend_score), ordenada por el índice (trend_score, id) en reversa.
+    `after` = (trend_score, id) de la última fila de la página anterior.
+    """
+    table = KINDS[kind][0]
+    if after is None:
+        return fetch_all(
+            f"SELECT {_COLUMNS}, c.trend_score FROM {table} c ORDER BY c.trend_score DESC, c.id DESC LIMIT ?",
+            (limit,)
+        )
+    return fetch_all(
+        f"SELECT {_COLUMNS}, c.trend_score FROM {table} c WHERE (c.trend_score, c.id) < (?, ?) "
+        f"ORDER BY c.trend_score DESC, c.id DESC LIMIT ?",
+        (*after, limit)
+    )
+
+
+def weekly_page(kind, after=None, limit=9, week=None):
+    """
+    Lo más gustado de la semana (por defecto la actual): (id, title, url,
+    description, embed_url, poster_url, likes), leído del índice de weekly_likes.
+    `after` = (likes, id) de la última fila de la página anterior.
+    """
+    table = KINDS[kind][0]
+    week = week_start(int(time.time())) if week is None else week
+    after = after or (math.inf, 0)
+    return fetch_all(
+        f"""
+        SELECT {_COLUMNS}, w.likes FROM weekly_likes w JOIN {table} c ON c.id = w.content_id
+        WHERE w.content_type = ? AND w.week = ? AND w.likes > 0 AND (w.likes, w.content_id) < (?, ?)
+        ORDER BY w.likes DESC, w.content_id DESC LIMIT ?
+        """,
+        (kind, week, *after, limit)
+    )
+
+
+# ===============================
+# Mantenimiento
+# ===============================
+def rebuild_scores(now=None):
+    """
+    Recalcula trend_score y weekly_likes desde los likes con fecha y los
+    rollups por hora de vistas/reproducciones. Solo para reparar o tras
+    cambiar HALF_LIFE; la operación normal es incremental.
+    """
+    now = int(now or time.time())
+    with transaction() as conn:
+        conn.execute("DELETE FROM weekly_likes")
+        for kind, (table, likes_table, column) in KINDS.items():
+            scores = defaultdict(lambda: NO_SCORE)
+            for item_id, ts in conn.execute(
+                f"SELECT {column}, created_at FROM {likes_table} WHERE created_at IS NOT NULL"
+            ):
+                scores[item_id] = _log_add(scores[item_id], log_weight(ts, WEIGHTS["like"]))
+            for item_id, bucket, event_type, count in conn.execute(
+                "SELECT content_id, bucket, event_type, SUM(count) FROM event_rollups_hourly "
+                "WHERE content_type = ? AND event_type IN ('view', 'play') AND bucket >= ? "
+                "GROUP BY content_id, bucket, event_type",
+                (kind, now - 30 * HALF_LIFE)
+            ):
+                scores[item_id] = _log_add(scores[item_id], log_weight(bucket, WEIGHTS[event_type] * count))
+            conn.execute(f"UPDATE {table} SET trend_score = ?", (NO_SCORE,))
+            conn.executemany(
+                f"UPDATE {table} SET trend_score = ? WHERE id = ?", [(score, item_id) for item_id, score in scores.items()]
+            )
+            conn.execute(
+                f"""
+                INSERT INTO weekly_likes (content_type, week, content_id, likes)
+                SELECT ?, created_at - (created_at - ?) % ?, {column}, COUNT(*) FROM {likes_table}
+                WHERE created_at IS NOT NULL GROUP BY 2, 3
+                """,
+                (kind, _MONDAY, WEEK)
+            )
+
+
+if __name__ == "__main__":
+    from db.models import ensure_schema
+
+    ensure_schema()
+    rebuild_scores()
+    print("✅ Puntajes de tendencia y likes semanales recalculados.")
@@ -0,0 +1,243 @@
+# db/writer.py
+import atexit
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from db.connection import get_connection
+
+# Tiempo máximo que se siguen juntando escrituras ya encoladas en un mismo
+# commit; una escritura sola (cola vacía) se confirma sin esperar
+FLUSH_INTERVAL = 0.02
+MAX_BATCH = 500
+
+_STOP = object()
+
+
+class _WriteOp:
+    __slots__ = ("fn", "key", "future")
+
+    def __init__(self, fn, key):
+        self.fn = fn
+        self.key = key
+        self.future = Future()
+
+
+class DBWriter:
+    """
+    Hilo escritor único: recibe operaciones de escritura por una cola y las
+    confirma en transacciones agrupadas (group commit), un commit por lote.
+
+    Las operaciones con la misma `key` dentro de un lote se fusionan y solo se
+    ejecuta la última (p. ej. like/unlike repetidos del mismo usuario e ítem);
+    todos los futures fusionados reciben el resultado de esa última operación.
+    """
+
+    def __init__(self, db_name=None, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH):
+        self.db_name = db_name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="beyond-db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, key=None):
+        """
+        Encola `fn(conn)` y retorna un Future con su resultado.
+        Llamar a `.result()` garantiza leer lo escrito (read-your-writes).
+        """
+        op = _WriteOp(fn, key)
+        self._queue.put(op)
+        return op.future
+
+    def execute(self, query, params=None, key=None):
+        """
+        Encola un query de escritura; el Future resuelve con el lastrowid.
+        """
+        return self.submit(lambda conn: conn.execute(query, params or ()).lastrowid, key)
+
+    def flush(self):
+        """
+        Espera a que se confirmen todas las escrituras encoladas hasta ahora.
+        """
+        self.submit(lambda conn: None).result()
+
+    def stop(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _collect(self, first):
+        """
+        Junta en un lote las operaciones que ya están esperando en la cola; no
+        espera a que lleguen otras. El agrupamiento sale solo: mientras se
+        confirma un lote, las escrituras nuevas se acumulan para el siguiente.
+        """
+        batch = {}
+        deadline = time.monotonic() + self.flush_interval
+        op = first
+        while True:
+            key = op.key if op.key is not None else op
+            merged = batch.pop(key, [])
+            merged.append(op)
+            batch[key] = merged  # se reinserta al final para respetar el orden
+            if len(batch) >= self.max_batch or time.monotonic() >= deadline:
+                return batch, False
+            try:
+                op = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+            if op is _STOP:
+                return batch, True
+
+    def _commit(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for ops in batch.values():
+                conn.execute("SAVEPOINT write_op")
+                try:
+                    value = ops[-1].fn(conn)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO write_op")
+                    results.append((ops, None, exc))
+                else:
+                    results.append((ops, value, None))
+                conn.execute("RELEASE write_op")
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            for ops in batch.values():
+                for op in ops:
+                    op.future.set_exception(exc)
+            return
+        for ops, value, exc in results:
+            for op in ops:
+                if exc is not None:
+                    op.future.set_exception(exc)
+                else:
+                    op.future.set_result(value)
+
+    def _run(self):
+        conn = get_connection(self.db_name)
+        try:
+            while True:
+                op = self._queue.get()
+                if op is _STOP:
+                    break
+                batch, stop = self._collect(op)
+                self._commit(conn, batch)
+                if stop:
+                    break
+            # Confirmar lo que haya quedado en la cola antes de salir
+            pending = {}
+            while True:
+                try:
+                    op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is not _STOP:
+                    pending[op] = [op]
+            if pending:
+                self._commit(conn, pending)
+        finally:
+            conn.close()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """
+    Retorna el escritor compartido del proceso, iniciándolo si hace falta.
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = DBWriter()
+    return _writer
+
+
+def stop_writer():
+    """
+    Vacía la cola y detiene el escritor compartido.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.stop()
+            _writer = None
+
+
+def submit_write(query, params=None, key=None):
+    """
+    Encola un query de escritura en el escritor compartido y retorna su Future.
+    """
+    return get_writer().execute(query, params, key)
+
+
+class BatchBuffer:
+    """
+    Buffer en memoria para escrituras de alto volumen que no necesitan
+    confirmación (eventos, chat en vivo). `add` solo agrega al deque, así que
+    no toca la base de datos ni bloquea a quien escribe; un hilo vacía el
+    buffer cada `flush_interval` (o al llegar a `flush_batch`) y entrega cada
+    lote como una sola operación `persist(conn, batch)` al escritor compartido.
+    Si la base de datos no da abasto se descartan los elementos más antiguos.
+    """
+
+    def __init__(self, persist, flush_interval=1.0, flush_batch=1000, maxlen=50000, name="beyond-buffer"):
+        self.persist = persist
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.name = name
+        self._items = deque(maxlen=maxlen)
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.dropped = 0
+
+    def add(self, item):
+        if len(self._items) == self._items.maxlen:
+            self.dropped += 1
+        self._items.append(item)
+        if self._thread is None:
+            self._start()
+        if len(self._items) >= self.flush_batch:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Entrega al escritor todo lo acumulado y retorna el Future del último lote
+        (None si no había nada pendiente).
+        """
+        with self._lock:
+            future = None
+            while self._items:
+                batch = []
+                while self._items and len(batch) < self.flush_batch:
+                    batch.append(self._items.popleft())
+                future = get_writer().submit(lambda conn, batch=batch: self.persist(conn, batch))
+            return future
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                # Registrado después que stop_writer, así que corre antes: el escritor aún acepta el último lote
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+atexit.register(stop_writer)
@@ -1,39 +1,83 @@
 import streamlit as st
 import sqlite3
-from db.likes import like_podcast, unlike_podcast, get_podcast_likes, user_liked_podcast
-import jwt
-
-DB_PATH = "beyond.db"
+from modules.beyond_podcasts.podcast_player import podcast_facade
+from auth.jwt_manager import get_claims
+from auth.permissions import can, require
+from db.likes import like_podcast, unlike_podcast, get_podcasts_likes_summary
+from db.events import track_event
+from db.connection import execute_query, fetch_all, fetch_one
+from db.cache import cached_catalog, cached_lookup, bump_catalog_version
+from modules.utils.media import parse_media_url
+from db.queries import search_podcasts
+from modules.utils.helpers import PAGE_SIZE, keyset_page, search_page, pick_content
 
 def save_podcast(title, url, description=""):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO podcasts (title, url, description) VALUES (?, ?, ?)",
-        (title, url, description)
+    """
+    Guarda un podcast normalizando su URL (proveedor + id canónico, embed y póster).
+    Lanza sqlite3.IntegrityError si el medio ya está en el catálogo.
+    """
+    media = parse_media_url(url)
+    execute_query(
+        "INSERT INTO podcasts (title, url, description, provider, media_id, embed_url, poster_url) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (title, media.url, description, media.provider, media.media_id, media.embed_url, media.poster_url)
     )
-    conn.commit()
-    conn.close()
+    bump_catalog_version()
 
 def update_podcast(pid, new_title, new_desc):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+    execute_query(
         "UPDATE podcasts SET title = ?, description = ? WHERE id = ?",
         (new_title, new_desc, pid)
     )
-    conn.commit()
-    conn.close()
+    bump_catalog_version()
+
+def delete_podcast(pid):
+    execute_query("DELETE FROM podcasts WHERE id = ?", (pid,))
+    bump_catalog_version()
 
+@cached_catalog
 def fetch_all_podcasts():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, title, url, description FROM podcasts")
-    podcasts = cursor.fetchall()
-    conn.close()
-    return podcasts
+    return fetch_all("SELECT id, title, url, description, embed_url, poster_url FROM podcasts")
+
+@cached_catalog
+def fetch_podcasts_page(after_id=None, before_id=None, limit=PAGE_SIZE):
+    """
+    Página de podcasts paginada por keyset sobre id (orden ascendente).
+    after_id avanza a la página siguiente y before_id retrocede a la anterior.
+    """
+    if before_id is not None:
+        rows = fetch_all(
+            "SELECT id, title, url, description, embed_url, poster_url FROM podcasts WHERE id < ? ORDER BY id DESC LIMIT ?",
+            (before_id, limit)
+        )
+        return rows[::-1]
+    return fetch_all(
+        "SELECT id, title, url, description, embed_url, poster_url FROM podcasts WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id or 0, limit)
+    )
+
+@cached_catalog
+def count_podcasts():
+    return fetch_one("SELECT COUNT(*) FROM podcasts")[0]
+
+@cached_lookup
+def fetch_podcasts_by_ids(ids):
+    """
+    Filas de los ids dados, en el mismo orden (p. ej. recomendaciones).
+    """
+    if not ids:
+        return []
+    placeholders = ", ".join("?" for _ in ids)
+    rows = {
+        row[0]: row for row in fetch_all(
+            f"SELECT id, title, url, description, embed_url, poster_url FROM podcasts WHERE id IN ({placeholders})",
+            tuple(ids)
+        )
+    }
+    return [rows[i] for i in ids if i in rows]
 
 def admin_podcasts_crud():
+    require("podcasts.manage")
     st.subheader("🎧 Gestión de Videopodcasts")
     acciones = ["Cargar/Crear videopodcast", "Modificar datos videopodcast", "Borrar videopodcast", "Ver videopodcasts guardados"]
     accion = st.selectbox("Selecciona una acción:", acciones)
@@ -45,79 +89,64 @@ def admin_podcasts_crud():
         youtube_url = st.text_input("Pega la URL de YouTube aquí")
         if st.button("Guardar videopodcast desde YouTube"):
             if title and youtube_url:
-                save_podcast(title, youtube_url, description)
-                st.success("Videopodcast de YouTube guardado.")
+                try:
+                    save_podcast(title, youtube_url, description)
+                    st.success("Videopodcast de YouTube guardado.")
+                except sqlite3.IntegrityError:
+                    st.warning("Ese podcast ya está en el catálogo.")
             else:
                 st.warning("Debes ingresar un título y una URL de YouTube.")
     elif accion == "Modificar datos videopodcast":
         st.info("Selecciona un videopodcast para modificar sus datos.")
-        podcasts = fetch_all_podcasts()
-        if not podcasts:
-            st.write("No hay videopodcasts guardados.")
-        else:
-            podcast_titles = [p[1] for p in podcasts]
-            selected_podcast_title = st.selectbox("Selecciona un videopodcast:", podcast_titles)
-            podcast_data = next((p for p in podcasts if p[1] == selected_podcast_title), None)
-            if podcast_data:
-                pid, title, url, desc = podcast_data
-                new_title = st.text_input("Nuevo título", value=title)
-                new_desc = st.text_area("Nueva descripción", value=desc)
-                if st.button("Actualizar videopodcast"):
-                    update_podcast(pid, new_title, new_desc)
-                    st.success("Datos del videopodcast actualizados.")
+        podcast_data = pick_content("videopodcast", "admin_edit_podcast", search_podcasts, fetch_podcasts_page)
+        if podcast_data:
+            pid, title, url, desc, embed_url, poster = podcast_data
+            new_title = st.text_input("Nuevo título", value=title)
+            new_desc = st.text_area("Nueva descripción", value=desc)
+            if st.button("Actualizar videopodcast"):
+                update_podcast(pid, new_title, new_desc)
+                st.success("Datos del videopodcast actualizados.")
     elif accion == "Borrar videopodcast":
         st.info("Selecciona un videopodcast para eliminarlo.")
-        podcasts = fetch_all_podcasts()
-        if not podcasts:
-            st.write("No hay videopodcasts guardados.")
-        else:
-            podcast_titles = [p[1] for p in podcasts]
-            selected_podcast_title = st.selectbox("Selecciona un videopodcast:", podcast_titles)
-            podcast_data = next((p for p in podcasts if p[1] == selected_podcast_title), None)
-            if podcast_data:
-                pid, title, url, desc = podcast_data
-                if st.button("Eliminar videopodcast"):
-                    conn = sqlite3.connect(DB_PATH)
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM podcasts WHERE id = ?", (pid,))
-                    conn.commit()
-                    conn.close()
-                    st.success("Videopodcast eliminado.")
+        podcast_data = pick_content("videopodcast", "admin_delete_podcast", search_podcasts, fetch_podcasts_page)
+        if podcast_data:
+            pid, title, url, desc, embed_url, poster = podcast_data
+            if st.button("Eliminar videopodcast"):
+                delete_podcast(pid)
+                st.success("Videopodcast eliminado.")
     elif accion == "Ver videopodcasts guardados":
         st.info("Lista de videopodcasts guardados:")
-        podcasts = fetch_all_podcasts()
+        query = st.text_input("🔎 Buscar videopodcasts", key="admin_podcasts_search")
+        if query.strip():
+            podcasts, nav = search_page("admin_podcasts_search_page", search_podcasts, query)
+        else:
+            podcasts, nav = keyset_page("admin_podcasts_page", fetch_podcasts_page)
         if not podcasts:
             st.write("No hay videopodcasts guardados.")
         else:
             cols = st.columns(3)
             # Obtener user_id del token si existe
-            user_id = None
-            if "token" in st.session_state and st.session_state["token"]:
-                try:
-                    payload = jwt.decode(st.session_state["token"], "super_secret_key", algorithms=["HS256"])
-                    user_id = payload.get("user_id")
-                except Exception:
-                    user_id = None
+            claims = get_claims(st.session_state.get("token"))
+            user_id = claims.get("user_id") if claims else None
+            likes_summary = get_podcasts_likes_summary([p[0] for p in podcasts], user_id)
             for idx, pod in enumerate(podcasts):
-                pid, title, url, desc = pod
+                pid, title, url, desc, embed_url, poster = pod
                 with cols[idx % 3]:
-                    st.markdown(f"**{title}**")
-                    if url.startswith("http"):
-                        st.video(url, format="video/mp4", start_time=0)
+                    podcast_facade(pid, title, embed_url or url, poster)
                     if desc:
                         st.caption(desc)
                     # Mostrar likes y botón si hay usuario logueado
-                    if user_id:
-                        likes = get_podcast_likes(pid)
-                        liked = user_liked_podcast(user_id, pid)
+                    likes, liked = likes_summary[pid]
+                    if user_id and can(claims, "content.like"):
                         if liked:
                             if st.button(f"❤️ Quitar me gusta ({likes})", key=f"unlike_podcast_{pid}"):
-                                unlike_podcast(user_id, pid)
-                                st.experimental_rerun()
+                                unlike_podcast(user_id, pid).result()
+                                st.rerun()
                         else:
                             if st.button(f"🤍 Me gusta ({likes})", key=f"like_podcast_{pid}"):
-                                like_podcast(user_id, pid)
-                                st.experimental_rerun()
+                                like_podcast(user_id, pid).result()
+                                track_event("like", claims, "podcast", pid)
+                                st.rerun()
                     else:
-                        likes = get_podcast_likes(pid)
                         st.write(f"👍 {likes} me gusta")
+            nav(None if query.strip() else count_podcasts())
@@ -0,0 +1,21 @@
+# modules/beyond_podcasts/podcast_player.py
+import streamlit as st
+from modules.beyond_videos.video_player import player_facade
+
+
+def render_podcast(url):
+    """
+    Monta el reproductor de un videopodcast (solo enlaces http/https).
+    """
+    if url.startswith("http"):
+        st.video(url, format="video/mp4", start_time=0)
+    else:
+        st.write("No se pudo cargar el videopodcast.")
+
+
+def podcast_facade(podcast_id, title, url, poster=None):
+    """
+    Fachada "click-to-load" del videopodcast; comparte con los videos el
+    único reproductor activo de la sesión.
+    """
+    player_facade(f"podcast_{podcast_id}", title, url, render_podcast, poster, ("podcast", podcast_id))
@@ -0,0 +1,440 @@
+# modules/beyond_summit/summit_manager.py
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import streamlit as st
+from auth.permissions import can, current_claims, require
+from db.cache import cached_catalog, bump_catalog_version
+from db.connection import fetch_all, fetch_one
+from db.writer import get_writer
+from modules.utils.helpers import cursor_page
+
+# Zona horaria por defecto para crear y mostrar Summits
+DEFAULT_TIMEZONE = os.environ.get("BEYOND_TZ", "America/Guayaquil")
+TIMEZONES = [
+    "America/Guayaquil", "America/Bogota", "America/Lima", "America/Mexico_City",
+    "America/Santiago", "America/Argentina/Buenos_Aires", "America/New_York",
+    "Europe/Madrid", "UTC",
+]
+
+# Cada cuánto se revisan como máximo los cambios de estado (segundos)
+TICK_SECONDS = 30
+# Duración máxima de un Summit: acota la búsqueda de lo que está en vivo
+MAX_DURATION = 72 * 3600
+AGENDA_PAGE_SIZE = 10
+
+STATUS_LABELS = {"upcoming": "🗓️ Próximo", "live": "🔴 En vivo", "past": "✅ Finalizado"}
+
+# Formatos aceptados en la columna `date` antigua (texto libre)
+_LEGACY_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%d-%m-%Y")
+
+_tick_lock = threading.Lock()
+_next_tick = 0.0
+
+
+# ===============================
+# Fechas
+# ===============================
+def to_epoch(day, clock, timezone=DEFAULT_TIMEZONE):
+    """
+    Fecha y hora locales de `timezone` -> segundos epoch (UTC).
+    """
+    return int(datetime.combine(day, clock, tzinfo=ZoneInfo(timezone)).timestamp())
+
+
+def format_local(ts, timezone=DEFAULT_TIMEZONE, fmt="%d/%m/%Y %H:%M"):
+    return datetime.fromtimestamp(ts, ZoneInfo(timezone)).strftime(fmt)
+
+
+def status_at(start_ts, end_ts, now):
+    if now < start_ts:
+        return "upcoming"
+    return "live" if now < end_ts else "past"
+
+
+def parse_legacy_date(text, timezone=DEFAULT_TIMEZONE):
+    """
+    Interpreta la fecha de texto libre de un Summit antiguo. Retorna
+    (start_ts, end_ts) o None: sin hora se toma el día completo y con hora,
+    un bloque de dos horas.
+    """
+    for fmt in _LEGACY_FORMATS:
+        try:
+            moment = datetime.strptime((text or "").strip(), fmt)
+        except ValueError:
+            continue
+        start = moment.replace(tzinfo=ZoneInfo(timezone))
+        length = timedelta(hours=2) if "%H" in fmt else timedelta(days=1)
+        return int(start.timestamp()), int((start + length).timestamp())
+    return None
+
+
+# ===============================
+# Datos
+# ===============================
+def save_summit(title, description, start_ts, end_ts, timezone=DEFAULT_TIMEZONE, summit_id=None):
+    """
+    Crea o actualiza un Summit con su horario normalizado. La columna `date`
+    conserva la fecha local de inicio para las pantallas antiguas.
+    """
+    global _next_tick
+    if end_ts <= start_ts:
+        raise ValueError("La hora de fin debe ser posterior a la de inicio.")
+    if end_ts - start_ts > MAX_DURATION:
+        raise ValueError(f"Un Summit puede durar como máximo {MAX_DURATION // 3600} horas.")
+    values = (
+        title, format_local(start_ts, timezone, "%Y-%m-%d"), description,
+        start_ts, end_ts, timezone, status_at(start_ts, end_ts, time.time()),
+    )
+
+    def op(conn):
+        if summit_id is None:
+            return conn.execute(
+                "INSERT INTO summits (title, date, description, start_ts, end_ts, timezone, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                values
+            ).lastrowid
+        conn.execute(
+            "UPDATE summits SET title = ?, date = ?, description = ?, start_ts = ?, end_ts = ?, "
+            "timezone = ?, status = ? WHERE id = ?",
+            values + (summit_id,)
+        )
+        return summit_id
+
+    summit_id = get_writer().submit(op).result()
+    _next_tick = 0.0  # el próximo cambio de estado puede haberse adelantado
+    bump_catalog_version()
+    return summit_id
+
+
+def delete_summit(summit_id):
+    """
+    Elimina un Summit junto con su chat, sus repeticiones y sus inscripciones.
+    """
+    def op(conn):
+        conn.execute(
+            "DELETE FROM replay_chapters WHERE replay_id IN (SELECT id FROM summit_replays WHERE summit_id = ?)",
+            (summit_id,)
+        )
+        conn.execute("DELETE FROM summit_replays WHERE summit_id = ?", (summit_id,))
+        conn.execute("DELETE FROM summit_chat WHERE summit_id = ?", (summit_id,))
+        conn.execute("DELETE FROM summit_registrations WHERE summit_id = ?", (summit_id,))
+        conn.execute("DELETE FROM summit_capacity WHERE summit_id = ?", (summit_id,))
+        conn.execute("DELETE FROM summits WHERE id = ?", (summit_id,))
+
+    get_writer().submit(op).result()
+    bump_catalog_version()
+
+
+def tick(now=None):
+    """
+    Paso del planificador: mueve a "live" o "past" solo los Summits que
+    cruzaron su inicio o fin (por índice sobre status) y retorna el epoch del
+    siguiente cambio de estado, o None si no hay ninguno pendiente.
+    Corre en el escritor; los ticks simultáneos de varias sesiones se agrupan en uno.
+    """
+    now = int(now or time.time())
+
+    def op(conn):
+        # Cada UPDATE recorre por idx_summits_status solo las filas que cambian
+        changed = conn.execute(
+            "UPDATE summits SET status = 'past' WHERE status = 'live' AND end_ts <= ?", (now,)
+        ).rowcount
+        changed += conn.execute(
+            "UPDATE summits SET status = CASE WHEN end_ts <= ? THEN 'past' ELSE 'live' END "
+            "WHERE status = 'upcoming' AND start_ts <= ?",
+            (now, now)
+        ).rowcount
+        next_change = conn.execute("""
+        SELECT MIN(ts) FROM (
+            SELECT MIN(start_ts) AS ts FROM summits WHERE status = 'upcoming'
+            UNION ALL
+            SELECT MIN(end_ts) FROM summits WHERE status = 'live'
+        )
+        """).fetchone()[0]
+        return changed, next_change
+
+    changed, next_change = get_writer().submit(op, key=("summit_tick",)).result()
+    if changed:
+        bump_catalog_version()
+    return next_change
+
+
+def maybe_tick():
+    """
+    Ejecuta el tick si llegó el siguiente cambio de estado o pasaron
+    TICK_SECONDS (otro proceso pudo crear Summits); si no, no hace nada.
+    """
+    global _next_tick
+    now = time.time()
+    if now < _next_tick:
+        return
+    with _tick_lock:
+        if now < _next_tick:
+            return
+        next_change = tick(now)
+        _next_tick = min(now + TICK_SECONDS, next_change or now + TICK_SECONDS)
+
+
+_COLUMNS = "id, title, description, start_ts, end_ts, timezone, status"
+
+
+def now_and_next(now=None, limit=5):
+    """
+    Summits en vivo y siguientes con una sola consulta por rango sobre
+    idx_summits_start: lo que está en vivo empezó hace menos de MAX_DURATION,
+    así que el recorrido en orden de inicio parte de ahí y se corta en `limit`.
+    Retorna (en_vivo, próximos).
+    """
+    now = int(now or time.time())
+    rows = fetch_all(
+        f"SELECT {_COLUMNS} FROM summits INDEXED BY idx_summits_start "
+        f"WHERE start_ts > ? AND end_ts > ? ORDER BY start_ts, id LIMIT ?",
+        (now - MAX_DURATION, now, limit)
+    )
+    live = [row for row in rows if row["start_ts"] <= now]
+    upcoming = [row for row in rows if row["start_ts"] > now]
+    return live, upcoming
+
+
+@cached_catalog
+def summits_by_status(status, limit=20):
+    return fetch_all(
+        f"SELECT {_COLUMNS} FROM summits WHERE status = ? ORDER BY start_ts LIMIT ?",
+        (status, limit)
+    )
+
+
+@cached_catalog
+def agenda_page(range_start, range_end, after=None, limit=AGENDA_PAGE_SIZE):
+    """
+    Página de la agenda entre range_start y range_end (epoch), ordenada por
+    (start_ts, id); `after` es el cursor (start_ts, id) de la última fila vista.
+    """
+    after_ts, after_id = after or (range_start - 1, 0)
+    return fetch_all(
+        f"SELECT {_COLUMNS} FROM summits "
+        f"WHERE start_ts >= ? AND start_ts < ? AND (start_ts, id) > (?, ?) "
+        f"ORDER BY start_ts, id LIMIT ?",
+        (range_start, range_end, after_ts, after_id, limit)
+    )
+
+
+@cached_catalog
+def count_agenda(range_start, range_end):
+    return fetch_one(
+        "SELECT COUNT(*) FROM summits WHERE start_ts >= ? AND start_ts < ?", (range_start, range_end)
+    )[0]
+
+
+def backfill_schedule(timezone=DEFAULT_TIMEZONE):
+    """
+    Completa start_ts/end_ts/status de los Summits guardados con fecha de texto.
+    Retorna (actualizados, [(id, fecha) que no se pudieron interpretar]).
+    """
+    now = time.time()
+
+    def op(conn):
+        updated, unparsed = 0, []
+        for summit_id, text in conn.execute("SELECT id, date FROM summits WHERE start_ts IS NULL").fetchall():
+            parsed = parse_legacy_date(text, timezone)
+            if parsed is None:
+                unparsed.append((summit_id, text))
+                continue
+            start_ts, end_ts = parsed
+            conn.execute(
+                "UPDATE summits SET start_ts = ?, end_ts = ?, timezone = ?, status = ? WHERE id = ?",
+                (start_ts, end_ts, timezone, status_at(start_ts, end_ts, now), summit_id)
+            )
+            updated += 1
+        return updated, unparsed
+
+    updated, unparsed = get_writer().submit(op).result()
+    bump_catalog_version()
+    return updated, unparsed
+
+
+# ===============================
+# Interfaz Streamlit
+# ===============================
+def _viewer_timezone():
+    return st.session_state.get("summit_timezone", DEFAULT_TIMEZONE)
+
+
+def _registrations(rows):
+    """
+    Resumen de inscripciones de las filas mostradas (una consulta) y el usuario actual.
+    """
+    from modules.beyond_summit.summit_registrations import registration_summary
+
+    claims = current_claims() or {}
+    user_id = claims.get("user_id") if can(claims, "summit.join") else None
+    open_ids = tuple(row["id"] for row in rows if row["status"] != "past")
+    return registration_summary(open_ids, user_id), user_id
+
+
+def _summit_line(row, timezone):
+    start = format_local(row["start_ts"], timezone)
+    end = format_local(row["end_ts"], timezone, "%H:%M")
+    return f"{STATUS_LABELS.get(row['status'], '')} **{row['title']}** · {start} – {end}"
+
+
+def _show_summit(row, timezone, summaries, user_id):
+    from modules.beyond_summit.summit_registrations import registration_controls
+
+    st.markdown(_summit_line(row, timezone))
+    if row["description"]:
+        st.caption(row["description"])
+    if row["id"] in summaries:
+        registration_controls(row["id"], summaries[row["id"]], user_id)
+
+
+def show_summit_landing():
+    """
+    Portada del Summit: qué hay en vivo ahora y qué viene después.
+    """
+    from modules.beyond_summit.summit_stream import show_live_session
+
+    maybe_tick()
+    timezone = _viewer_timezone()
+    live, upcoming = now_and_next()
+    summaries, user_id = _registrations(live + upcoming)
+    if live:
+        titles = {row["id"]: row["title"] for row in live}
+        summit_id = list(titles)[0]
+        if len(live) > 1:
+            summit_id = st.selectbox("Sesión en vivo", list(titles), format_func=titles.get)
+        show_live_session(summit_id, titles[summit_id])
+    else:
+        st.info("No hay ninguna sesión en vivo en este momento.")
+    if upcoming:
+        st.markdown("**A continuación**")
+        for row in upcoming:
+            _show_summit(row, timezone, summaries, user_id)
+
+
+def show_agenda():
+    """
+    Agenda paginada por rango de fechas, en la zona horaria elegida.
+    """
+    maybe_tick()
+    col1, col2 = st.columns([2, 1])
+    with col2:
+        timezone = st.selectbox(
+            "Zona horaria", TIMEZONES,
+            index=TIMEZONES.index(_viewer_timezone()) if _viewer_timezone() in TIMEZONES else 0,
+            key="summit_timezone",
+        )
+    with col1:
+        today = date.today()
+        selected = st.date_input("Fechas", (today, today + timedelta(days=30)), key="agenda_range")
+    if not isinstance(selected, (tuple, list)) or len(selected) != 2:
+        st.caption("Elige la fecha de inicio y de fin.")
+        return
+    range_start = to_epoch(selected[0], datetime.min.time(), timezone)
+    range_end = to_epoch(selected[1] + timedelta(days=1), datetime.min.time(), timezone)
+
+    rows, nav = cursor_page(
+        "agenda_page",
+        lambda after, limit: agenda_page(range_start, range_end, after, limit),
+        lambda row: (row["start_ts"], row["id"]),
+        AGENDA_PAGE_SIZE,
+        scope=(range_start, range_end),
+    )
+    if not rows:
+        st.write("No hay Summits en estas fechas.")
+        return
+    summaries, user_id = _registrations(rows)
+    for row in rows:
+        _show_summit(row, timezone, summaries, user_id)
+    nav(count_agenda(range_start, range_end))
+
+
+def admin_summits_crud():
+    require("summits.manage")
+    from modules.beyond_summit.summit_registrations import CapacityError, registration_summary, set_capacity
+
+    st.subheader("🏔️ Gestión de Summits")
+
+    st.markdown("#### Nuevo Summit")
+    with st.form("create_summit_form", clear_on_submit=True):
+        title = st.text_input("Título")
+        description = st.text_area("Descripción")
+        timezone = st.selectbox("Zona horaria", TIMEZONES, index=TIMEZONES.index(DEFAULT_TIMEZONE) if DEFAULT_TIMEZONE in TIMEZONES else 0)
+        col1, col2 = st.columns(2)
+        start_day = col1.date_input("Fecha de inicio")
+        start_time = col2.time_input("Hora de inicio", value=datetime.strptime("09:00", "%H:%M").time())
+        end_day = col1.date_input("Fecha de fin")
+        end_time = col2.time_input("Hora de fin", value=datetime.strptime("11:00", "%H:%M").time())
+        capacity = st.number_input("Cupos (0 = sin límite)", min_value=0, step=1)
+        if st.form_submit_button("Guardar Summit"):
+            if not title:
+                st.warning("⚠️ El título es obligatorio.")
+            else:
+                try:
+                    summit_id = save_summit(
+                        title, description,
+                        to_epoch(start_day, start_time, timezone), to_epoch(end_day, end_time, timezone),
+                        timezone,
+                    )
+                    set_capacity(summit_id, int(capacity) or None).result()
+                except ValueError as exc:
+                    st.error(f"❌ {exc}")
+                else:
+                    st.success("✅ Summit guardado.")
+                    st.rerun()
+
+    st.markdown("#### Agenda")
+    maybe_tick()
+    rows, nav = cursor_page(
+        "admin_agenda_page",
+        lambda after, limit: agenda_page(0, 2 ** 40, after, limit),
+        lambda row: (row["start_ts"], row["id"]),
+        AGENDA_PAGE_SIZE,
+    )
+    if not rows:
+        st.write("No hay Summits programados.")
+    summaries = registration_summary(tuple(row["id"] for row in rows))
+    for row in rows:
+        col1, col2, col3 = st.columns([4, 1, 1])
+        col1.markdown(_summit_line(row, row["timezone"] or DEFAULT_TIMEZONE))
+        capacity, reserved, waiting, _ = summaries.get(row["id"], (None, 0, 0, None))
+        col1.caption(f"🎟️ {reserved}/{capacity or '∞'} inscritos · {waiting} en espera")
+        with col2.popover("🎟️ Cupos"):
+            new_capacity = st.number_input(
+                "Cupos (0 = sin límite)", min_value=0, step=1, value=capacity or 0, key=f"capacity_{row['id']}"
+            )
+            if st.button("Guardar cupos", key=f"save_capacity_{row['id']}"):
+                try:
+                    set_capacity(row["id"], int(new_capacity) or None).result()
+                except CapacityError as exc:
+                    st.error(f"❌ {exc}")
+                else:
+                    st.rerun()
+        if col3.button("🗑️ Eliminar", key=f"delete_summit_{row['id']}"):
+            delete_summit(row["id"])
+            st.rerun()
+    if rows:
+        nav(count_agenda(0, 2 ** 40))
+    pending = fetch_one("SELECT COUNT(*) FROM summits WHERE start_ts IS NULL")[0]
+    if pending:
+        st.caption(
+            f"{pending} Summits antiguos sin horario: `python -m modules.beyond_summit.summit_manager --backfill`"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Planificador de Summits.")
+    parser.add_argument("--backfill", action="store_true", help="Normaliza las fechas de texto de los Summits")
+    parser.add_argument("--timezone", default=DEFAULT_TIMEZONE)
+    args = parser.parse_args()
+    if args.backfill:
+        updated, unparsed = backfill_schedule(args.timezone)
+        print(f"✅ {updated} Summits normalizados.")
+        for summit_id, text in unparsed:
+            print(f"⚠️ Summit #{summit_id}: fecha no reconocida {text!r}")
@@ -0,0 +1,208 @@
+# modules/beyond_summit/summit_registrations.py
+import uuid
+
+import streamlit as st
+from db.connection import fetch_all, fetch_one
+from db.writer import get_writer
+
+# Estados de una inscripción
+CONFIRMED = "confirmed"
+WAITLIST = "waitlist"
+CANCELLED = "cancelled"
+
+STATUS_LABELS = {CONFIRMED: "✅ Inscrito", WAITLIST: "⏳ En lista de espera", CANCELLED: "Cancelada"}
+
+
+class CapacityError(ValueError):
+    """
+    Los cupos no pueden quedar por debajo de las plazas ya reservadas.
+    """
+
+
+# ===============================
+# Operaciones (se ejecutan en el hilo escritor)
+# ===============================
+# Todas las escrituras pasan por el escritor único: no hay transacciones
+# compitiendo por el lock de SQLite y cada operación corre en su propio
+# SAVEPOINT dentro de un commit agrupado. La reserva es un UPDATE condicional
+# sobre la fila contador, así que nunca se reservan más plazas que cupos.
+
+def _reserve_seat(conn, summit_id):
+    return conn.execute(
+        "UPDATE summit_capacity SET reserved = reserved + 1 "
+        "WHERE summit_id = ? AND (capacity IS NULL OR reserved < capacity)",
+        (summit_id,)
+    ).rowcount == 1
+
+
+def _promote(conn, summit_id, seats):
+    """
+    Confirma hasta `seats` inscripciones de la lista de espera, en orden de llegada.
+    Retorna cuántas promovió.
+    """
+    promoted = 0
+    for (registration_id,) in conn.execute(
+        "SELECT id FROM summit_registrations WHERE summit_id = ? AND status = ? ORDER BY id LIMIT ?",
+        (summit_id, WAITLIST, seats)
+    ).fetchall():
+        if not _reserve_seat(conn, summit_id):
+            break
+        conn.execute("UPDATE summit_registrations SET status = ? WHERE id = ?", (CONFIRMED, registration_id))
+        promoted += 1
+    return promoted
+
+
+def _register(conn, summit_id, user_id, idempotency_key):
+    if idempotency_key:
+        row = conn.execute(
+            "SELECT status FROM summit_registrations WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone()
+        if row:
+            return row[0]  # reintento de una petición ya atendida
+    row = conn.execute(
+        "SELECT status FROM summit_registrations WHERE summit_id = ? AND user_id = ?", (summit_id, user_id)
+    ).fetchone()
+    if row and row[0] != CANCELLED:
+        return row[0]
+    if row:
+        # Volver a inscribirse tras cancelar: entra al final de la fila
+        conn.execute("DELETE FROM summit_registrations WHERE summit_id = ? AND user_id = ?", (summit_id, user_id))
+    conn.execute("INSERT OR IGNORE INTO summit_capacity (summit_id) VALUES (?)", (summit_id,))
+    has_waitlist = conn.execute(
+        "SELECT 1 FROM summit_registrations WHERE summit_id = ? AND status = ? LIMIT 1", (summit_id, WAITLIST)
+    ).fetchone()
+    status = CONFIRMED if not has_waitlist and _reserve_seat(conn, summit_id) else WAITLIST
+    conn.execute(
+        "INSERT INTO summit_registrations (summit_id, user_id, status, idempotency_key) VALUES (?, ?, ?, ?)",
+        (summit_id, user_id, status, idempotency_key)
+    )
+    return status
+
+
+def _cancel(conn, summit_id, user_id):
+    row = conn.execute(
+        "SELECT status FROM summit_registrations WHERE summit_id = ? AND user_id = ?", (summit_id, user_id)
+    ).fetchone()
+    if not row or row[0] == CANCELLED:
+        return None
+    conn.execute(
+        "UPDATE summit_registrations SET status = ? WHERE summit_id = ? AND user_id = ?",
+        (CANCELLED, summit_id, user_id)
+    )
+    if row[0] == CONFIRMED:
+        conn.execute("UPDATE summit_capacity SET reserved = reserved - 1 WHERE summit_id = ?", (summit_id,))
+        _promote(conn, summit_id, 1)
+    return row[0]
+
+
+def _set_capacity(conn, summit_id, capacity):
+    reserved = conn.execute("SELECT reserved FROM summit_capacity WHERE summit_id = ?", (summit_id,)).fetchone()
+    reserved = reserved[0] if reserved else 0
+    if capacity is not None and capacity < reserved:
+        raise CapacityError(f"Ya hay {reserved} plazas reservadas; los cupos no pueden ser menos.")
+    conn.execute(
+        "INSERT INTO summit_capacity (summit_id, capacity) VALUES (?, ?) "
+        "ON CONFLICT (summit_id) DO UPDATE SET capacity = excluded.capacity",
+        (summit_id, capacity)
+    )
+    free = None if capacity is None else capacity - reserved
+    return _promote(conn, summit_id, -1 if free is None else free)
+
+
+# ===============================
+# API
+# ===============================
+def register(summit_id, user_id, idempotency_key=None):
+    """
+    Inscribe al usuario: plaza confirmada si queda cupo (y nadie espera),
+    si no, a la lista de espera. Es idempotente por usuario y por
+    `idempotency_key`: repetir la petición retorna el mismo estado.
+    Retorna un Future con el estado ("confirmed" o "waitlist").
+    """
+    # Sin `key`: inscribir y cancelar no se pueden fusionar (cada uno debe
+    # ejecutarse y recibir su propio resultado, en orden)
+    return get_writer().submit(lambda conn: _register(conn, summit_id, user_id, idempotency_key))
+
+
+def cancel(summit_id, user_id):
+    """
+    Cancela la inscripción; si liberó una plaza, se la da al primero de la
+    lista de espera en la misma transacción. Retorna un Future con el estado anterior.
+    """
+    return get_writer().submit(lambda conn: _cancel(conn, summit_id, user_id))
+
+
+def set_capacity(summit_id, capacity):
+    """
+    Fija los cupos (None = sin límite) y promueve la lista de espera si hay
+    plazas nuevas. Retorna un Future con la cantidad de promovidos.
+    """
+    return get_writer().submit(lambda conn: _set_capacity(conn, summit_id, capacity))
+
+
+def registration_summary(summit_ids, user_id=None):
+    """
+    {summit_id: (cupos, reservados, en_espera, estado_del_usuario)} para varios
+    Summits en una sola consulta.
+    """
+    if not summit_ids:
+        return {}
+    placeholders = ", ".join("?" for _ in summit_ids)
+    rows = fetch_all(
+        f"""
+        SELECT s.id, c.capacity, COALESCE(c.reserved, 0),
+               (SELECT COUNT(*) FROM summit_registrations w WHERE w.summit_id = s.id AND w.status = ?),
+               (SELECT r.status FROM summit_registrations r WHERE r.summit_id = s.id AND r.user_id = ?)
+        FROM summits s LEFT JOIN summit_capacity c ON c.summit_id = s.id
+        WHERE s.id IN ({placeholders})
+        """,
+        (WAITLIST, user_id) + tuple(summit_ids)
+    )
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def waitlist_position(summit_id, user_id):
+    row = fetch_one(
+        """
+        SELECT COUNT(*) FROM summit_registrations
+        WHERE summit_id = ? AND status = ? AND id <= (
+            SELECT id FROM summit_registrations WHERE summit_id = ? AND user_id = ? AND status = ?
+        )
+        """,
+        (summit_id, WAITLIST, summit_id, user_id, WAITLIST)
+    )
+    return row[0] if row else 0
+
+
+# ===============================
+# Interfaz Streamlit
+# ===============================
+def registration_controls(summit_id, summary, user_id):
+    """
+    Cupos disponibles y botón de inscribirse/cancelar de un Summit.
+    `summary` es la entrada de registration_summary para ese Summit.
+    """
+    capacity, reserved, waiting, status = summary
+    if capacity is None:
+        st.caption(f"🎟️ {reserved} inscritos")
+    else:
+        st.caption(f"🎟️ {max(capacity - reserved, 0)} de {capacity} cupos libres" + (f" · {waiting} en espera" if waiting else ""))
+    if not user_id:
+        return
+    if status in (CONFIRMED, WAITLIST):
+        label = STATUS_LABELS[status]
+        if status == WAITLIST:
+            label += f" (#{waitlist_position(summit_id, user_id)})"
+        st.write(label)
+        if st.button("Cancelar inscripción", key=f"cancel_registration_{summit_id}"):
+            cancel(summit_id, user_id).result()
+            st.rerun()
+        return
+    # Una clave por intento: un doble clic o un rerun repiten la misma petición
+    nonce_key = f"registration_nonce_{summit_id}"
+    nonce = st.session_state.setdefault(nonce_key, uuid.uuid4().hex)
+    full = capacity is not None and reserved >= capacity
+    if st.button("Unirme a la lista de espera" if full else "Inscribirme", key=f"register_{summit_id}"):
+        register(summit_id, user_id, nonce).result()
+        st.session_state[nonce_key] = uuid.uuid4().hex
+        st.rerun()
@@ -0,0 +1,318 @@
+# modules/beyond_summit/summit_replays.py
+import re
+import sqlite3
+from array import array
+from bisect import bisect_right
+
+import streamlit as st
+from auth.permissions import require
+from db.cache import cached_catalog, bump_catalog_version
+from db.connection import fetch_all, fetch_one
+from db.queries import search_replay_chapters, search_summits
+from db.writer import get_writer
+from modules.beyond_videos.video_player import render_video
+from modules.utils.helpers import keyset_page, pick_content
+from modules.utils.media import parse_media_url
+
+# Parámetros del enlace directo: ?replay=<id>&t=<segundos>
+REPLAY_PARAM = "replay"
+OFFSET_PARAM = "t"
+
+# Formato de los capítulos en el formulario: "h:mm:ss | ponente | título"
+_TIMESTAMP_RE = re.compile(r"^(?:(\d+):)?(\d{1,2}):(\d{2})$")
+# Duración máxima de una repetición; mantiene los inicios dentro de 32 bits sin signo
+MAX_TIMESTAMP = 24 * 3600
+
+
+# ===============================
+# Índice de capítulos
+# ===============================
+def pack_starts(starts):
+    """
+    Empaqueta los inicios de capítulo (segundos) como un arreglo ordenado de
+    enteros sin signo de 32 bits: 4 bytes por capítulo.
+    """
+    return array("I", sorted(starts)).tobytes()
+
+
+def unpack_starts(blob):
+    starts = array("I")
+    starts.frombytes(blob or b"")
+    return starts
+
+
+def chapter_index(starts, offset):
+    """
+    Posición del capítulo que se está reproduciendo en `offset` segundos
+    (búsqueda binaria sobre los inicios ordenados), o None si no hay capítulos.
+    """
+    if not starts:
+        return None
+    return max(bisect_right(starts, offset) - 1, 0)
+
+
+def parse_timestamp(text):
+    """
+    "1:02:03" o "02:03" -> segundos. Lanza ValueError si el formato no es válido.
+    """
+    match = _TIMESTAMP_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"Marca de tiempo inválida: {text!r}")
+    hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    if minutes >= 60 or seconds >= 60:
+        raise ValueError(f"Marca de tiempo inválida: {text!r}")
+    total = hours * 3600 + minutes * 60 + seconds
+    if total > MAX_TIMESTAMP:
+        raise ValueError(f"Marca de tiempo fuera de rango: {text!r} (máximo {MAX_TIMESTAMP // 3600} horas)")
+    return total
+
+
+def format_timestamp(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def parse_chapters(text):
+    """
+    Convierte las líneas "h:mm:ss | ponente | título" en [(inicio, ponente, título)]
+    ordenados por inicio. El ponente es opcional ("h:mm:ss | título").
+    """
+    chapters = {}
+    for number, line in enumerate((text or "").splitlines(), start=1):
+        if not line.strip():
+            continue
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 2:
+            parts.insert(1, "")
+        if len(parts) != 3 or not parts[2]:
+            raise ValueError(f"Línea {number}: usa el formato 'h:mm:ss | ponente | título'.")
+        try:
+            start = parse_timestamp(parts[0])
+        except ValueError as exc:
+            raise ValueError(f"Línea {number}: {exc}") from None
+        if start in chapters:
+            raise ValueError(f"Línea {number}: ya hay un capítulo en {format_timestamp(start)}.")
+        chapters[start] = (start, parts[1], parts[2])
+    return [chapters[start] for start in sorted(chapters)]
+
+
+# ===============================
+# Datos
+# ===============================
+def save_replay(summit_id, title, url, chapters, replay_id=None):
+    """
+    Crea o reemplaza una repetición con sus capítulos en una sola operación
+    del escritor. Retorna el id de la repetición.
+    """
+    info = parse_media_url(url)
+
+    def op(conn):
+        target = replay_id
+        if target is None:
+            target = conn.execute(
+                "INSERT INTO summit_replays (summit_id, title, url, embed_url, poster_url) VALUES (?, ?, ?, ?, ?)",
+                (summit_id, title, info.url, info.embed_url, info.poster_url)
+            ).lastrowid
+        else:
+            conn.execute(
+                "UPDATE summit_replays SET summit_id = ?, title = ?, url = ?, embed_url = ?, poster_url = ? WHERE id = ?",
+                (summit_id, title, info.url, info.embed_url, info.poster_url, target)
+            )
+            conn.execute("DELETE FROM replay_chapters WHERE replay_id = ?", (target,))
+        conn.executemany(
+            "INSERT INTO replay_chapters (replay_id, start, speaker, title) VALUES (?, ?, ?, ?)",
+            [(target, start, speaker, chapter_title) for start, speaker, chapter_title in chapters]
+        )
+        conn.execute(
+            "UPDATE summit_replays SET chapter_starts = ? WHERE id = ?",
+            (pack_starts(start for start, _, _ in chapters), target)
+        )
+        return target
+
+    replay_id = get_writer().submit(op).result()
+    bump_catalog_version()
+    return replay_id
+
+
+def delete_replay(replay_id):
+    def op(conn):
+        conn.execute("DELETE FROM replay_chapters WHERE replay_id = ?", (replay_id,))
+        conn.execute("DELETE FROM summit_replays WHERE id = ?", (replay_id,))
+
+    get_writer().submit(op).result()
+    bump_catalog_version()
+
+
+@cached_catalog
+def fetch_replays_page(after_id=None, before_id=None, limit=20):
+    """
+    Página del catálogo de repeticiones (solo títulos, sin medios).
+    """
+    columns = "r.id, r.title, s.title FROM summit_replays r LEFT JOIN summits s ON s.id = r.summit_id"
+    if before_id is not None:
+        rows = fetch_all(f"SELECT {columns} WHERE r.id < ? ORDER BY r.id DESC LIMIT ?", (before_id, limit))
+        return rows[::-1]
+    return fetch_all(f"SELECT {columns} WHERE r.id > ? ORDER BY r.id LIMIT ?", (after_id or 0, limit))
+
+
+@cached_catalog
+def count_replays():
+    return fetch_one("SELECT COUNT(*) FROM summit_replays")[0]
+
+
+@cached_catalog
+def get_replay(replay_id):
+    return fetch_one(
+        "SELECT id, summit_id, title, url, embed_url, poster_url, chapter_starts FROM summit_replays WHERE id = ?",
+        (replay_id,)
+    )
+
+
+@cached_catalog
+def get_chapters(replay_id):
+    return fetch_all(
+        "SELECT start, speaker, title FROM replay_chapters WHERE replay_id = ? ORDER BY start",
+        (replay_id,)
+    )
+
+
+@cached_catalog
+def replay_titles(replay_ids):
+    if not replay_ids:
+        return {}
+    placeholders = ", ".join("?" for _ in replay_ids)
+    rows = fetch_all(f"SELECT id, title FROM summit_replays WHERE id IN ({placeholders})", tuple(replay_ids))
+    return dict(rows)
+
+
+def deep_link(replay_id, start=0):
+    return f"?{REPLAY_PARAM}={replay_id}&{OFFSET_PARAM}={int(start)}"
+
+
+# ===============================
+# Interfaz Streamlit
+# ===============================
+def _open(replay_id, start=0):
+    st.query_params[REPLAY_PARAM] = str(replay_id)
+    st.query_params[OFFSET_PARAM] = str(int(start))
+    st.rerun()
+
+
+def _query_int(name):
+    try:
+        return int(st.query_params.get(name, ""))
+    except ValueError:
+        return None
+
+
+def show_replay(replay_id, offset=0):
+    """
+    Página de una repetición: un solo reproductor, iniciado en `offset`, y la
+    lista de capítulos (leídos de la base de datos, sin cargar otros medios).
+    """
+    replay = get_replay(replay_id)
+    if not replay:
+        st.warning("La repetición no existe.")
+        return
+    chapters = get_chapters(replay_id)
+    current = chapter_index(unpack_starts(replay["chapter_starts"]), offset)
+
+    if st.button("⬅️ Volver al catálogo", key="replay_back"):
+        st.query_params.clear()
+        st.rerun()
+    st.markdown(f"### 🎞️ {replay['title']}")
+    if current is not None:
+        st.caption(f"Capítulo actual: {chapters[current]['title']}")
+    render_video(replay["embed_url"] or replay["url"], start_time=offset)
+    st.caption(f"Enlace a este punto: `{deep_link(replay_id, offset)}`")
+
+    st.markdown("**Capítulos**")
+    for position, chapter in enumerate(chapters):
+        label = f"{format_timestamp(chapter['start'])} · {chapter['title']}"
+        if chapter["speaker"]:
+            label += f" — {chapter['speaker']}"
+        if st.button(("▶️ " if position == current else "") + label, key=f"chapter_{replay_id}_{position}"):
+            _open(replay_id, chapter["start"])
+
+
+def show_replays():
+    """
+    Catálogo de repeticiones: búsqueda por título de capítulo y listado paginado.
+    Con ?replay=<id>&t=<segundos> en la URL abre directamente esa repetición.
+    """
+    replay_id = _query_int(REPLAY_PARAM)
+    if replay_id is not None:
+        show_replay(replay_id, max(_query_int(OFFSET_PARAM) or 0, 0))
+        return
+
+    query = st.text_input("🔎 Buscar en los capítulos", key="replays_search")
+    if query.strip():
+        results = search_replay_chapters(query)
+        if not results:
+            st.write("No hay capítulos que coincidan.")
+        titles = replay_titles(tuple(sorted({row[3] for row in results})))
+        for chapter_id, title, speaker, rid, start in results:
+            label = f"{titles.get(rid, '')} · {format_timestamp(start)} · {title}"
+            if speaker:
+                label += f" — {speaker}"
+            if st.button(label, key=f"chapter_hit_{chapter_id}"):
+                _open(rid, start)
+        return
+
+    replays, nav = keyset_page("replays_page", fetch_replays_page, page_size=20)
+    if not replays:
+        st.info("Todavía no hay repeticiones publicadas.")
+        return
+    for rid, title, summit_title in replays:
+        if st.button(f"🎞️ {title}" + (f" · {summit_title}" if summit_title else ""), key=f"replay_{rid}"):
+            _open(rid)
+    nav(count_replays())
+
+
+def _summits_page(after_id=None, before_id=None, limit=50):
+    return fetch_all("SELECT id, title FROM summits ORDER BY id DESC LIMIT ?", (limit,))
+
+
+def admin_replays_crud():
+    require("summits.manage")
+    st.subheader("🎞️ Repeticiones del Summit")
+
+    st.markdown("#### Nueva repetición")
+    summit = pick_content("summit", "replay_summit", search_summits, _summits_page)
+    if summit:
+        with st.form("create_replay_form", clear_on_submit=True):
+            title = st.text_input("Título")
+            url = st.text_input("URL del video")
+            chapters_text = st.text_area(
+                "Capítulos (uno por línea)", placeholder="0:00 | Ana Pérez | Apertura\n1:15:30 | Luis Mora | Panel"
+            )
+            if st.form_submit_button("Guardar repetición"):
+                try:
+                    chapters = parse_chapters(chapters_text)
+                except ValueError as exc:
+                    st.error(f"❌ {exc}")
+                else:
+                    if not (title and url):
+                        st.warning("⚠️ Título y URL son obligatorios.")
+                    else:
+                        try:
+                            save_replay(summit[0], title, url, chapters)
+                        except (ValueError, OverflowError, sqlite3.Error) as exc:
+                            st.error(f"❌ No se pudo guardar la repetición: {exc}")
+                        else:
+                            st.success("✅ Repetición guardada.")
+                            st.rerun()
+
+    st.markdown("#### Repeticiones publicadas")
+    replays, nav = keyset_page("admin_replays_page", fetch_replays_page, page_size=20)
+    if not replays:
+        st.write("No hay repeticiones.")
+        return
+    for rid, title, summit_title in replays:
+        col1, col2 = st.columns([4, 1])
+        col1.write(f"🎞️ {title}" + (f" · {summit_title}" if summit_title else ""))
+        if col2.button("🗑️ Eliminar", key=f"delete_replay_{rid}"):
+            delete_replay(rid)
+            st.rerun()
+    nav(count_replays())
@@ -0,0 +1,236 @@
+# modules/beyond_summit/summit_stream.py
+import threading
+import time
+import uuid
+from collections import Counter, deque, namedtuple
+
+import streamlit as st
+from auth.jwt_manager import get_claims
+from auth.permissions import can
+from db.connection import fetch_all
+from db.writer import BatchBuffer
+
+# ===============================
+# Hub en memoria de las sesiones en vivo
+# ===============================
+# Presencia, chat y reacciones viajan por un hub pub/sub dentro del proceso:
+# publicar no toca la base de datos y cada sesión de Streamlit recoge sus
+# novedades con un fragmento que se refresca solo, en vez de consultar SQLite.
+
+SUBSCRIBER_QUEUE = 200  # mensajes pendientes por suscriptor; si no lee, se descartan los más antiguos
+HISTORY_SIZE = 50  # mensajes recientes que recibe quien se une
+PRESENCE_TTL = 30  # segundos sin refrescar para dar por cerrada una sesión
+REFRESH_SECONDS = 2
+MAX_MESSAGE_LEN = 500
+REACTIONS = ("👏", "❤️", "🔥", "😂", "🤯")
+
+ChatMessage = namedtuple("ChatMessage", "ts username message")
+Update = namedtuple("Update", "presence messages reactions new_reactions dropped")
+
+
+def _persist_chat(conn, messages):
+    conn.executemany(
+        "INSERT INTO summit_chat (summit_id, user_id, username, message, ts) VALUES (?, ?, ?, ?, ?)",
+        messages
+    )
+    return len(messages)
+
+
+chat_buffer = BatchBuffer(_persist_chat, name="beyond-summit-chat")
+
+
+class Subscription:
+    """
+    Suscripción de una sesión a la sala de un Summit. Los mensajes de chat se
+    encolan en un deque acotado; las reacciones y la presencia no se encolan:
+    se coalescen y cada `poll` entrega solo el estado actual y la diferencia.
+    """
+
+    __slots__ = ("room", "session_id", "user_id", "username", "queue", "seen_reactions", "last_seen", "dropped", "active")
+
+    def __init__(self, room, session_id, user_id, username):
+        self.room = room
+        self.session_id = session_id
+        self.user_id = user_id
+        self.username = username
+        self.queue = deque(room.history, maxlen=SUBSCRIBER_QUEUE)
+        self.seen_reactions = {}
+        self.last_seen = time.monotonic()
+        self.dropped = 0
+        self.active = True
+
+    def poll(self):
+        return self.room.poll(self)
+
+    def post(self, message):
+        return self.room.post(self, message)
+
+    def react(self, emoji):
+        self.room.react(emoji)
+
+    def leave(self):
+        self.room.leave(self)
+
+
+class Room:
+    """
+    Sala en vivo de un Summit. Un único lock protege la sala; todas las
+    operaciones son O(1) salvo el reparto del chat, que es O(suscriptores).
+    """
+
+    def __init__(self, summit_id):
+        self.summit_id = summit_id
+        self.subscribers = {}
+        self.reactions = Counter()
+        self._lock = threading.Lock()
+        self._last_reap = time.monotonic()
+        # Historial reciente: se lee de la base de datos una sola vez por proceso y sala
+        rows = fetch_all(
+            "SELECT ts, username, message FROM summit_chat WHERE summit_id = ? ORDER BY id DESC LIMIT ?",
+            (summit_id, HISTORY_SIZE)
+        )
+        self.history = deque((ChatMessage(*row) for row in reversed(rows)), maxlen=HISTORY_SIZE)
+
+    def join(self, session_id, user_id=None, username="anónimo"):
+        with self._lock:
+            sub = self.subscribers.get(session_id)
+            if sub is None:
+                sub = Subscription(self, session_id, user_id, username)
+                self.subscribers[session_id] = sub
+            return sub
+
+    def leave(self, sub):
+        with self._lock:
+            sub.active = False
+            self.subscribers.pop(sub.session_id, None)
+
+    def post(self, sub, message):
+        message = message.strip()[:MAX_MESSAGE_LEN]
+        if not message:
+            return None
+        chat = ChatMessage(time.time(), sub.username, message)
+        with self._lock:
+            self.history.append(chat)
+            for other in self.subscribers.values():
+                if len(other.queue) == SUBSCRIBER_QUEUE:
+                    other.dropped += 1
+                other.queue.append(chat)
+        chat_buffer.add((self.summit_id, sub.user_id, chat.username, chat.message, chat.ts))
+        return chat
+
+    def react(self, emoji):
+        if emoji in REACTIONS:
+            with self._lock:
+                self.reactions[emoji] += 1
+
+    def poll(self, sub):
+        """
+        Entrega y vacía lo pendiente para `sub`: Update(presencia, mensajes nuevos,
+        totales de reacciones, reacciones desde el último poll, descartados).
+        """
+        now = time.monotonic()
+        with self._lock:
+            sub.last_seen = now
+            if not sub.active:
+                # La sesión fue dada por cerrada (p. ej. pestaña en segundo plano): vuelve a entrar
+                sub.active = True
+                self.subscribers[sub.session_id] = sub
+            if now - self._last_reap > PRESENCE_TTL / 2:
+                self._reap(now)
+            messages = list(sub.queue)
+            sub.queue.clear()
+            totals = dict(self.reactions)
+            new = {emoji: count - sub.seen_reactions.get(emoji, 0) for emoji, count in totals.items()}
+            sub.seen_reactions = totals
+            dropped, sub.dropped = sub.dropped, 0
+            return Update(len(self.subscribers), messages, totals, {e: n for e, n in new.items() if n}, dropped)
+
+    def _reap(self, now):
+        # Streamlit no avisa cuando se cierra una pestaña: se expira por inactividad
+        self._last_reap = now
+        for session_id, sub in list(self.subscribers.items()):
+            if now - sub.last_seen > PRESENCE_TTL:
+                sub.active = False
+                del self.subscribers[session_id]
+
+
+class LiveHub:
+    """
+    Registro de salas por summit_id, compartido por todas las sesiones del proceso.
+    """
+
+    def __init__(self):
+        self.rooms = {}
+        self._lock = threading.Lock()
+
+    def room(self, summit_id):
+        room = self.rooms.get(summit_id)
+        if room is None:
+            with self._lock:
+                room = self.rooms.get(summit_id)
+                if room is None:
+                    room = self.rooms[summit_id] = Room(summit_id)
+        return room
+
+    def join(self, summit_id, session_id, user_id=None, username="anónimo"):
+        return self.room(summit_id).join(session_id, user_id, username)
+
+
+hub = LiveHub()
+
+
+# ===============================
+# Interfaz Streamlit
+# ===============================
+def _subscription(summit_id):
+    session_id = st.session_state.setdefault("live_session_id", uuid.uuid4().hex)
+    key = f"summit_live_{summit_id}"
+    sub = st.session_state.get(key)
+    if sub is None:
+        claims = get_claims(st.session_state.get("token")) or {}
+        sub = hub.join(summit_id, session_id, claims.get("user_id"), claims.get("username") or "anónimo")
+        st.session_state[key] = sub
+        st.session_state[f"{key}_chat"] = deque(maxlen=HISTORY_SIZE)
+    return sub, st.session_state[f"{key}_chat"]
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def _live_panel(summit_id, can_join=True):
+    sub, chat = _subscription(summit_id)
+    update = sub.poll()
+    chat.extend(update.messages)
+
+    col1, col2 = st.columns([1, 3])
+    col1.metric("👥 Conectados", update.presence)
+    col2.markdown(" ".join(
+        f"{emoji} {update.reactions.get(emoji, 0)}" + (f" (+{update.new_reactions[emoji]})" if emoji in update.new_reactions else "")
+        for emoji in REACTIONS
+    ))
+    if can_join:
+        cols = st.columns(len(REACTIONS))
+        for col, emoji in zip(cols, REACTIONS):
+            if col.button(emoji, key=f"react_{summit_id}_{emoji}"):
+                sub.react(emoji)
+
+    with st.container(height=300):
+        if update.dropped:
+            st.caption(f"… {update.dropped} mensajes omitidos")
+        for message in chat:
+            st.markdown(f"**{message.username}** · {time.strftime('%H:%M', time.localtime(message.ts))}  \n{message.message}")
+    if not can_join:
+        return
+    with st.form(f"chat_form_{summit_id}", clear_on_submit=True):
+        text = st.text_input("Mensaje", max_chars=MAX_MESSAGE_LEN, label_visibility="collapsed", placeholder="Escribe al chat…")
+        if st.form_submit_button("Enviar") and text.strip():
+            sub.post(text)
+
+
+def show_live_session(summit_id, title=None):
+    """
+    Panel en vivo de un Summit: presencia, reacciones y chat. Se refresca cada
+    REFRESH_SECONDS solo con lo que publicó el hub desde el último refresco.
+    """
+    if title:
+        st.markdown(f"### 🔴 {title}")
+    # Sin "summit.join" el panel es de solo lectura (sin chat ni reacciones)
+    _live_panel(summit_id, can(get_claims(st.session_state.get("token")), "summit.join"))
@@ -1,40 +1,83 @@
 import streamlit as st
 import sqlite3
-import os
-from db.likes import like_video, unlike_video, get_video_likes, user_liked_video
-import jwt
-
-DB_PATH = "beyond.db"
+from auth.jwt_manager import get_claims
+from auth.permissions import can, require
+from modules.beyond_videos.video_player import video_facade
+from db.likes import like_video, unlike_video, get_videos_likes_summary
+from db.events import track_event
+from db.connection import execute_query, fetch_all, fetch_one
+from db.cache import cached_catalog, cached_lookup, bump_catalog_version
+from modules.utils.media import parse_media_url
+from db.queries import search_videos
+from modules.utils.helpers import PAGE_SIZE, keyset_page, search_page, pick_content
 
 def save_video(title, url, description=""):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO videos (title, url, description) VALUES (?, ?, ?)",
-        (title, url, description)
+    """
+    Guarda un video normalizando su URL (proveedor + id canónico, embed y póster).
+    Lanza sqlite3.IntegrityError si el medio ya está en el catálogo.
+    """
+    media = parse_media_url(url)
+    execute_query(
+        "INSERT INTO videos (title, url, description, provider, media_id, embed_url, poster_url) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (title, media.url, description, media.provider, media.media_id, media.embed_url, media.poster_url)
     )
-    conn.commit()
-    conn.close()
+    bump_catalog_version()
 
 def update_video(vid_id, new_title, new_desc):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+    execute_query(
         "UPDATE videos SET title = ?, description = ? WHERE id = ?",
         (new_title, new_desc, vid_id)
     )
-    conn.commit()
-    conn.close()
+    bump_catalog_version()
+
+def delete_video(vid_id):
+    execute_query("DELETE FROM videos WHERE id = ?", (vid_id,))
+    bump_catalog_version()
 
+@cached_catalog
 def fetch_all_videos():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, title, url, description FROM videos")
-    videos = cursor.fetchall()
-    conn.close()
-    return videos
+    return fetch_all("SELECT id, title, url, description, embed_url, poster_url FROM videos")
+
+@cached_catalog
+def fetch_videos_page(after_id=None, before_id=None, limit=PAGE_SIZE):
+    """
+    Página de videos paginada por keyset sobre id (orden ascendente).
+    after_id avanza a la página siguiente y before_id retrocede a la anterior.
+    """
+    if before_id is not None:
+        rows = fetch_all(
+            "SELECT id, title, url, description, embed_url, poster_url FROM videos WHERE id < ? ORDER BY id DESC LIMIT ?",
+            (before_id, limit)
+        )
+        return rows[::-1]
+    return fetch_all(
+        "SELECT id, title, url, description, embed_url, poster_url FROM videos WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id or 0, limit)
+    )
+
+@cached_catalog
+def count_videos():
+    return fetch_one("SELECT COUNT(*) FROM videos")[0]
+
+@cached_lookup
+def fetch_videos_by_ids(ids):
+    """
+    Filas de los ids dados, en el mismo orden (p. ej. recomendaciones).
+    """
+    if not ids:
+        return []
+    placeholders = ", ".join("?" for _ in ids)
+    rows = {
+        row[0]: row for row in fetch_all(
+            f"SELECT id, title, url, description, embed_url, poster_url FROM videos WHERE id IN ({placeholders})",
+            tuple(ids)
+        )
+    }
+    return [rows[i] for i in ids if i in rows]
 
 def admin_videos_crud():
+    require("videos.manage")
     st.subheader("🎬 Gestión de Videos")
     acciones = ["Cargar/Crear video", "Modificar datos video", "Borrar video", "Ver videos guardados"]
     accion = st.selectbox("Selecciona una acción:", acciones)
@@ -46,88 +89,64 @@ def admin_videos_crud():
         youtube_url = st.text_input("Pega la URL de YouTube aquí")
         if st.button("Guardar video desde YouTube"):
             if title and youtube_url:
-                save_video(title, youtube_url, description)
-                st.success("Video de YouTube guardado.")
+                try:
+                    save_video(title, youtube_url, description)
+                    st.success("Video de YouTube guardado.")
+                except sqlite3.IntegrityError:
+                    st.warning("Ese video ya está en el catálogo.")
             else:
                 st.warning("Debes ingresar un título y una URL de YouTube.")
     elif accion == "Modificar datos video":
         st.info("Selecciona un video para modificar sus datos.")
-        videos = fetch_all_videos()
-        if not videos:
-            st.write("No hay videos guardados.")
-        else:
-            video_titles = [v[1] for v in videos]
-            selected_video_title = st.selectbox("Selecciona un video:", video_titles)
-            video_data = next((v for v in videos if v[1] == selected_video_title), None)
-            if video_data:
-                vid_id, title, url, desc = video_data
-                new_title = st.text_input("Nuevo título", value=title)
-                new_desc = st.text_area("Nueva descripción", value=desc)
-                if st.button("Actualizar video"):
-                    update_video(vid_id, new_title, new_desc)
-                    st.success("Datos del video actualizados.")
+        video_data = pick_content("video", "admin_edit_video", search_videos, fetch_videos_page)
+        if video_data:
+            vid_id, title, url, desc, embed_url, poster = video_data
+            new_title = st.text_input("Nuevo título", value=title)
+            new_desc = st.text_area("Nueva descripción", value=desc)
+            if st.button("Actualizar video"):
+                update_video(vid_id, new_title, new_desc)
+                st.success("Datos del video actualizados.")
     elif accion == "Borrar video":
         st.info("Selecciona un video para eliminarlo.")
-        videos = fetch_all_videos()
-        if not videos:
-            st.write("No hay videos guardados.")
-        else:
-            video_titles = [v[1] for v in videos]
-            selected_video_title = st.selectbox("Selecciona un video:", video_titles)
-            video_data = next((v for v in videos if v[1] == selected_video_title), None)
-            if video_data:
-                vid_id, title, url, desc = video_data
-                if st.button("Eliminar video"):
-                    conn = sqlite3.connect(DB_PATH)
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM videos WHERE id = ?", (vid_id,))
-                    conn.commit()
-                    conn.close()
-                    st.success("Video eliminado.")
+        video_data = pick_content("video", "admin_delete_video", search_videos, fetch_videos_page)
+        if video_data:
+            vid_id, title, url, desc, embed_url, poster = video_data
+            if st.button("Eliminar video"):
+                delete_video(vid_id)
+                st.success("Video eliminado.")
     elif accion == "Ver videos guardados":
         st.info("Lista de videos guardados:")
-        videos = fetch_all_videos()
+        query = st.text_input("🔎 Buscar videos", key="admin_videos_search")
+        if query.strip():
+            videos, nav = search_page("admin_videos_search_page", search_videos, query)
+        else:
+            videos, nav = keyset_page("admin_videos_page", fetch_videos_page)
         if not videos:
             st.write("No hay videos guardados.")
         else:
             cols = st.columns(3)
             # Obtener user_id del token si existe
-            user_id = None
-            if "token" in st.session_state and st.session_state["token"]:
-                try:
-                    payload = jwt.decode(st.session_state["token"], "super_secret_key", algorithms=["HS256"])
-                    user_id = payload.get("user_id")
-                except Exception:
-                    user_id = None
+            claims = get_claims(st.session_state.get("token"))
+            user_id = claims.get("user_id") if claims else None
+            likes_summary = get_videos_likes_summary([v[0] for v in videos], user_id)
             for idx, vid in enumerate(videos):
-                vid_id, title, url, desc = vid
+                vid_id, title, url, desc, embed_url, poster = vid
                 with cols[idx % 3]:
-                    st.markdown(f"**{title}**")
-                    if url.startswith("http"):
-                        st.video(url, format="video/mp4", start_time=0)
-                    else:
-                        try:
-                            if os.path.exists(url):
-                                with open(url, "rb") as f:
-                                    st.video(f)
-                            else:
-                                st.write("No se pudo cargar el video local.")
-                        except Exception:
-                            st.write("No se pudo cargar el video local.")
+                    video_facade(vid_id, title, embed_url or url, poster)
                     if desc:
                         st.caption(desc)
                     # Mostrar likes y botón si hay usuario logueado
-                    if user_id:
-                        likes = get_video_likes(vid_id)
-                        liked = user_liked_video(user_id, vid_id)
+                    likes, liked = likes_summary[vid_id]
+                    if user_id and can(claims, "content.like"):
                         if liked:
                             if st.button(f"❤️ Quitar me gusta ({likes})", key=f"unlike_video_{vid_id}"):
-                                unlike_video(user_id, vid_id)
-                                st.experimental_rerun()
+                                unlike_video(user_id, vid_id).result()
+                                st.rerun()
                         else:
                             if st.button(f"🤍 Me gusta ({likes})", key=f"like_video_{vid_id}"):
-                                like_video(user_id, vid_id)
-                                st.experimental_rerun()
+                                like_video(user_id, vid_id).result()
+                                track_event("like", claims, "video", vid_id)
+                                st.rerun()
                     else:
-                        likes = get_video_likes(vid_id)
                         st.write(f"👍 {likes} me gusta")
+            nav(None if query.strip() else count_videos())
@@ -0,0 +1,180 @@
+# modules/beyond_videos/video_player.py
+import email.utils
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+# Servidor local de medios: sirve los archivos registrados con soporte de Range
+MEDIA_HOST = os.environ.get("BEYOND_MEDIA_HOST", "127.0.0.1")
+MEDIA_PORT = int(os.environ.get("BEYOND_MEDIA_PORT", 8765))
+# URL con la que el navegador llega al servidor (p. ej. detrás de un proxy)
+MEDIA_BASE_URL = os.environ.get("BEYOND_MEDIA_URL", f"http://{MEDIA_HOST}:{MEDIA_PORT}")
+
+# Clave de sesión del único reproductor montado a la vez
+ACTIVE_PLAYER_KEY = "active_player"
+# Contenidos ya vistos en la sesión: un evento "view" por tarjeta y sesión
+VIEWED_KEY = "viewed_content"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_media = {}  # token -> ruta absoluta
+_server = None
+_server_lock = threading.Lock()
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        path = _media.get(self.path.split("?", 1)[0].rsplit("/", 1)[-1])
+        if path is None or not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+        last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (not if_range or if_range in (etag, last_modified)):
+            match = _RANGE_RE.match(range_header.strip())
+            if match and (match.group(1) or match.group(2)):
+                if match.group(1):
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+                else:
+                    # Rango sufijo: los últimos N bytes
+                    start = max(size - int(match.group(2)), 0)
+                status = HTTPStatus.PARTIAL_CONTENT
+            if status != HTTPStatus.PARTIAL_CONTENT or start > end or start >= size:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Cache-Control", "private, max-age=3600")
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if send_body and length:
+            with open(path, "rb") as f:
+                try:
+                    # socket.sendfile usa os.sendfile (zero-copy) cuando el SO lo permite
+                    self.connection.sendfile(f, offset=start, count=length)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # el navegador cancela la petición al hacer seek
+
+
+def start_media_server():
+    """
+    Arranca (una sola vez por proceso) el servidor HTTP de medios locales.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            server = ThreadingHTTPServer((MEDIA_HOST, MEDIA_PORT), _MediaHandler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="beyond-media-server", daemon=True).start()
+            _server = server
+    return _server
+
+
+def register_media(path):
+    """
+    Registra un archivo local y retorna la URL desde la que se puede reproducir.
+    El token es estable para la misma ruta, así que registrar en cada rerun es barato.
+    """
+    path = os.path.abspath(path)
+    token = hashlib.sha256(path.encode("utf-8")).hexdigest()[:24]
+    _media[token] = path
+    start_media_server()
+    return f"{MEDIA_BASE_URL}/media/{token}"
+
+
+def render_video(url, start_time=0):
+    """
+    Muestra un video: enlaces http(s) directamente y archivos locales a través
+    del servidor de medios, sin leer el archivo en el proceso de Streamlit.
+    `start_time` (segundos) inicia la reproducción en ese punto.
+    """
+    if url.startswith("http"):
+        st.video(url, format="video/mp4", start_time=start_time)
+    elif os.path.isfile(url):
+        try:
+            st.video(register_media(url), start_time=start_time)
+        except OSError:
+            st.write("No se pudo cargar el video local.")
+    else:
+        st.write("No se pudo cargar el video local.")
+
+
+def _track(event_type, content):
+    from auth.jwt_manager import get_claims
+    from db.events import track_event
+    track_event(event_type, get_claims(st.session_state.get("token")), *content)
+
+
+def player_facade(key, title, url, render=render_video, poster=None, content=None):
+    """
+    Tarjeta ligera con póster, título y botón de reproducir. El reproductor
+    real (iframe de YouTube o <video>) solo se monta al activar la tarjeta,
+    y como mucho hay un reproductor activo por sesión.
+    `content` = (tipo, id) registra los eventos "view" y "play" del contenido.
+    """
+    if content:
+        viewed = st.session_state.setdefault(VIEWED_KEY, set())
+        if key not in viewed:
+            viewed.add(key)
+            _track("view", content)
+    st.markdown(f"**{title}**")
+    if st.session_state.get(ACTIVE_PLAYER_KEY) == key:
+        render(url)
+        if st.button("⏹️ Cerrar reproductor", key=f"close_{key}"):
+            st.session_state[ACTIVE_PLAYER_KEY] = None
+            st.rerun()
+        return
+    if poster:
+        st.image(poster)
+    else:
+        st.markdown("🎬")
+    if st.button("▶️ Reproducir", key=f"play_{key}"):
+        if content:
+            _track("play", content)
+        st.session_state[ACTIVE_PLAYER_KEY] = key
+        st.rerun()
+
+
+def video_facade(video_id, title, url, poster=None):
+    player_facade(f"video_{video_id}", title, url, render_video, poster, ("video", video_id))
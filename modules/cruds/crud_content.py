@@ -0,0 +1,383 @@
+# modules/cruds/crud_content.py
+import csv
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import streamlit as st
+from auth.permissions import require
+from db.cache import bump_catalog_version
+from db.connection import connection
+from db.writer import get_writer
+from modules.utils.media import parse_media_url
+
+# Filas por transacción al importar
+CHUNK_SIZE = 5000
+# Hasta este tamaño la exportación de la interfaz queda en memoria; más, en disco
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+# Errores por fila que se conservan en el reporte (el total se cuenta siempre)
+MAX_REPORTED_ERRORS = 1000
+
+KINDS = {"videos": "Videos", "podcasts": "Podcasts", "summits": "Summits"}
+FORMATS = ("csv", "jsonl")
+
+# Columnas de cada tipo al exportar
+EXPORT_COLUMNS = {
+    "videos": ("id", "title", "url", "description", "provider", "media_id", "like_count"),
+    "podcasts": ("id", "title", "url", "description", "provider", "media_id", "like_count"),
+    "summits": ("id", "title", "description", "start", "end", "timezone", "status"),
+}
+
+
+class ImportReport:
+    """
+    Resultado de una importación: filas leídas, insertadas y errores por fila
+    [(línea, mensaje)]; se guardan los primeros MAX_REPORTED_ERRORS.
+    """
+
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+# ===============================
+# Lectura en streaming
+# ===============================
+def iter_records(stream, fmt):
+    """
+    Genera (línea, dict) leyendo `stream` (texto) fila a fila, sin cargarlo
+    entero. Las líneas JSONL inválidas se entregan como (línea, ValueError).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield number, ValueError(f"JSON inválido: {exc.msg}")
+            continue
+        if not isinstance(record, dict):
+            yield number, ValueError("Cada línea debe ser un objeto JSON.")
+            continue
+        yield number, record
+
+
+def _text(record, field, required=False):
+    value = record.get(field)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError(f"Falta el campo '{field}'.")
+    return value
+
+
+# ===============================
+# Validación y normalización por tipo
+# ===============================
+def _normalize_media(record):
+    title = _text(record, "title", required=True)
+    media = parse_media_url(_text(record, "url", required=True))
+    return (title, media.url, _text(record, "description"), media.provider, media.media_id,
+            media.embed_url, media.poster_url)
+
+
+def _parse_moment(value, timezone):
+    value = str(value).strip()
+    if value.lstrip("-").isdigit():
+        return int(value)
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Fecha inválida: {value!r} (usa AAAA-MM-DD HH:MM o epoch).") from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=ZoneInfo(timezone))
+    return int(moment.timestamp())
+
+
+def _normalize_summit(record):
+    from modules.beyond_summit.summit_manager import DEFAULT_TIMEZONE, MAX_DURATION, format_local, status_at
+
+    title = _text(record, "title", required=True)
+    timezone = _text(record, "timezone") or DEFAULT_TIMEZONE
+    try:
+        ZoneInfo(timezone)
+    except (ValueError, KeyError):
+        raise ValueError(f"Zona horaria desconocida: {timezone!r}.") from None
+    start_ts = _parse_moment(_text(record, "start", required=True), timezone)
+    end_ts = _parse_moment(_text(record, "end", required=True), timezone)
+    if end_ts <= start_ts:
+        raise ValueError("La hora de fin debe ser posterior a la de inicio.")
+    if end_ts - start_ts > MAX_DURATION:
+        raise ValueError(f"Un Summit puede durar como máximo {MAX_DURATION // 3600} horas.")
+    return (title, format_local(start_ts, timezone, "%Y-%m-%d"), _text(record, "description"),
+            start_ts, end_ts, timezone, status_at(start_ts, end_ts, time.time()))
+
+
+_MEDIA_INSERT = (
+    "INSERT INTO {table} (title, url, description, provider, media_id, embed_url, poster_url) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_SUMMIT_INSERT = (
+    "INSERT INTO summits (title, date, description, start_ts, end_ts, timezone, status) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _existing_media(conn, table, chunk):
+    """
+    (provider, media_id) del lote que ya están en el catálogo, con una consulta por proveedor.
+    """
+    existing = set()
+    by_provider = {}
+    for _, row in chunk:
+        by_provider.setdefault(row[3], []).append(row[4])
+    for provider, media_ids in by_provider.items():
+        # Lotes de 500 para no pasar el límite de parámetros de SQLite
+        for start in range(0, len(media_ids), 500):
+            part = media_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in part)
+            existing.update(
+                (provider, media_id) for (media_id,) in conn.execute(
+                    f"SELECT media_id FROM {table} WHERE provider = ? AND media_id IN ({placeholders})",
+                    (provider, *part)
+                )
+            )
+    return existing
+
+
+def _insert_rows(conn, sql, chunk, rejected):
+    """
+    Inserta [(línea, fila)] con executemany; si alguna fila viola una
+    restricción se repite fila a fila, para que solo esa quede como error
+    con el mensaje `rejected(fila, exc)`. Retorna (insertadas, errores).
+    """
+    conn.execute("SAVEPOINT import_chunk")
+    try:
+        conn.executemany(sql, [row for _, row in chunk])
+    except sqlite3.IntegrityError:
+        conn.execute("ROLLBACK TO import_chunk")
+    else:
+        conn.execute("RELEASE import_chunk")
+        return [row for _, row in chunk], []
+    conn.execute("RELEASE import_chunk")
+    inserted, errors = [], []
+    for line, row in chunk:
+        try:
+            conn.execute(sql, row)
+        except sqlite3.IntegrityError as exc:
+            errors.append((line, rejected(row, exc)))
+        else:
+            inserted.append(row)
+    return inserted, errors
+
+
+def _insert_chunk(kind, chunk, report, seen):
+    """
+    Inserta un lote como una operación del escritor único. Los duplicados (en
+    el archivo o en el catálogo) se reportan como error de su fila y no se insertan.
+    """
+    def write(conn):
+        if kind == "summits":
+            return _insert_rows(conn, _SUMMIT_INSERT, chunk, lambda row, exc: f"Summit rechazado: {exc}")
+        existing = _existing_media(conn, kind, chunk)
+        rows, errors = [], []
+        for line, row in chunk:
+            media_key = (row[3], row[4])
+            if media_key in existing or media_key in seen:
+                errors.append((line, f"Medio duplicado: {row[1]}"))
+                continue
+            existing.add(media_key)
+            rows.append((line, row))
+        inserted, rejected = _insert_rows(
+            conn, _MEDIA_INSERT.format(table=kind), rows, lambda row, exc: f"Medio duplicado: {row[1]}"
+        )
+        return inserted, errors + rejected
+
+    inserted, errors = get_writer().submit(write).result()
+    for line, message in sorted(errors):
+        report.error(line, message)
+    if kind != "summits":
+        seen.update((row[3], row[4]) for row in inserted)
+    report.inserted += len(inserted)
+
+
+def import_content(kind, stream, fmt, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Importa videos, podcasts o summits desde `stream` (texto CSV o JSONL)
+    leyendo fila a fila. Cada fila se valida y normaliza (URLs con
+    parse_media_url, fechas a epoch); las inválidas se reportan y el resto
+    se inserta en transacciones de `chunk_size` filas. Retorna un ImportReport.
+    `progress(report)` se llama tras cada lote.
+    """
+    normalize = _normalize_summit if kind == "summits" else _normalize_media
+    report = ImportReport()
+    started = time.perf_counter()
+    seen = set()  # medios ya importados en este archivo
+    chunk = []
+    line = 0
+    try:
+        try:
+            for line, record in iter_records(stream, fmt):
+                report.read += 1
+                if isinstance(record, Exception):
+                    report.error(line, str(record))
+                    continue
+                try:
+                    chunk.append((line, normalize(record)))
+                except ValueError as exc:
+                    report.error(line, str(exc))
+                    continue
+                if len(chunk) >= chunk_size:
+                    _insert_chunk(kind, chunk, report, seen)
+                    chunk = []
+                    if progress:
+                        progress(report)
+        except UnicodeDecodeError:
+            # El resto del archivo no se puede leer; lo ya validado sí se inserta
+            report.error(
+                line + 1,
+                "El archivo no está en UTF-8: se detuvo la lectura aquí. Guárdalo como UTF-8 y vuelve a importarlo.",
+            )
+        if chunk:
+            _insert_chunk(kind, chunk, report, seen)
+    finally:
+        # Los lotes ya confirmados deben verse aunque la importación se corte
+        if report.inserted:
+            bump_catalog_version()
+        report.seconds = time.perf_counter() - started
+    return report
+
+
+# ===============================
+# Exportación en streaming
+# ===============================
+def _export_query(kind):
+    if kind == "summits":
+        return "SELECT id, title, description, start_ts, end_ts, timezone, status FROM summits ORDER BY id"
+    return f"SELECT {', '.join(EXPORT_COLUMNS[kind])} FROM {kind} ORDER BY id"
+
+
+def _export_row(kind, row):
+    if kind != "summits":
+        return row
+    from modules.beyond_summit.summit_manager import DEFAULT_TIMEZONE, format_local
+
+    summit_id, title, description, start_ts, end_ts, timezone, status = row
+    timezone = timezone or DEFAULT_TIMEZONE
+    as_text = lambda ts: "" if ts is None else format_local(ts, timezone, "%Y-%m-%d %H:%M")
+    return (summit_id, title, description, as_text(start_ts), as_text(end_ts), timezone, status)
+
+
+def export_content(kind, out, fmt):
+    """
+    Escribe el catálogo de `kind` en `out` (texto) directamente desde el
+    cursor, fila a fila, sin materializar la consulta. Retorna las filas escritas.
+    """
+    columns = EXPORT_COLUMNS[kind]
+    written = 0
+    with connection() as conn:
+        cursor = conn.execute(_export_query(kind))
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for row in cursor:
+                writer.writerow(_export_row(kind, tuple(row)))
+                written += 1
+        else:
+            for row in cursor:
+                out.write(json.dumps(dict(zip(columns, _export_row(kind, tuple(row)))), ensure_ascii=False))
+                out.write("\n")
+                written += 1
+    return written
+
+
+# ===============================
+# Interfaz Streamlit
+# ===============================
+def show_content_bulk():
+    require("content.import")
+    st.subheader("📦 Importar y exportar contenido")
+    kind = st.selectbox("Tipo de contenido", list(KINDS), format_func=KINDS.get, key="bulk_kind")
+
+    st.markdown("#### Importar")
+    if kind == "summits":
+        st.caption("Columnas: title, description, start, end, timezone (fechas como AAAA-MM-DD HH:MM).")
+    else:
+        st.caption("Columnas: title, url, description.")
+    uploaded = st.file_uploader("Archivo CSV o JSONL", type=["csv", "jsonl"], key="bulk_file")
+    if uploaded is not None and st.button("Importar", key="bulk_import"):
+        fmt = "jsonl" if uploaded.name.lower().endswith(".jsonl") else "csv"
+        status = st.empty()
+        stream = io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline="")
+        report = import_content(
+            kind, stream, fmt,
+            progress=lambda r: status.caption(f"⏳ {r.read} filas leídas, {r.inserted} insertadas…")
+        )
+        status.empty()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Filas leídas", report.read)
+        col2.metric("Insertadas", report.inserted)
+        col3.metric("Con error", report.failed)
+        st.caption(f"Importación completada en {report.seconds:.1f} s.")
+        if report.errors:
+            st.dataframe(
+                [{"línea": line, "error": message} for line, message in report.errors],
+                use_container_width=True,
+            )
+            if report.failed > len(report.errors):
+                st.caption(f"Se muestran los primeros {len(report.errors)} errores.")
+
+    st.markdown("#### Exportar")
+    fmt = st.radio("Formato", FORMATS, horizontal=True, key="bulk_export_format")
+    if st.button("Preparar exportación", key="bulk_export"):
+        # El archivo se escribe desde el cursor, por bloques, en un temporal que
+        # pasa a disco si crece; la descarga lo lee desde ahí, sin otra copia en texto
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as spool:
+            out = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+            rows = export_content(kind, out, fmt)
+            out.flush()
+            out.detach()
+            data = io.BufferedReader(spool)
+            st.download_button(
+                f"⬇️ Descargar {rows} filas", data,
+                file_name=f"{kind}.{fmt}", mime="text/csv" if fmt == "csv" else "application/x-ndjson",
+            )
+            data.detach()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importación y exportación masiva del catálogo.")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("kind", choices=list(KINDS))
+    parser.add_argument("path")
+    args = parser.parse_args()
+    fmt = "jsonl" if os.path.splitext(args.path)[1].lower() == ".jsonl" else "csv"
+    if args.action == "import":
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            report = import_content(args.kind, f, fmt)
+        print(f"✅ {report.inserted}/{report.read} filas importadas en {report.seconds:.1f} s ({report.failed} con error).")
+        for line, message in report.errors[:50]:
+            print(f"⚠️ línea {line}: {message}")
+    else:
+        with open(args.path, "w", encoding="utf-8", newline="") as f:
+            rows = export_content(args.kind, f, fmt)
+        print(f"✅ {rows} filas exportadas a {args.path}.")
@@ -1,7 +1,45 @@
 import streamlit as st
-from db.connection import fetch_all, fetch_one, execute_query
+from auth.jwt_manager import revoke_role_tokens
+from auth.permissions import (
+    CAPABILITIES, ensure_role_manager, reload_permissions, replace_role_permissions, require, role_capabilities
+)
+from db.connection import fetch_all, fetch_one
+from db.writer import get_writer
+
+def _capabilities_input(label, default=(), key=None):
+    return st.multiselect(label, list(CAPABILITIES), default=sorted(default), format_func=CAPABILITIES.get, key=key)
+
+def _write(op):
+    """
+    Ejecuta `op(conn)` en el escritor y recompila la matriz de permisos.
+    """
+    try:
+        return get_writer().submit(op).result()
+    finally:
+        reload_permissions()
+
+def _create_role(conn, name, capabilities):
+    conn.execute("INSERT INTO roles (name) VALUES (?)", (name,))
+    replace_role_permissions(conn, name, capabilities)
+
+def _update_role(conn, role_id, old_name, new_name, capabilities):
+    # Renombrar arrastra a los usuarios y permisos del rol
+    conn.execute("UPDATE roles SET name=? WHERE id=?", (new_name, role_id))
+    conn.execute("UPDATE users SET role=? WHERE role=?", (new_name, old_name))
+    conn.execute("UPDATE role_permissions SET role=? WHERE role=?", (new_name, old_name))
+    replace_role_permissions(conn, new_name, capabilities)
+
+def _delete_role(conn, role_id):
+    name = conn.execute("SELECT name FROM roles WHERE id=?", (role_id,)).fetchone()[0]
+    in_use = conn.execute("SELECT total FROM user_counts WHERE role=?", (name,)).fetchone()
+    if in_use and in_use[0] > 0:
+        raise ValueError(f"{in_use[0]} usuario(s) tienen el rol '{name}'.")
+    conn.execute("DELETE FROM role_permissions WHERE role=?", (name,))
+    conn.execute("DELETE FROM roles WHERE id=?", (role_id,))
+    ensure_role_manager(conn)
 
 def show_roles_crud():
+    require("roles.manage")
     st.subheader("🔑 Gestión de Roles")
 
     action = st.radio(
@@ -12,21 +50,22 @@ def show_roles_crud():
 
     if action == "Ver roles":
         roles = fetch_all("SELECT id, name FROM roles")
-        st.table(roles)
+        st.table([
+            {"id": r["id"], "name": r["name"], "permisos": ", ".join(sorted(role_capabilities(r["name"])))}
+            for r in roles
+        ])
 
     elif action == "Crear rol":
         with st.form("create_role_form"):
             new_role = st.text_input("Nombre del nuevo rol")
+            capabilities = _capabilities_input("Permisos")
             submitted = st.form_submit_button("Crear rol")
             if submitted:
                 if new_role:
                     try:
-                        execute_query(
-                            "INSERT INTO roles (name) VALUES (?)",
-                            (new_role,)
-                        )
+                        _write(lambda conn: _create_role(conn, new_role, capabilities))
                         st.success(f"Rol '{new_role}' creado correctamente.")
-                        st.experimental_rerun()
+                        st.rerun()
                     except Exception as e:
                         st.error(f"Error al crear rol: {e}")
                 else:
@@ -41,15 +80,20 @@ def show_roles_crud():
             if role_data:
                 with st.form("edit_role_form"):
                     edit_name = st.text_input("Nuevo nombre de rol", value=role_data["name"])
+                    capabilities = _capabilities_input(
+                        "Permisos", role_capabilities(role_data["name"]), key=f"edit_role_caps_{selected_id}"
+                    )
                     edit_submitted = st.form_submit_button("Actualizar rol")
                     if edit_submitted:
                         try:
-                            execute_query(
-                                "UPDATE roles SET name=? WHERE id=?",
-                                (edit_name, selected_id)
-                            )
+                            _write(lambda conn: _update_role(
+                                conn, selected_id, role_data["name"], edit_name, capabilities
+                            ))
+                            if edit_name != role_data["name"]:
+                                # Las sesiones abiertas llevan el nombre anterior del rol
+                                revoke_role_tokens(role_data["name"])
                             st.success("Rol actualizado correctamente.")
-                            st.experimental_rerun()
+                            st.rerun()
                         except Exception as e:
                             st.error(f"Error al actualizar rol: {e}")
         else:
@@ -62,9 +106,9 @@ def show_roles_crud():
             del_id = st.selectbox("Selecciona rol a eliminar por ID", role_ids, key="delete_role")
             if st.button("Eliminar rol"):
                 try:
-                    execute_query("DELETE FROM roles WHERE id=?", (del_id,))
+                    _write(lambda conn: _delete_role(conn, del_id))
                     st.success("Rol eliminado correctamente.")
-                    st.experimental_rerun()
+                    st.rerun()
                 except Exception as e:
                     st.error(f"Error al eliminar rol: {e}")
         else:
@@ -1,24 +1,196 @@
 import streamlit as st
+from auth.jwt_manager import revoke_user_tokens
+from auth.permissions import current_claims, require, role_names
 from db.connection import fetch_all, fetch_one, execute_query
-import jwt
+from db.writer import get_writer
+from modules.utils.helpers import cursor_page
+from modules.utils.security import hash_password
 
-SECRET_KEY = "super_secret_key"
+USERS_PAGE_SIZE = 50
+# Con búsqueda por prefijo se cuenta hasta este tope ("1000+")
+COUNT_CAP = 1000
 
-def encrypt_password(password):
-    return jwt.encode({"pwd": password}, SECRET_KEY, algorithm="HS256")
+def get_roles():
+    # Los nombres salen de la matriz de permisos compilada, sin consultar la tabla
+    return role_names()
 
-def verify_password(stored_password, provided_password):
-    try:
-        decoded = jwt.decode(stored_password, SECRET_KEY, algorithms=["HS256"])
-        return decoded.get("pwd") == provided_password
-    except Exception:
-        return False
 
-def get_roles():
-    roles = fetch_all("SELECT name FROM roles")
-    return [r["name"] for r in roles] if roles else ["admin", "user free", "user premium", "coach"]
+# ===============================
+# Datos
+# ===============================
+def _user_filters(prefix, role):
+    """
+    Condiciones WHERE para el prefijo de usuario y el rol. El prefijo se
+    busca como rango [prefijo, prefijo + U+10FFFF) para que use el índice de
+    username (o el de (role, username) si hay rol); distingue mayúsculas.
+    """
+    clauses, params = [], []
+    if role:
+        clauses.append("role = ?")
+        params.append(role)
+    if prefix:
+        clauses.append("username >= ? AND username < ?")
+        params += [prefix, prefix + "\U0010ffff"]
+    return clauses, params
+
+
+def users_page(prefix="", role=None, after=None, limit=USERS_PAGE_SIZE):
+    """
+    Página de usuarios (id, username, role) ordenada por username, desde el
+    cursor `after` (el último username de la página anterior).
+    """
+    clauses, params = _user_filters(prefix, role)
+    if after is not None:
+        clauses.append("username > ?")
+        params.append(after)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return fetch_all(
+        f"SELECT id, username, role FROM users {where} ORDER BY username LIMIT ?", (*params, limit)
+    )
+
+
+def count_users(prefix="", role=None):
+    """
+    Retorna (total, exacto). Sin prefijo el total sale de user_counts
+    (mantenido por triggers); con prefijo se cuenta hasta COUNT_CAP filas.
+    """
+    if not prefix:
+        if role:
+            row = fetch_one("SELECT total FROM user_counts WHERE role = ?", (role,))
+            return (row[0] if row else 0), True
+        return fetch_one("SELECT COALESCE(SUM(total), 0) FROM user_counts")[0], True
+    clauses, params = _user_filters(prefix, role)
+    total = fetch_one(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM users WHERE {' AND '.join(clauses)} LIMIT ?)",
+        (*params, COUNT_CAP + 1)
+    )[0]
+    return min(total, COUNT_CAP), total <= COUNT_CAP
+
+
+def set_users_role(user_ids, role):
+    """
+    Cambia el rol de varios usuarios en una sola operación del escritor y
+    revoca sus sesiones abiertas, que llevan el rol anterior. Retorna cuántos cambió.
+    """
+    if not user_ids:
+        return 0
+
+    def op(conn):
+        if not conn.execute("SELECT 1 FROM roles WHERE name = ?", (role,)).fetchone():
+            raise ValueError(f"El rol '{role}' no existe.")
+        changed = [
+            uid for uid in user_ids
+            if conn.execute("SELECT 1 FROM users WHERE id = ? AND role IS NOT ?", (uid, role)).fetchone()
+        ]
+        conn.executemany("UPDATE users SET role = ? WHERE id = ?", [(role, uid) for uid in changed])
+        return changed
+
+    changed = get_writer().submit(op).result()
+    revoke_user_tokens(changed)
+    return len(changed)
+
+
+def delete_users(user_ids):
+    """
+    Elimina varios usuarios y sus datos (likes e inscripciones) en una sola
+    operación del escritor. Sus plazas confirmadas en Summits pasan a la lista
+    de espera y sus likes se descuentan de la tendencia y de las
+    recomendaciones como cualquier unlike, y sus sesiones quedan revocadas.
+    Retorna cuántos eliminó.
+    """
+    from db.likes import delete_user_likes
+    from modules.beyond_summit.summit_registrations import _cancel
+
+    if not user_ids:
+        return 0
+
+    def op(conn):
+        for uid in user_ids:
+            for (summit_id,) in conn.execute(
+                "SELECT summit_id FROM summit_registrations WHERE user_id = ?", (uid,)
+            ).fetchall():
+                _cancel(conn, summit_id, uid)
+            delete_user_likes(conn, uid)
+        params = [(uid,) for uid in user_ids]
+        conn.executemany("DELETE FROM summit_registrations WHERE user_id = ?", params)
+        return conn.executemany("DELETE FROM users WHERE id = ?", params).rowcount
+
+    deleted = get_writer().submit(op).result()
+    revoke_user_tokens(user_ids)
+    return deleted
+
+
+# ===============================
+# Interfaz Streamlit
+# ===============================
+def _current_user_id():
+    return (current_claims() or {}).get("user_id")
+
+
+def _filters(key):
+    col_search, col_role = st.columns([3, 2])
+    prefix = col_search.text_input("🔎 Usuario empieza por", key=f"{key}_prefix").strip()
+    role = col_role.selectbox("Rol", ["Todos"] + get_roles(), key=f"{key}_role")
+    return prefix, None if role == "Todos" else role
+
+
+def _pick_user(key):
+    """
+    Buscador por prefijo + selectbox con los primeros resultados; nunca carga
+    más de una página de usuarios. Retorna la fila elegida o None.
+    """
+    prefix, role = _filters(key)
+    users = users_page(prefix, role, limit=USERS_PAGE_SIZE)
+    if not users:
+        st.info("No hay usuarios que coincidan.")
+        return None
+    users_by_id = {u["id"]: u for u in users}
+    selected_id = st.selectbox(
+        "Selecciona usuario", list(users_by_id),
+        format_func=lambda uid: f"{users_by_id[uid]['username']} ({users_by_id[uid]['role']})", key=key
+    )
+    return users_by_id.get(selected_id)
+
+
+def _show_users_grid():
+    prefix, role = _filters("users_grid")
+    users, nav = cursor_page(
+        "users_grid_page",
+        lambda after, limit: users_page(prefix, role, after=after, limit=limit),
+        lambda row: row["username"], page_size=USERS_PAGE_SIZE, scope=(prefix, role)
+    )
+    if not users:
+        st.info("No hay usuarios que coincidan.")
+        return
+    edited = st.data_editor(
+        [{"Seleccionar": False, "id": u["id"], "Usuario": u["username"], "Rol": u["role"]} for u in users],
+        disabled=["id", "Usuario", "Rol"], hide_index=True, use_container_width=True,
+        key=f"users_grid_editor_{prefix}_{role}_{users[0]['id']}",
+    )
+    total, exact = count_users(prefix, role)
+    nav(total if exact else f"{total}+")
+
+    selected = [row["id"] for row in edited if row["Seleccionar"]]
+    if not selected:
+        return
+    st.markdown(f"**{len(selected)} usuario(s) seleccionado(s)**")
+    col_role, col_apply, col_delete = st.columns([2, 1, 1])
+    new_role = col_role.selectbox("Nuevo rol", get_roles(), key="users_bulk_role")
+    if col_apply.button("Cambiar rol", key="users_bulk_apply"):
+        changed = set_users_role(selected, new_role)
+        st.success(f"Rol actualizado para {changed} usuario(s).")
+        st.rerun()
+    if col_delete.button("🗑️ Eliminar", key="users_bulk_delete"):
+        if _current_user_id() in selected:
+            st.error("No puedes eliminar tu propio usuario.")
+        else:
+            deleted = delete_users(selected)
+            st.success(f"{deleted} usuario(s) eliminado(s).")
+            st.rerun()
+
 
 def show_users_crud():
+    require("users.manage")
     st.subheader("👤 Gestión de Usuarios")
 
     action = st.radio(
@@ -28,8 +200,7 @@ def show_users_crud():
     )
 
     if action == "Ver usuarios":
-        users = fetch_all("SELECT id, username, role FROM users")
-        st.table(users)
+        _show_users_grid()
 
     elif action == "Crear usuario":
         roles = get_roles()
@@ -41,7 +212,7 @@ def show_users_crud():
             if submitted:
                 if new_username and new_password:
                     try:
-                        encrypted_pwd = encrypt_password(new_password)
+                        encrypted_pwd = hash_password(new_password)
                         execute_query(
                             "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
                             (new_username, encrypted_pwd, new_role)
@@ -54,49 +225,40 @@ def show_users_crud():
                     st.warning("Completa todos los campos.")
 
     elif action == "Modificar usuario":
-        users = fetch_all("SELECT id, username, role FROM users")
-        user_ids = [u["id"] for u in users] if users else []
-        if user_ids:
-            selected_id = st.selectbox("Selecciona usuario por ID", user_ids)
-            user_data = fetch_one("SELECT username, role FROM users WHERE id = ?", (selected_id,))
-            roles = get_roles()
-            if user_data:
-                with st.form("edit_user_form"):
-                    edit_username = st.text_input("Nuevo usuario", value=user_data["username"])
-                    edit_role = st.selectbox("Nuevo rol", roles, index=roles.index(user_data["role"]) if user_data["role"] in roles else 0)
-                    edit_password = st.text_input("Nueva contraseña (opcional)", type="password")
-                    edit_submitted = st.form_submit_button("Actualizar usuario")
-                    if edit_submitted:
-                        try:
-                            if edit_password:
-                                encrypted_pwd = encrypt_password(edit_password)
-                                execute_query(
-                                    "UPDATE users SET username=?, password=?, role=? WHERE id=?",
-                                    (edit_username, encrypted_pwd, edit_role, selected_id)
-                                )
-                            else:
-                                execute_query(
-                                    "UPDATE users SET username=?, role=? WHERE id=?",
-                                    (edit_username, edit_role, selected_id)
-                                )
-                            st.success("Usuario actualizado correctamente.")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error al actualizar usuario: {e}")
-        else:
-            st.info("No hay usuarios para modificar.")
+        user_data = _pick_user("edit_user")
+        roles = get_roles()
+        if user_data:
+            selected_id = user_data["id"]
+            with st.form("edit_user_form"):
+                edit_username = st.text_input("Nuevo usuario", value=user_data["username"])
+                edit_role = st.selectbox("Nuevo rol", roles, index=roles.index(user_data["role"]) if user_data["role"] in roles else 0)
+                edit_password = st.text_input("Nueva contraseña (opcional)", type="password")
+                edit_submitted = st.form_submit_button("Actualizar usuario")
+                if edit_submitted:
+                    try:
+                        if edit_password:
+                            encrypted_pwd = hash_password(edit_password)
+                            execute_query(
+                                "UPDATE users SET username=?, password=?, role=? WHERE id=?",
+                                (edit_username, encrypted_pwd, edit_role, selected_id)
+                            )
+                        else:
+                            execute_query(
+                                "UPDATE users SET username=?, role=? WHERE id=?",
+                                (edit_username, edit_role, selected_id)
+                            )
+                        st.success("Usuario actualizado correctamente.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error al actualizar usuario: {e}")
 
     elif action == "Eliminar usuario":
-        users = fetch_all("SELECT id, username FROM users")
-        user_ids = [u["id"] for u in users] if users else []
-        if user_ids:
-            del_id = st.selectbox("Selecciona usuario a eliminar por ID", user_ids, key="delete_user")
+        user_data = _pick_user("delete_user")
+        if user_data:
             if st.button("Eliminar usuario"):
                 try:
-                    execute_query("DELETE FROM users WHERE id=?", (del_id,))
+                    delete_users([user_data["id"]])
                     st.success("Usuario eliminado correctamente.")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error al eliminar usuario: {e}")
-        else:
-            st.info("No hay usuarios para eliminar.")
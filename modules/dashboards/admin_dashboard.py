@@ -1,26 +1,82 @@
 import streamlit as st
-from modules.cruds.crud_users import show_users_crud
-from modules.cruds.crud_roles import show_roles_crud
-from modules.beyond_videos.video_manager import admin_videos_crud  # Importar desde video_manager
-from modules.beyond_podcasts.podcast_manager import admin_podcasts_crud  # Importar desde podcast_manager
+from auth.jwt_manager import revoke_token
+from auth.permissions import can, current_claims, require
+
+# Secciones del panel y la capacidad que exige cada una
+SECTIONS = [
+    ("Usuarios", "users.manage"),
+    ("Roles", "roles.manage"),
+    ("Videos", "videos.manage"),
+    ("Podcasts", "podcasts.manage"),
+    ("Summits", "summits.manage"),
+    ("Repeticiones", "summits.manage"),
+    ("Importar/Exportar", "content.import"),
+    ("Analítica", "analytics.view"),
+    ("Caché", "analytics.view"),
+]
 
 def show_admin_dashboard():
+    require("admin.panel")
     st.header("📊 Panel de Administración")
     
     # Mejor manejo de logout usando solo session_state
     if st.button("Cerrar sesión", key="logout_btn"):
+        revoke_token(st.session_state["token"])
         st.session_state["token"] = None
         st.rerun()
 
-    menu = ["Usuarios", "Roles", "Videos", "Podcasts"]
+    claims = current_claims()
+    menu = [section for section, capability in SECTIONS if can(claims, capability)]
+    if not menu:
+        st.info("Tu rol no tiene secciones de administración asignadas.")
+        return
     choice = st.selectbox("Selecciona una sección para administrar:", menu)
 
+    # Cada sección se importa solo cuando se abre
     if choice == "Usuarios":
+        from modules.cruds.crud_users import show_users_crud
         show_users_crud()
     elif choice == "Roles":
+        from modules.cruds.crud_roles import show_roles_crud
         show_roles_crud()
     elif choice == "Videos":
-        admin_videos_crud()  # Llamar a la función importada
+        from modules.beyond_videos.video_manager import admin_videos_crud
+        admin_videos_crud()
     elif choice == "Podcasts":
-        admin_podcasts_crud()  # Llamar a la función importada
+        from modules.beyond_podcasts.podcast_manager import admin_podcasts_crud
+        admin_podcasts_crud()
+    elif choice == "Summits":
+        from modules.beyond_summit.summit_manager import admin_summits_crud
+        admin_summits_crud()
+    elif choice == "Repeticiones":
+        from modules.beyond_summit.summit_replays import admin_replays_crud
+        admin_replays_crud()
+    elif choice == "Importar/Exportar":
+        from modules.cruds.crud_content import show_content_bulk
+        show_content_bulk()
+    elif choice == "Analítica":
+        from modules.dashboards.analytics_dashboard import show_analytics_dashboard
+        show_analytics_dashboard()
+    elif choice == "Caché":
+        show_cache_stats()
+
+def show_cache_stats():
+    from db.cache import catalog_cache, lookup_cache
+    require("analytics.view")
+    st.subheader("⚡ Caché del catálogo")
+    stats = catalog_cache.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Aciertos", stats["hits"])
+    col2.metric("Fallos", stats["misses"])
+    col3.metric("Tasa de acierto", f"{stats['hit_ratio']:.0%}")
+    col4.metric("Entradas", f"{stats['entries']}/{catalog_cache.maxsize}")
+    st.caption(
+        f"Versión del catálogo: {stats['version']} · Expulsiones LRU: {stats['evictions']} · "
+        f"TTL: {catalog_cache.ttl} s"
+    )
+    lookup = lookup_cache.stats()
+    st.caption(
+        f"Búsquedas y recomendaciones (caché aparte): {lookup['entries']}/{lookup_cache.maxsize} entradas · "
+        f"tasa de acierto {lookup['hit_ratio']:.0%} · expulsiones {lookup['evictions']} · TTL: {lookup_cache.ttl} s"
+    )
 
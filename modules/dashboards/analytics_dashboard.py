@@ -0,0 +1,80 @@
+import time
+from datetime import datetime, timezone
+
+import streamlit as st
+from auth.permissions import require
+from db.events import HOUR, DAY, event_series, totals_by_role, top_content
+
+# Periodos del panel: (etiqueta, segundos, granularidad)
+PERIODS = [
+    ("Últimas 48 horas", 2 * DAY, "hour"),
+    ("Últimos 7 días", 7 * DAY, "day"),
+    ("Últimos 30 días", 30 * DAY, "day"),
+    ("Últimos 90 días", 90 * DAY, "day"),
+    ("Último año", 365 * DAY, "day"),
+]
+
+EVENT_LABELS = {"view": "Vistas", "play": "Reproducciones", "like": "Me gusta", "login": "Inicios de sesión"}
+
+
+def _bucket_label(bucket, granularity):
+    moment = datetime.fromtimestamp(bucket, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%d %H:00" if granularity == "hour" else "%Y-%m-%d")
+
+
+def show_analytics_dashboard():
+    """
+    Panel de analítica. Solo lee los rollups por hora/día, nunca la tabla
+    `events`, así que el costo depende de los buckets del periodo y no del
+    volumen de eventos.
+    """
+    require("analytics.view")
+    st.subheader("📈 Analítica")
+    labels = [label for label, _, _ in PERIODS]
+    label = st.selectbox("Periodo", labels, index=2, key="analytics_period")
+    _, span, granularity = PERIODS[labels.index(label)]
+    step = HOUR if granularity == "hour" else DAY
+    end_ts = int(time.time()) // step * step + step
+    start_ts = end_ts - span
+
+    series = event_series(start_ts, end_ts, granularity)
+    totals = {}
+    for _, event_type, total in series:
+        totals[event_type] = totals.get(event_type, 0) + total
+    cols = st.columns(len(EVENT_LABELS))
+    for col, (event_type, name) in zip(cols, EVENT_LABELS.items()):
+        col.metric(name, totals.get(event_type, 0))
+
+    if not series:
+        st.info("Todavía no hay eventos en este periodo.")
+        return
+
+    st.markdown("**Actividad**")
+    st.line_chart(
+        [
+            {"fecha": _bucket_label(bucket, granularity), "evento": EVENT_LABELS.get(event_type, event_type), "total": total}
+            for bucket, event_type, total in series
+        ],
+        x="fecha", y="total", color="evento",
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Contenido más reproducido**")
+        rows = top_content(start_ts, end_ts, "play")
+        if rows:
+            for content_type, _content_id, title, total in rows:
+                icon = "🎬" if content_type == "video" else "🎧"
+                st.write(f"{icon} {title} — {total}")
+        else:
+            st.write("Sin reproducciones en el periodo.")
+    with col2:
+        st.markdown("**Por rol**")
+        st.bar_chart(
+            [
+                {"rol": role or "anónimo", "evento": EVENT_LABELS.get(event_type, event_type), "total": total}
+                for role, event_type, total in totals_by_role(start_ts, end_ts)
+            ],
+            x="rol", y="total", color="evento",
+        )
+    st.caption("Los eventos se escriben en lotes; el panel puede ir un par de segundos por detrás.")
@@ -1,90 +1,154 @@
 import streamlit as st
-from modules.beyond_videos.video_manager import fetch_all_videos
-from modules.beyond_podcasts.podcast_manager import fetch_all_podcasts
-from db.likes import like_video, unlike_video, get_video_likes, user_liked_video
-import jwt
-import os
+from auth.jwt_manager import get_claims, revoke_token
+from auth.permissions import can, require
+from modules.utils.helpers import cursor_page, keyset_page, search_page
+
+# Órdenes del catálogo; los dos últimos se leen de índices (ver db/trending.py)
+SORTS = ["Catálogo", "Tendencia", "Más gustados esta semana"]
+
+def _catalog_page(kind, key, sort, fetch_page, count):
+    """
+    Página del catálogo en el orden elegido. Retorna (filas, nav, total);
+    las filas de tendencia/semana traen el puntaje o los likes como 7.ª columna.
+    """
+    from db.trending import trending_page, weekly_page
+
+    if sort == "Tendencia":
+        rows, nav = cursor_page(
+            f"{key}_trending_page", lambda after, limit: trending_page(kind, after, limit),
+            lambda row: (row[6], row[0])
+        )
+        return rows, nav, count()
+    if sort == "Más gustados esta semana":
+        rows, nav = cursor_page(
+            f"{key}_weekly_page", lambda after, limit: weekly_page(kind, after, limit),
+            lambda row: (row[6], row[0])
+        )
+        return rows, nav, None
+    rows, nav = keyset_page(f"{key}_page", fetch_page)
+    return rows, nav, count()
+
+def _recommended_row(kind, fetch_by_ids, render):
+    """
+    Fila "Recomendado para ti" a partir de los likes del usuario; no muestra
+    nada si no tiene likes o el modelo aún se está construyendo.
+    """
+    from db.recommendations import recommend_for_user
+    from modules.beyond_videos.video_player import player_facade
+
+    claims = get_claims(st.session_state.get("token"))
+    if not claims or not claims.get("user_id"):
+        return
+    ids = tuple(item_id for item_id, _ in recommend_for_user(kind, claims["user_id"], limit=3))
+    items = fetch_by_ids(ids)
+    if not items:
+        return
+    st.markdown("#### ✨ Recomendado para ti")
+    cols = st.columns(3)
+    for col, (item_id, title, url, desc, embed_url, poster) in zip(cols, items):
+        with col:
+            player_facade(f"rec_{kind}_{item_id}", title, embed_url or url, render, poster, (kind, item_id))
+    st.markdown("---")
 
 def show_user_dashboard():
+    require("content.view")
     st.header("👤 Panel de Usuario")
 
     # Botón de cerrar sesión
     if st.button("Cerrar sesión", key="logout_user_btn"):
+        revoke_token(st.session_state["token"])
         st.session_state["token"] = None
         st.rerun()
 
     acciones = ["Videoteca", "Podcast", "Beyond Summit"]
-    accion = st.selectbox("¿Qué deseas explorar?", acciones)
+    # Un enlace directo a una repetición (?replay=...) abre la sección del Summit
+    accion = st.selectbox("¿Qué deseas explorar?", acciones, index=2 if "replay" in st.query_params else 0)
 
+    # Cada sección importa sus módulos solo cuando se abre
     if accion == "Videoteca":
+        from modules.beyond_videos.video_manager import fetch_videos_page, count_videos, fetch_videos_by_ids
+        from modules.beyond_videos.video_player import video_facade, render_video
+        from db.likes import like_video, unlike_video, get_videos_likes_summary
+        from db.events import track_event
+        from db.queries import search_videos
         st.subheader("🎬 Videoteca")
         st.info("Aquí se mostrarán los videos disponibles para el usuario.")
-        videos = fetch_all_videos()
+        query = st.text_input("🔎 Buscar videos", key="user_videos_search")
+        total = None
+        if query.strip():
+            videos, nav = search_page("user_videos_search_page", search_videos, query)
+        else:
+            orden = st.radio("Ordenar por", SORTS, horizontal=True, key="user_videos_sort")
+            _recommended_row("video", fetch_videos_by_ids, render_video)
+            videos, nav, total = _catalog_page("video", "user_videos", orden, fetch_videos_page, count_videos)
         if not videos:
             st.write("No hay videos disponibles.")
         else:
+            # Obtener user_id del token si existe
+            claims = get_claims(st.session_state.get("token"))
+            user_id = claims.get("user_id") if claims else None
+            likes_summary = get_videos_likes_summary([v[0] for v in videos], user_id)
             # Mostrar videos en filas de 3
             for i in range(0, len(videos), 3):
                 row_videos = videos[i:i+3]
                 cols = st.columns(3)
-                # Obtener user_id del token si existe
-                user_id = None
-                if "token" in st.session_state and st.session_state["token"]:
-                    try:
-                        payload = jwt.decode(st.session_state["token"], "super_secret_key", algorithms=["HS256"])
-                        user_id = payload.get("user_id")
-                    except Exception:
-                        user_id = None
                 for idx, vid in enumerate(row_videos):
-                    vid_id, title, url, desc = vid
+                    vid_id, title, url, desc, embed_url, poster = vid[:6]
                     with cols[idx]:
-                        st.markdown(f"**{title}**")
-                        if url.startswith("http"):
-                            st.video(url, format="video/mp4", start_time=0)
-                        else:
-                            try:
-                                if os.path.exists(url):
-                                    with open(url, "rb") as f:
-                                        st.video(f)
-                                else:
-                                    st.write("No se pudo cargar el video local.")
-                            except Exception:
-                                st.write("No se pudo cargar el video local.")
+                        video_facade(vid_id, title, embed_url or url, poster)
                         if desc:
                             st.caption(desc)
                         # Mostrar likes y botón si hay usuario logueado
-                        if user_id:
-                            likes = get_video_likes(vid_id)
-                            liked = user_liked_video(user_id, vid_id)
+                        likes, liked = likes_summary[vid_id]
+                        if user_id and can(claims, "content.like"):
                             if liked:
                                 if st.button(f"❤️ Quitar me gusta ({likes})", key=f"unlike_video_user_{vid_id}"):
-                                    unlike_video(user_id, vid_id)
+                                    unlike_video(user_id, vid_id).result()
                                     st.rerun()
                             else:
                                 if st.button(f"🤍 Me gusta ({likes})", key=f"like_video_user_{vid_id}"):
-                                    like_video(user_id, vid_id)
+                                    like_video(user_id, vid_id).result()
+                                    track_event("like", claims, "video", vid_id)
                                     st.rerun()
                         else:
-                            likes = get_video_likes(vid_id)
                             st.write(f"👍 {likes} me gusta")
                 st.markdown("---")
+            nav(total)
     elif accion == "Podcast":
+        from modules.beyond_podcasts.podcast_manager import fetch_podcasts_page, count_podcasts, fetch_podcasts_by_ids
+        from modules.beyond_podcasts.podcast_player import podcast_facade, render_podcast
+        from db.queries import search_podcasts
         st.subheader("🎧 Podcast")
         st.info("Aquí se mostrarán los podcasts disponibles para el usuario.")
-        podcasts = fetch_all_podcasts()
+        query = st.text_input("🔎 Buscar podcasts", key="user_podcasts_search")
+        total = None
+        if query.strip():
+            podcasts, nav = search_page("user_podcasts_search_page", search_podcasts, query)
+        else:
+            orden = st.radio("Ordenar por", SORTS, horizontal=True, key="user_podcasts_sort")
+            _recommended_row("podcast", fetch_podcasts_by_ids, render_podcast)
+            podcasts, nav, total = _catalog_page("podcast", "user_podcasts", orden, fetch_podcasts_page, count_podcasts)
         if not podcasts:
             st.write("No hay podcasts disponibles.")
         else:
             cols = st.columns(3)
             for idx, pod in enumerate(podcasts):
-                pid, title, url, desc = pod
+                pid, title, url, desc, embed_url, poster = pod[:6]
                 with cols[idx % 3]:
-                    st.markdown(f"**{title}**")
-                    if url.startswith("http"):
-                        st.video(url, format="video/mp4", start_time=0)
+                    podcast_facade(pid, title, embed_url or url, poster)
                     if desc:
                         st.caption(desc)
+            nav(total)
     elif accion == "Beyond Summit":
         st.subheader("🏔️ Beyond Summit")
-        st.info("Aquí se mostrarán los eventos Beyond Summit.")
-        # Aquí puedes agregar la lógica para mostrar los summits al usuario
+        vistas = ["Ahora", "Agenda", "Repeticiones"]
+        vista = st.radio("Vista", vistas, index=2 if "replay" in st.query_params else 0, horizontal=True)
+        if vista == "Repeticiones":
+            from modules.beyond_summit.summit_replays import show_replays
+            show_replays()
+        elif vista == "Agenda":
+            from modules.beyond_summit.summit_manager import show_agenda
+            show_agenda()
+        else:
+            from modules.beyond_summit.summit_manager import show_summit_landing
+            show_summit_landing()
@@ -0,0 +1,146 @@
+import streamlit as st
+
+PAGE_SIZE = 9
+
+@st.cache_resource(show_spinner=False)
+def load_image(path, width):
+    """
+    Lee una imagen de assets y la redimensiona al ancho mostrado una sola vez
+    por proceso, en lugar de decodificar los originales en cada rerun.
+    """
+    import io
+    from PIL import Image
+
+    with Image.open(path) as image:
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG" if image.mode in ("RGBA", "LA", "P") else "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _nav_buttons(key, has_prev, has_next, total=None):
+    """
+    Dibuja los botones "Anterior"/"Siguiente" y retorna "prev", "next" o None.
+    """
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    clicked = None
+    with col_prev:
+        if has_prev and st.button("⬅️ Anterior", key=f"{key}_prev"):
+            clicked = "prev"
+    with col_info:
+        if total is not None:
+            st.caption(f"{total} en total")
+    with col_next:
+        if has_next and st.button("Siguiente ➡️", key=f"{key}_next"):
+            clicked = "next"
+    return clicked
+
+
+def keyset_page(key, fetch_page, page_size=PAGE_SIZE):
+    """
+    Obtiene la página actual de un listado paginado por keyset.
+
+    `fetch_page(after_id=..., before_id=..., limit=...)` debe retornar filas
+    ordenadas por id ascendente cuyo primer campo es el id. El cursor de la
+    página se guarda en st.session_state[key].
+    Retorna (filas, nav); llamar a nav(total) dibuja los controles de página.
+    """
+    cursor = st.session_state.setdefault(key, {"after": None, "before": None})
+    rows = fetch_page(after_id=cursor["after"], before_id=cursor["before"], limit=page_size + 1)
+    if not rows and cursor != {"after": None, "before": None}:
+        # La página quedó vacía (p. ej. tras borrar contenido): volver al inicio
+        cursor = st.session_state[key] = {"after": None, "before": None}
+        rows = fetch_page(after_id=None, before_id=None, limit=page_size + 1)
+    if cursor["before"] is not None:
+        has_prev = len(rows) > page_size
+        rows = rows[-page_size:]
+        has_next = True
+    else:
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_prev = cursor["after"] is not None
+
+    def nav(total=None):
+        clicked = _nav_buttons(key, has_prev, has_next, total)
+        if clicked == "prev":
+            st.session_state[key] = {"after": None, "before": rows[0][0]}
+            st.rerun()
+        elif clicked == "next":
+            st.session_state[key] = {"after": rows[-1][0], "before": None}
+            st.rerun()
+
+    return rows, nav
+
+
+def cursor_page(key, fetch_page, cursor_of, page_size=PAGE_SIZE, scope=None):
+    """
+    Paginación por keyset con un cursor compuesto (p. ej. (start_ts, id)).
+
+    `fetch_page(after=..., limit=...)` debe retornar filas ordenadas por el
+    cursor y `cursor_of(fila)` el cursor de una fila. Los cursores de las
+    páginas ya vistas se apilan en st.session_state[key] para poder volver;
+    si `scope` cambia (p. ej. el rango de fechas) se vuelve a la primera página.
+    Retorna (filas, nav) igual que keyset_page.
+    """
+    state = st.session_state.get(key)
+    if not state or state["scope"] != scope:
+        state = st.session_state[key] = {"scope": scope, "stack": []}
+    after = state["stack"][-1] if state["stack"] else None
+    rows = fetch_page(after=after, limit=page_size + 1)
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+
+    def nav(total=None):
+        clicked = _nav_buttons(key, bool(state["stack"]), has_next, total)
+        if clicked == "prev":
+            state["stack"].pop()
+            st.rerun()
+        elif clicked == "next":
+            state["stack"].append(cursor_of(rows[-1]))
+            st.rerun()
+
+    return rows, nav
+
+
+def search_page(key, search_fn, text, page_size=PAGE_SIZE):
+    """
+    Obtiene la página actual de resultados de `search_fn(text, limit, offset)`.
+    Los resultados van ordenados por relevancia, así que se paginan por offset;
+    la página vuelve a la primera cuando cambia el texto buscado.
+    Retorna (filas, nav) igual que keyset_page.
+    """
+    state = st.session_state.get(key)
+    if not state or state["text"] != text:
+        state = st.session_state[key] = {"text": text, "page": 0}
+    rows = search_fn(text, limit=page_size + 1, offset=state["page"] * page_size)
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    has_prev = state["page"] > 0
+
+    def nav(total=None):
+        clicked = _nav_buttons(key, has_prev, has_next, total)
+        if clicked:
+            state["page"] += 1 if clicked == "next" else -1
+            st.rerun()
+
+    return rows, nav
+
+
+def pick_content(label, key, search_fn, fetch_page, limit=50):
+    """
+    Buscador + selectbox para elegir un ítem del catálogo sin cargar la tabla entera.
+    Sin texto muestra los primeros `limit` ítems; con texto, los más relevantes.
+    Retorna la fila elegida o None.
+    """
+    text = st.text_input(f"🔎 Buscar {label}", key=f"{key}_search")
+    rows = search_fn(text, limit=limit) if text.strip() else fetch_page(limit=limit)
+    if not rows:
+        st.write("No hay resultados." if text.strip() else f"No hay {label}s guardados.")
+        return None
+    rows_by_id = {row[0]: row for row in rows}
+    selected_id = st.selectbox(
+        f"Selecciona un {label}:", list(rows_by_id),
+        format_func=lambda row_id: rows_by_id[row_id][1], key=key
+    )
+    return rows_by_id.get(selected_id)
@@ -0,0 +1,101 @@
+# modules/utils/media.py
+import os
+import re
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+MediaInfo = namedtuple("MediaInfo", "provider media_id url embed_url poster_url")
+
+_YOUTUBE_ID_RE = re.compile(
+    r"(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})"
+)
+
+# Parámetros de seguimiento que no cambian el contenido enlazado
+_TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "si", "feature", "ref"}
+
+
+def youtube_video_id(url):
+    """
+    Extrae el id de 11 caracteres de un enlace de YouTube, o None si no lo es.
+    """
+    match = _YOUTUBE_ID_RE.search(url or "")
+    return match.group(1) if match else None
+
+
+def _canonical_http_url(url):
+    parts = urlsplit(url)
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in _TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def parse_media_url(url):
+    """
+    Normaliza la URL pegada por el admin al guardar contenido.
+    Retorna MediaInfo(provider, media_id, url, embed_url, poster_url):
+    `provider` + `media_id` identifican el medio (índice único) y
+    embed_url/poster_url quedan precalculados para el render.
+    """
+    url = (url or "").strip()
+    video_id = youtube_video_id(url)
+    if video_id:
+        return MediaInfo(
+            "youtube", video_id,
+            f"https://www.youtube.com/watch?v={video_id}",
+            f"https://www.youtube.com/embed/{video_id}",
+            f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        )
+    if url.startswith(("http://", "https://")):
+        canonical = _canonical_http_url(url)
+        return MediaInfo("url", canonical, canonical, canonical, None)
+    # Archivo local: se conserva la ruta tal cual y se identifica por su ruta absoluta
+    return MediaInfo("local", os.path.abspath(url), url, None, None)
+
+
+def backfill_media_ids(tables=("videos", "podcasts")):
+    """
+    Completa provider/media_id/embed_url/poster_url en filas guardadas antes
+    del paso de ingesta. Las filas cuyo medio ya existe quedan sin media_id
+    y se retornan como duplicadas (tabla, id, id_existente).
+    """
+    # Importar aquí para que el parseo no dependa de la base de datos
+    from db.connection import transaction
+
+    updated, duplicates = 0, []
+    with transaction() as conn:
+        for table in tables:
+            rows = conn.execute(f"SELECT id, url FROM {table} WHERE media_id IS NULL ORDER BY id").fetchall()
+            for row_id, url in rows:
+                info = parse_media_url(url)
+                existing = conn.execute(
+                    f"SELECT id FROM {table} WHERE provider = ? AND media_id = ?",
+                    (info.provider, info.media_id)
+                ).fetchone()
+                if existing:
+                    duplicates.append((table, row_id, existing[0]))
+                    conn.execute(
+                        f"UPDATE {table} SET embed_url = ?, poster_url = ? WHERE id = ?",
+                        (info.embed_url, info.poster_url, row_id)
+                    )
+                    continue
+                conn.execute(
+                    f"UPDATE {table} SET provider = ?, media_id = ?, embed_url = ?, poster_url = ? WHERE id = ?",
+                    (info.provider, info.media_id, info.embed_url, info.poster_url, row_id)
+                )
+                updated += 1
+    return updated, duplicates
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingesta de medios del catálogo.")
+    parser.add_argument("--backfill", action="store_true", help="Normaliza las URLs de las filas existentes")
+    args = parser.parse_args()
+    if args.backfill:
+        updated, duplicates = backfill_media_ids()
+        print(f"✅ {updated} filas normalizadas.")
+        for table, row_id, existing_id in duplicates:
+            print(f"⚠️ {table} #{row_id} duplica a #{existing_id}")
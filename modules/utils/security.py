@@ -0,0 +1,138 @@
+# modules/utils/security.py
+import base64
+import hashlib
+import hmac
+import os
+
+import jwt
+
+# Coste de scrypt; ajustable por entorno según el throughput de login medido
+# (ver `python -m modules.utils.security --benchmark`).
+SCRYPT_N = int(os.environ.get("BEYOND_SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.environ.get("BEYOND_SCRYPT_R", 8))
+SCRYPT_P = int(os.environ.get("BEYOND_SCRYPT_P", 1))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+SCHEME = "scrypt"
+
+# Límites de los parámetros aceptados en un hash guardado: fuera de ellos el
+# hash se considera dañado (y no se reserva memoria desmedida al verificarlo)
+MAX_SCRYPT_N = 2 ** 20
+MAX_SCRYPT_RP = 16
+
+# Clave con la que se "cifraban" las contraseñas antiguas (JWT con el texto plano)
+LEGACY_PASSWORD_KEY = "super_secret_key"
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES
+    )
+
+
+def hash_password(password, n=None, r=None, p=None):
+    """
+    Deriva un hash scrypt con sal aleatoria por usuario.
+    Formato: scrypt$n$r$p$sal$hash (sal y hash en base64), así los
+    parámetros de coste viajan junto al hash y pueden cambiar con el tiempo.
+    """
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = os.urandom(SALT_BYTES)
+    derived = _scrypt(password, salt, n, r, p)
+    return f"{SCHEME}${n}${r}${p}${_b64(salt)}${_b64(derived)}"
+
+
+def _parse(stored):
+    if isinstance(stored, bytes):
+        stored = stored.decode("utf-8", "replace")
+    parts = stored.split("$")
+    if len(parts) != 6 or parts[0] != SCHEME:
+        return None
+    try:
+        n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+        salt, derived = base64.b64decode(parts[4]), base64.b64decode(parts[5])
+    except ValueError:
+        return None
+    if not (2 <= n <= MAX_SCRYPT_N and n & (n - 1) == 0):
+        return None
+    if not (1 <= r <= MAX_SCRYPT_RP and 1 <= p <= MAX_SCRYPT_RP):
+        return None
+    return n, r, p, salt, derived
+
+
+def _verify_legacy(stored, password):
+    # Contraseñas antiguas: JWT con {"pwd": ...} o, en la semilla inicial, texto plano
+    try:
+        decoded = jwt.decode(stored, LEGACY_PASSWORD_KEY, algorithms=["HS256"])
+        legacy = decoded.get("pwd", "")
+    except jwt.InvalidTokenError:
+        legacy = stored.decode("utf-8", "replace") if isinstance(stored, bytes) else stored
+        # Un hash con prefijo conocido que no se pudo interpretar está dañado:
+        # nunca se compara como texto plano
+        if legacy.startswith(f"{SCHEME}$"):
+            return False
+    return hmac.compare_digest(str(legacy).encode("utf-8"), password.encode("utf-8"))
+
+
+def verify_password(stored, password):
+    """
+    Comprueba una contraseña contra el valor guardado en users.password.
+    Acepta hashes scrypt y, para poder migrarlos, los formatos antiguos.
+    """
+    if not stored:
+        return False
+    parsed = _parse(stored)
+    if parsed is None:
+        return _verify_legacy(stored, password)
+    n, r, p, salt, expected = parsed
+    try:
+        derived = _scrypt(password, salt, n, r, p)
+    except ValueError:
+        return False
+    return hmac.compare_digest(derived, expected)
+
+
+def needs_rehash(stored):
+    """
+    True si el valor guardado no es scrypt o usa parámetros distintos a los actuales.
+    """
+    parsed = _parse(stored) if stored else None
+    return parsed is None or parsed[:3] != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+def benchmark(costs=(2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16), workers=4, rounds=32):
+    """
+    Mide hashes por segundo para cada coste N usando `workers` hilos,
+    para elegir SCRYPT_N según el throughput de login que se necesita.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for n in costs:
+            start = time.perf_counter()
+            list(pool.map(lambda _: hash_password("benchmark", n=n), range(rounds)))
+            elapsed = time.perf_counter() - start
+            results.append((n, rounds / elapsed, elapsed / rounds * workers * 1000))
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Utilidades de contraseñas.")
+    parser.add_argument("--benchmark", action="store_true", help="Mide el throughput de scrypt por coste")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=32)
+    args = parser.parse_args()
+    if args.benchmark:
+        print(f"{'N':>8} {'logins/s':>10} {'ms/login':>10}  (r={SCRYPT_R}, p={SCRYPT_P}, hilos={args.workers})")
+        for n, per_second, ms in benchmark(workers=args.workers, rounds=args.rounds):
+            print(f"{n:>8} {per_second:>10.1f} {ms:>10.1f}")
@@ -1,56 +1,28 @@
 import streamlit as st
 import jwt
-import datetime
-import sqlite3
-from pathlib import Path
-
-# ========================
-# CONFIGURACIÓN JWT
-# ========================
-JWT_SECRET = "super_secret_key"
-JWT_ALGORITHM = "HS256"
+from db.models import ensure_schema
+from auth.login import login_user
+from auth.jwt_manager import create_token as _create_session_token, verify_token as _verify_session_token
 
 # ========================
 # BASE DE DATOS
 # ========================
-DB_PATH = Path("beyond.db")
-
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    # Tabla de usuarios
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE,
-                    password TEXT,
-                    role TEXT
-                )''')
-    conn.commit()
-    conn.close()
+    # El esquema completo lo gestionan las migraciones de db/models.py
+    ensure_schema()
 
 def check_user(username, password):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username=? AND password=?", (username, password))
-    user = c.fetchone()
-    conn.close()
-    return user
+    return login_user(username, password)
 
 # ========================
 # JWT HELPERS
 # ========================
 def create_token(username, role):
-    payload = {
-        "username": username,
-        "role": role,
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)
-    }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return _create_session_token(None, role, username)
 
 def verify_token(token):
     try:
-        decoded = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return decoded
+        return _verify_session_token(token)
     except jwt.ExpiredSignatureError:
         st.error("⚠️ Sesión expirada. Por favor, inicie sesión de nuevo.")
         return None
@@ -93,7 +65,7 @@ def login_screen():
     if st.button("Login"):
         user = check_user(username, password)
         if user:
-            token = create_token(user[1], user[3])  # username, role
+            token = create_token(user["username"], user["role"])
             st.session_state["token"] = token
             st.success("✅ Login exitoso")
             st.rerun()